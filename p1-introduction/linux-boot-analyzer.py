@@ -5,14 +5,821 @@ Traces and visualizes the Linux boot sequence with performance metrics
 """
 
 import os
+import sys
+import json
+import argparse
+import sqlite3
+import statistics
 import subprocess
 import re
+import time
+import heapq
+import html
+import socket
+import struct
+from concurrent.futures import (ThreadPoolExecutor, ProcessPoolExecutor,
+                                TimeoutError as FutureTimeout)
 from datetime import datetime, timedelta
 from collections import defaultdict
 
+CRITICAL_FILES = [
+    ("/boot/vmlinuz", "Kernel image"),
+    ("/boot/initrd.img", "Initial RAM disk"),
+    ("/etc/fstab", "Filesystem table"),
+    ("/etc/systemd/system", "systemd configuration"),
+    ("/proc/cmdline", "Kernel parameters")
+]
+
+GRUB_CFG_PATHS = [
+    '/boot/grub/grub.cfg',
+    '/boot/grub2/grub.cfg',
+    '/boot/efi/EFI/ubuntu/grub.cfg'
+]
+
+# Kernel log milestones, in the order they usually appear (first match wins)
+KERNEL_MILESTONES = {
+    'kernel_done': ("Kernel init done", r"Freeing unused kernel"),
+    'root_mounted': ("Root mounted", r"VFS: Mounted root|: mounted filesystem|Ending clean mount"),
+    'init_started': ("Init started", r"Run /\S+/\S+ as init process|systemd\[1\]: systemd \d+ running"),
+    'switched_root': ("Switched root", r"systemd\[1\]: Switching root"),
+}
+MILESTONE_PATTERN = re.compile('|'.join(f"(?P<{name}>{pattern})"
+                                        for name, (_, pattern) in KERNEL_MILESTONES.items()))
+INITRAMFS_PATTERN = re.compile(r"Unpacking initramfs|Trying to unpack rootfs image as initramfs")
+DMESG_RAW_LINE = re.compile(r"^<(\d+)>\[\s*(\d+\.\d+)\] ?(.*)")
+LOG_LEVELS = ['emerg', 'alert', 'crit', 'err', 'warning', 'notice', 'info', 'debug']
+
+
+class KernelLogTimeline:
+    """Single-pass kernel log parser: boot milestones, gaps and severity counts
+
+    Gaps and phases stop where the boot does: at boot_complete (seconds since
+    boot at which systemd finished startup) when it is known, else at the last
+    milestone. Messages logged hours into uptime would otherwise turn idle
+    time into the "slowest gaps" and the last phase.
+    """
+
+    def __init__(self, top_gaps=10, max_errors=5, boot_complete=None):
+        self.top_gaps = top_gaps
+        self.max_errors = max_errors
+        self.boot_complete = boot_complete
+        self.messages = 0
+        self.first = None
+        self.last = None
+        self.previous = None  # (timestamp, message)
+        self.milestones = {}  # name -> (timestamp, message)
+        self.initramfs = None  # timestamp the initramfs was unpacked
+        self.gaps = []  # min-heap of the largest (gap, before, after)
+        self.pending_gaps = []  # since the last milestone, without boot_complete
+        self.levels = defaultdict(int)
+        self.errors = []
+
+    def push_gap(self, heap, entry):
+        """Keep entry if it is one of the top_gaps largest in heap"""
+        if len(heap) < self.top_gaps:
+            heapq.heappush(heap, entry)
+        elif entry[0] > heap[0][0]:
+            heapq.heapreplace(heap, entry)
+
+    def add(self, timestamp, message, level=6):
+        """Feed one message (timestamp in seconds since boot)"""
+        self.messages += 1
+        if self.first is None:
+            self.first = timestamp
+        self.last = timestamp
+
+        self.levels[level] += 1
+        if level <= 3 and len(self.errors) < self.max_errors:
+            self.errors.append((timestamp, message))
+
+        booting = self.boot_complete is None or timestamp <= self.boot_complete
+        if self.previous is not None and booting:
+            entry = (timestamp - self.previous[0], self.previous, (timestamp, message))
+            # Without boot_complete, gaps only count once a later milestone shows
+            # they were still part of the boot
+            self.push_gap(self.gaps if self.boot_complete is not None else self.pending_gaps,
+                          entry)
+        self.previous = (timestamp, message)
+
+        # Stop matching once every milestone has been seen
+        if booting and len(self.milestones) < len(KERNEL_MILESTONES):
+            match = MILESTONE_PATTERN.search(message)
+            if match and match.lastgroup not in self.milestones:
+                self.milestones[match.lastgroup] = (timestamp, message)
+                for entry in self.pending_gaps:
+                    self.push_gap(self.gaps, entry)
+                self.pending_gaps = []
+        if self.initramfs is None and INITRAMFS_PATTERN.search(message):
+            self.initramfs = timestamp
+
+    def phases(self):
+        """[(from label, to label, start, end)] between milestones, up to the end of boot"""
+        if self.first is None:
+            return []
+        points = [("Kernel start", self.first)]
+        points += sorted(((KERNEL_MILESTONES[name][0], timestamp)
+                          for name, (timestamp, _) in self.milestones.items()),
+                         key=lambda point: point[1])
+        if self.boot_complete is not None and self.boot_complete > points[-1][1]:
+            points.append(("Startup finished", self.boot_complete))
+        return [(label, next_label, start, end)
+                for (label, start), (next_label, end) in zip(points, points[1:])]
+
+    def slowest_gaps(self):
+        """Largest gaps between consecutive messages, largest first"""
+        return sorted(self.gaps, key=lambda entry: entry[0], reverse=True)
+
+
+def parse_kmsg_record(record):
+    """'prio,seq,usec,flags;message' from /dev/kmsg -> (seconds, level, message)"""
+    header, _, text = record.partition(';')
+    fields = header.split(',')
+    return int(fields[2]) / 1e6, int(fields[0]) & 7, text.split('\n', 1)[0]
+
+
+UNIT_PROPERTIES = 'Id,After,InactiveExitTimestampMonotonic,ActiveEnterTimestampMonotonic'
+CRITICAL_SLACK = 0.05  # seconds; less slack than this means the unit delays boot
+
+
+class UnitGraph:
+    """systemd unit ordering graph with activation times, for critical path and slack"""
 
-class LinuxBootAnalyzer:
     def __init__(self):
+        self.units = {}  # name -> {'start', 'active', 'after'} (seconds since boot)
+        self.target = None  # unit the boot waits for (default.target)
+
+    def add_unit(self, name, start_usec, active_usec, after):
+        """Add a unit from its monotonic timestamps (µs); ignores units never activated"""
+        if not name or not active_usec:
+            return
+        start = start_usec or active_usec
+        self.units[name] = {'start': min(start, active_usec) / 1e6, 'active': active_usec / 1e6,
+                            'after': after}
+
+    @classmethod
+    def from_show_output(cls, text):
+        """Parse `systemctl show -p UNIT_PROPERTIES` output (first block is the target)
+
+        The target is left None when it never became active (boot still
+        running, rescue or emergency boot).
+        """
+        graph = cls()
+        for index, block in enumerate(text.split('\n\n')):
+            props = dict(line.split('=', 1) for line in block.splitlines() if '=' in line)
+            graph.add_unit(props.get('Id'), int(props.get('InactiveExitTimestampMonotonic') or 0),
+                           int(props.get('ActiveEnterTimestampMonotonic') or 0),
+                           props.get('After', '').split())
+            if index == 0 and props.get('Id') in graph.units:
+                graph.target = props['Id']
+        return graph
+
+    def duration(self, name):
+        unit = self.units[name]
+        return unit['active'] - unit['start']
+
+    def slack(self):
+        """Seconds each unit could have been later without delaying the target
+
+        Backward pass of the critical path method: a unit's slack is the time
+        between it becoming active and each unit ordered After= it starting,
+        plus that unit's own slack. Units the target does not (transitively)
+        wait for are left out.
+        """
+        if self.target is None:
+            return {}
+        successors = defaultdict(list)
+        for name, unit in self.units.items():
+            for dependency in unit['after']:
+                if dependency in self.units:
+                    successors[dependency].append(name)
+
+        slack = {self.target: 0.0}
+        # Successors become active after their dependencies, so walking units
+        # from the latest activation backwards visits successors first; units
+        # activated at the same instant may need another pass
+        order = sorted(self.units, key=lambda n: (self.units[n]['active'], self.units[n]['start']),
+                       reverse=True)
+        for _ in range(len(order)):
+            changed = False
+            for name in order:
+                if name == self.target:
+                    continue
+                active = self.units[name]['active']
+                floats = [self.units[successor]['start'] - active + slack[successor]
+                          for successor in successors[name] if successor in slack]
+                if floats and slack.get(name) != max(min(floats), 0.0):
+                    slack[name] = max(min(floats), 0.0)
+                    changed = True
+            if not changed:
+                break
+        return slack
+
+    def critical_chain(self):
+        """[unit, ...] from the target back to the first unit it waited for
+
+        Like `systemd-analyze critical-chain`: at each step follow the After=
+        dependency that became active last before the unit started.
+        """
+        chain = []
+        name = self.target
+        while name is not None and name not in chain:
+            chain.append(name)
+            started = self.units[name]['start']
+            candidates = [dependency for dependency in self.units[name]['after']
+                          if dependency in self.units
+                          and self.units[dependency]['active'] <= started]
+            name = max(candidates, key=lambda n: self.units[n]['active'], default=None)
+        return chain
+
+
+SYSTEMD_BUS = 'org.freedesktop.systemd1'
+SYSTEMD_PATH = '/org/freedesktop/systemd1'
+PROPERTIES_INTERFACE = 'org.freedesktop.DBus.Properties'
+# systemd's private socket (root only, no bus daemon involved), then the system bus
+SYSTEMD_SOCKETS = [('/run/systemd/private', False), ('/run/dbus/system_bus_socket', True)]
+DBUS_ALIGN = {'y': 1, 'b': 4, 'n': 2, 'q': 2, 'i': 4, 'u': 4, 'x': 8, 't': 8, 'd': 8, 'h': 4,
+              's': 4, 'o': 4, 'g': 1, 'v': 1, 'a': 4, '(': 8, '{': 8}
+DBUS_FORMATS = {'y': 'B', 'b': 'I', 'n': 'h', 'q': 'H', 'i': 'i', 'u': 'I', 'x': 'q', 't': 'Q',
+                'd': 'd', 'h': 'I'}
+UNIT_PIPELINE = 64  # D-Bus calls in flight at once
+
+
+class DBusError(Exception):
+    """Error reply or protocol failure on a D-Bus connection"""
+
+
+def dbus_type_end(signature, i):
+    """Index just past the single complete type starting at signature[i]"""
+    if signature[i] == 'a':
+        return dbus_type_end(signature, i + 1)
+    if signature[i] in '({':
+        close = ')' if signature[i] == '(' else '}'
+        i += 1
+        while signature[i] != close:
+            i = dbus_type_end(signature, i)
+    return i + 1
+
+
+def dbus_split(signature):
+    """Split a signature into its complete types"""
+    types, i = [], 0
+    while i < len(signature):
+        end = dbus_type_end(signature, i)
+        types.append(signature[i:end])
+        i = end
+    return types
+
+
+def dbus_unmarshal(data, pos, signature, endian='<'):
+    """Decode one value of a single complete type; returns (value, next position)"""
+    code = signature[0]
+    pos += -pos % DBUS_ALIGN[code]
+    if code in DBUS_FORMATS:
+        fmt = endian + DBUS_FORMATS[code]
+        value = struct.unpack_from(fmt, data, pos)[0]
+        return (bool(value) if code == 'b' else value), pos + struct.calcsize(fmt)
+    if code in 'so':
+        length = struct.unpack_from(endian + 'I', data, pos)[0]
+        return data[pos + 4:pos + 4 + length].decode('utf-8', 'replace'), pos + 5 + length
+    if code == 'g':
+        length = data[pos]
+        return data[pos + 1:pos + 1 + length].decode(), pos + 2 + length
+    if code == 'v':
+        inner, pos = dbus_unmarshal(data, pos, 'g', endian)
+        return dbus_unmarshal(data, pos, inner, endian)
+    if code == 'a':
+        length = struct.unpack_from(endian + 'I', data, pos)[0]
+        element = signature[1:]
+        pos += 4
+        pos += -pos % DBUS_ALIGN[element[0]]
+        end = pos + length
+        items = []
+        while pos < end:
+            item, pos = dbus_unmarshal(data, pos, element, endian)
+            items.append(item)
+        return (dict(items) if element[0] == '{' else items), pos
+    values = []  # struct or dict entry
+    for member in dbus_split(signature[1:-1]):
+        value, pos = dbus_unmarshal(data, pos, member, endian)
+        values.append(value)
+    return tuple(values), pos
+
+
+def dbus_marshal(buffer, signature, value):
+    """Append one little-endian value of a single complete type to a bytearray
+
+    Variants are given as (signature, value) pairs.
+    """
+    code = signature[0]
+    buffer.extend(b'\0' * (-len(buffer) % DBUS_ALIGN[code]))
+    if code in DBUS_FORMATS:
+        buffer.extend(struct.pack('<' + DBUS_FORMATS[code], value))
+    elif code in 'so':
+        encoded = value.encode()
+        buffer.extend(struct.pack('<I', len(encoded)) + encoded + b'\0')
+    elif code == 'g':
+        buffer.extend(bytes([len(value)]) + value.encode() + b'\0')
+    elif code == 'v':
+        dbus_marshal(buffer, 'g', value[0])
+        dbus_marshal(buffer, value[0], value[1])
+    elif code == 'a':
+        dbus_marshal(buffer, 'u', 0)
+        length_at = len(buffer) - 4
+        element = signature[1:]
+        buffer.extend(b'\0' * (-len(buffer) % DBUS_ALIGN[element[0]]))
+        start = len(buffer)
+        for item in (value.items() if element[0] == '{' else value):
+            dbus_marshal(buffer, element, item)
+        struct.pack_into('<I', buffer, length_at, len(buffer) - start)
+    else:
+        for member, item in zip(dbus_split(signature[1:-1]), value):
+            dbus_marshal(buffer, member, item)
+
+
+class DBusConnection:
+    """Minimal blocking D-Bus client (method calls only) over a Unix socket"""
+
+    def __init__(self, path, hello=True, timeout=5):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.buffer = b''
+        self.serial = 0
+        self.replies = {}  # serial -> (error name, values) read while waiting for another
+        try:
+            self.sock.connect(path)
+            uid = str(os.geteuid()).encode().hex().encode()
+            self.sock.sendall(b'\0AUTH EXTERNAL ' + uid + b'\r\n')
+            if not self.read_line().startswith(b'OK'):
+                raise DBusError(f"{path}: authentication rejected")
+            self.sock.sendall(b'BEGIN\r\n')
+            if hello:
+                self.call_sync('org.freedesktop.DBus', '/org/freedesktop/DBus',
+                               'org.freedesktop.DBus', 'Hello')
+        except Exception:
+            self.sock.close()
+            raise
+
+    def close(self):
+        self.sock.close()
+
+    def fill(self):
+        chunk = self.sock.recv(65536)
+        if not chunk:
+            raise DBusError("connection closed")
+        self.buffer += chunk
+
+    def read_line(self):
+        while b'\r\n' not in self.buffer:
+            self.fill()
+        line, self.buffer = self.buffer.split(b'\r\n', 1)
+        return line
+
+    def read(self, size):
+        while len(self.buffer) < size:
+            self.fill()
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+    def call(self, destination, path, interface, member, signature='', args=()):
+        """Send a method call without waiting; returns its serial for reply()"""
+        self.serial += 1
+        body = bytearray()
+        for argument_type, argument in zip(dbus_split(signature), args):
+            dbus_marshal(body, argument_type, argument)
+        fields = [(1, ('o', path)), (3, ('s', member))]
+        if interface:
+            fields.append((2, ('s', interface)))
+        if destination:
+            fields.append((6, ('s', destination)))
+        if signature:
+            fields.append((8, ('g', signature)))
+        header = bytearray(b'l\x01\x00\x01' + struct.pack('<II', len(body), self.serial))
+        dbus_marshal(header, 'a(yv)', fields)
+        header.extend(b'\0' * (-len(header) % 8))
+        self.sock.sendall(bytes(header) + bytes(body))
+        return self.serial
+
+    def receive(self):
+        """Read one message: (type, reply serial, error name, body values)"""
+        fixed = self.read(16)
+        endian = '<' if fixed[0:1] == b'l' else '>'
+        body_length, _, fields_length = struct.unpack_from(endian + 'III', fixed, 4)
+        header_length = 16 + fields_length
+        header_length += -header_length % 8
+        message = fixed + self.read(header_length - 16 + body_length)
+        fields = dict(dbus_unmarshal(message, 12, 'a(yv)', endian)[0])
+        values, pos = [], header_length
+        for value_type in dbus_split(fields.get(8, '')):
+            value, pos = dbus_unmarshal(message, pos, value_type, endian)
+            values.append(value)
+        return message[1], fields.get(5), fields.get(4), values
+
+    def reply(self, serial):
+        """Body of the reply to a call; raises DBusError for error replies"""
+        while serial not in self.replies:
+            message_type, reply_serial, error, values = self.receive()
+            if message_type in (2, 3) and reply_serial is not None:
+                self.replies[reply_serial] = (error, values)
+        error, values = self.replies.pop(serial)
+        if error:
+            raise DBusError(f"{error}: {values[0] if values else ''}")
+        return values
+
+    def call_sync(self, *args, **kwargs):
+        return self.reply(self.call(*args, **kwargs))
+
+
+def systemd_bus():
+    """Connection to systemd (PID 1), preferring its private socket"""
+    errors = []
+    for path, hello in SYSTEMD_SOCKETS:
+        try:
+            return DBusConnection(path, hello)
+        except (OSError, DBusError) as e:
+            errors.append(f"{path}: {e}")
+    raise DBusError('; '.join(errors))
+
+
+def boot_phases_from_manager(props):
+    """{phase: seconds} from systemd Manager timestamps, like `systemd-analyze time`"""
+    finish = props.get('FinishTimestampMonotonic', 0)
+    if not finish:
+        return {}  # boot still in progress
+    firmware = props.get('FirmwareTimestampMonotonic', 0)
+    loader = props.get('LoaderTimestampMonotonic', 0)
+    initrd = props.get('InitRDTimestampMonotonic', 0)
+    userspace = props.get('UserspaceTimestampMonotonic', 0)
+    # firmware and loader timestamps count backwards from the kernel start
+    phases = {'kernel': (initrd or userspace) / 1e6, 'userspace': (finish - userspace) / 1e6}
+    if firmware:
+        phases['firmware'] = (firmware - loader) / 1e6
+    if loader:
+        phases['loader'] = loader / 1e6
+    if initrd:
+        phases['initrd'] = (userspace - initrd) / 1e6
+    phases['total'] = (max(firmware, loader) + finish) / 1e6
+    return phases
+
+
+def format_startup_finished(phases):
+    """The 'Startup finished in ...' line systemd-analyze prints"""
+    parts = ' + '.join(f"{phases[phase]:.3f}s ({phase})" for phase in BOOT_PHASES
+                       if phase in phases)
+    return f"Startup finished in {parts} = {phases['total']:.3f}s"
+
+
+HISTORY_DB = os.path.expanduser('~/.local/share/boot-analyzer/history.db')
+BOOT_PHASES = ['firmware', 'loader', 'kernel', 'initrd', 'userspace']
+# journal MESSAGE_IDs logged by systemd (PID 1), see systemd/sd-messages.h
+STARTUP_FINISHED_ID = 'b07a249cd024414a82dd00cd181378ff'
+UNIT_STARTING_ID = '7d4958e842da4a758f6c1cdc7b36dcc5'
+UNIT_STARTED_ID = '39f53479d3a045ac8e11786248231fbf'
+JOURNAL_FIELDS = '_BOOT_ID,MESSAGE_ID,MESSAGE,UNIT,KERNEL_USEC,INITRD_USEC,USERSPACE_USEC'
+TIMESPAN_UNITS = {'h': 3600, 'min': 60, 's': 1, 'ms': 1e-3, 'us': 1e-6, 'µs': 1e-6}
+MIN_REGRESSION = 0.1  # seconds; smaller slowdowns are never reported
+
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS boots (
+    boot_id TEXT PRIMARY KEY, started REAL, firmware REAL, loader REAL, kernel REAL,
+    initrd REAL, userspace REAL, total REAL);
+CREATE INDEX IF NOT EXISTS boots_started ON boots (started);
+CREATE TABLE IF NOT EXISTS units (
+    boot_id TEXT, unit TEXT, seconds REAL, PRIMARY KEY (boot_id, unit)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS units_unit ON units (unit);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def parse_timespan(text):
+    """systemd time span ('1min 2.345s', '870ms') -> seconds"""
+    return sum(float(value) * TIMESPAN_UNITS[unit]
+               for value, unit in re.findall(r"([\d.]+)(min|ms|us|µs|h|s)", text))
+
+
+def parse_startup_finished(text):
+    """'Startup finished in 2.1s (kernel) + 5s (userspace) = 7.1s' -> {phase: seconds}"""
+    match = re.search(r"Startup finished in (.*?) = ([^\n]*?)\.?\s*(?:\n|$)", text)
+    if not match:
+        return {}
+    phases = {phase: parse_timespan(span)
+              for span, phase in re.findall(r"([^+(]+?)\s*\((\w+)\)", match.group(1))
+              if phase in BOOT_PHASES}
+    phases['total'] = parse_timespan(match.group(2))
+    return phases
+
+
+def journal_boot_entries(after_cursor=None):
+    """Stream systemd startup and unit start entries from the journal, oldest first"""
+    args = ['journalctl', '--no-pager', '-o', 'json', '--output-fields', JOURNAL_FIELDS,
+            f'MESSAGE_ID={STARTUP_FINISHED_ID}',
+            f'MESSAGE_ID={UNIT_STARTING_ID}', f'MESSAGE_ID={UNIT_STARTED_ID}', '_PID=1']
+    if after_cursor:
+        args += ['--after-cursor', after_cursor]
+    with subprocess.Popen(args, stdout=subprocess.PIPE, text=True, errors='replace') as process:
+        for line in process.stdout:
+            if line.startswith('{'):
+                yield json.loads(line)
+
+
+class BootHistory:
+    """SQLite store of per-boot phase and unit timings, keyed by boot ID"""
+
+    def __init__(self, path=HISTORY_DB):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(HISTORY_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def add_boot(self, boot_id, started, phases, units):
+        """Store (or replace) one boot; phases in seconds, units as {unit: seconds}"""
+        with self.db:
+            self.db.execute('INSERT OR REPLACE INTO boots VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                            (boot_id, started, *(phases.get(phase) for phase in BOOT_PHASES),
+                             phases.get('total')))
+            self.db.execute('DELETE FROM units WHERE boot_id = ?', (boot_id,))
+            self.db.executemany('INSERT INTO units VALUES (?, ?, ?)',
+                                ((boot_id, unit, seconds) for unit, seconds in units.items()))
+
+    def ingest_journal(self, entries=None, read_journal=journal_boot_entries):
+        """Add every finished boot found in the journal; returns (added, skipped)
+
+        Entries after the last ingested 'Startup finished' message are read
+        again next time (via the stored journal cursor), so a boot still in
+        progress is picked up once it completes and no boot is stored twice.
+        """
+        cursor = self.db.execute("SELECT value FROM meta WHERE key = 'cursor'").fetchone()
+        if entries is None:
+            entries = read_journal(cursor[0] if cursor else None)
+        known = {row[0] for row in self.db.execute('SELECT boot_id FROM boots')}
+        pending = defaultdict(lambda: {'starting': {}, 'units': {}})
+        boots, units, added, skipped = [], [], 0, 0
+        last_cursor = None
+
+        for entry in entries:
+            boot_id = entry.get('_BOOT_ID')
+            if not boot_id or boot_id in known:
+                if entry.get('MESSAGE_ID') == STARTUP_FINISHED_ID:
+                    skipped += 1
+                    last_cursor = entry.get('__CURSOR')
+                continue
+            timestamp = int(entry['__MONOTONIC_TIMESTAMP']) / 1e6
+            message_id = entry.get('MESSAGE_ID')
+            boot = pending[boot_id]
+            if message_id == UNIT_STARTING_ID:
+                boot['starting'].setdefault(entry.get('UNIT'), timestamp)
+            elif message_id == UNIT_STARTED_ID and entry.get('UNIT') in boot['starting']:
+                boot['units'].setdefault(entry['UNIT'],
+                                         timestamp - boot['starting'][entry['UNIT']])
+            elif message_id == STARTUP_FINISHED_ID:
+                phases = parse_startup_finished(entry.get('MESSAGE', ''))
+                for phase in ('kernel', 'initrd', 'userspace'):
+                    if entry.get(f'{phase.upper()}_USEC'):
+                        phases[phase] = int(entry[f'{phase.upper()}_USEC']) / 1e6
+                started = (int(entry['__REALTIME_TIMESTAMP']) / 1e6
+                           - int(entry['__MONOTONIC_TIMESTAMP']) / 1e6)
+                boots.append((boot_id, started, *(phases.get(p) for p in BOOT_PHASES),
+                              phases.get('total')))
+                units.extend((boot_id, unit, seconds)
+                             for unit, seconds in pending.pop(boot_id)['units'].items())
+                known.add(boot_id)
+                added += 1
+                last_cursor = entry.get('__CURSOR')
+
+        with self.db:
+            self.db.executemany('INSERT OR IGNORE INTO boots VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                boots)
+            self.db.executemany('INSERT OR IGNORE INTO units VALUES (?, ?, ?)', units)
+            if last_cursor:
+                self.db.execute("INSERT OR REPLACE INTO meta VALUES ('cursor', ?)",
+                                (last_cursor,))
+        return added, skipped
+
+    def boots(self, last=None):
+        """Boots as dicts, oldest first (only the newest `last` if given)"""
+        rows = self.db.execute('SELECT * FROM boots ORDER BY started DESC' +
+                               (' LIMIT ?' if last else ''), (last,) if last else ())
+        columns = ['boot_id', 'started'] + BOOT_PHASES + ['total']
+        return [dict(zip(columns, row)) for row in rows][::-1]
+
+    def find_boot(self, prefix):
+        """Boot ID matching a (possibly abbreviated) ID"""
+        rows = self.db.execute('SELECT boot_id FROM boots WHERE boot_id LIKE ?',
+                               (prefix.replace('-', '').lower() + '%',)).fetchall()
+        if len(rows) != 1:
+            raise KeyError(f"{len(rows)} boots match '{prefix}'")
+        return rows[0][0]
+
+    def unit_times(self, boot_id):
+        return dict(self.db.execute('SELECT unit, seconds FROM units WHERE boot_id = ?',
+                                    (boot_id,)))
+
+    def unit_trend(self, unit, last=None):
+        """[(started, seconds)] for one unit, oldest first"""
+        rows = self.db.execute('SELECT b.started, u.seconds FROM units u JOIN boots b '
+                               'USING (boot_id) WHERE u.unit = ? ORDER BY b.started DESC' +
+                               (' LIMIT ?' if last else ''), (unit, last) if last else (unit,))
+        return rows.fetchall()[::-1]
+
+    def unit_baseline(self, boot_ids):
+        """{unit: (samples, mean, stdev)} over the given boots, aggregated in SQLite"""
+        marks = ','.join('?' * len(boot_ids))
+        stats = {}
+        for unit, n, mean, mean_sq in self.db.execute(
+                f'SELECT unit, COUNT(*), AVG(seconds), AVG(seconds * seconds) FROM units '
+                f'WHERE boot_id IN ({marks}) GROUP BY unit', boot_ids):
+            variance = (mean_sq - mean * mean) * n / (n - 1) if n > 1 else 0.0
+            stats[unit] = (n, mean, max(variance, 0.0) ** 0.5)
+        return stats
+
+    def compare(self, boot_id, baseline=10, threshold=3.0):
+        """Compare a boot with the `baseline` boots before it
+
+        Returns [(name, seconds, baseline mean, stdev, z-score, significant)]
+        for boot phases and units, worst first. A slowdown is significant when
+        it is more than `threshold` standard deviations and MIN_REGRESSION
+        seconds above the baseline mean, with at least 3 baseline samples.
+        """
+        boots = self.boots()
+        index = [boot['boot_id'] for boot in boots].index(boot_id)
+        previous = boots[max(0, index - baseline):index]
+        current = boots[index]
+
+        rows = []
+
+        def add(name, value, samples):
+            n, mean, stdev = samples
+            if value is None or not n:
+                return
+            # Floor the deviation so perfectly stable baselines do not divide by zero
+            z = (value - mean) / max(stdev, 0.01)
+            significant = n >= 3 and z >= threshold and value - mean >= MIN_REGRESSION
+            rows.append((name, value, mean, stdev, z, significant))
+
+        for phase in BOOT_PHASES + ['total']:
+            values = [boot[phase] for boot in previous if boot[phase] is not None]
+            add(phase, current[phase],
+                (len(values), statistics.fmean(values) if values else 0,
+                 statistics.stdev(values) if len(values) > 1 else 0.0))
+        unit_stats = self.unit_baseline([boot['boot_id'] for boot in previous])
+        for unit, seconds in self.unit_times(boot_id).items():
+            add(unit, seconds, unit_stats.get(unit, (0, 0, 0)))
+        return sorted(rows, key=lambda row: row[4], reverse=True)
+
+
+def bar(value, peak, width=40):
+    """Horizontal bar scaled to the largest value"""
+    return '█' * (round(value / peak * width) if peak else 0)
+
+
+REPORT_VERSION = 1
+
+
+def load_report_summary(path):
+    """Host, phases and unit times from one JSON report (runs in a worker process)"""
+    try:
+        with open(path) as f:
+            report = json.load(f)
+        return {'path': path, 'host': report.get('host') or path,
+                'phases': report.get('phases') or {},
+                'units': {name: unit['seconds']
+                          for name, unit in (report.get('units') or {}).items()}}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        return {'path': path, 'error': str(e)}
+
+
+def report_files(paths):
+    """JSON report files given directly or found under directories"""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    if name.endswith('.json'):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def percentile(ordered, q):
+    """Linear-interpolated percentile of an already sorted list"""
+    position = (len(ordered) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def outlier_limit(ordered, k):
+    """Robust upper limit: median + k scaled median absolute deviations"""
+    median = percentile(ordered, 50)
+    mad = statistics.median(abs(value - median) for value in ordered) * 1.4826
+    return median, median + max(k * mad, MIN_REGRESSION)
+
+
+def aggregate_reports(summaries, k=3.0, min_hosts=5):
+    """Per-phase and per-unit percentiles across hosts, plus outlier hosts and units"""
+    phases = defaultdict(list)
+    units = defaultdict(list)
+    for summary in summaries:
+        for phase, seconds in summary['phases'].items():
+            if seconds is not None:
+                phases[phase].append((seconds, summary['host']))
+        for unit, seconds in summary['units'].items():
+            units[unit].append((seconds, summary['host']))
+
+    def distribution(samples):
+        ordered = sorted(seconds for seconds, _ in samples)
+        return {'hosts': len(ordered), 'p50': percentile(ordered, 50),
+                'p90': percentile(ordered, 90), 'p99': percentile(ordered, 99),
+                'max': ordered[-1]}
+
+    def outliers(samples):
+        if len(samples) < min_hosts:
+            return []
+        median, limit = outlier_limit(sorted(seconds for seconds, _ in samples), k)
+        return sorted(((host, seconds, median) for seconds, host in samples if seconds > limit),
+                      key=lambda outlier: outlier[1], reverse=True)
+
+    return {
+        'hosts': len(summaries),
+        'phases': {phase: distribution(samples) for phase, samples in phases.items()},
+        'units': {unit: distribution(samples) for unit, samples in units.items()},
+        'outlier_hosts': outliers(phases.get('total', [])),
+        'outlier_units': {unit: found for unit, samples in units.items()
+                          for found in [outliers(samples)] if found},
+    }
+
+
+GANTT_COLORS = {'kernel': '#3cb371', 'unit': '#6495ed', 'critical': '#e0453a'}
+GANTT_TICKS = [0.1, 0.2, 0.5, 1, 2, 5, 10, 15, 30, 60, 120, 300]
+
+
+def write_gantt(f, rows, count, end, title, width=1200, row_height=18, label_width=320):
+    """Stream a self-contained HTML page with an SVG Gantt chart
+
+    rows is an iterable of (label, start, end, kind) in seconds since boot,
+    written out as they come; the row count and `end` (the latest time) are
+    only needed for the height and scale, so callers pass them up front.
+    """
+    scale = width / end if end > 0 else 0
+    step = next((tick for tick in GANTT_TICKS if end / tick <= 20), GANTT_TICKS[-1])
+    height = (count + 2) * row_height
+    f.write('<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+            f'<title>{html.escape(title)}</title>\n<style>'
+            'body{font-family:sans-serif;margin:16px}text{font-size:11px}'
+            '.grid{stroke:#ddd}.bar:hover{opacity:.7}</style></head><body>\n'
+            f'<h3>{html.escape(title)}</h3>\n'
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{label_width + width + 40}" '
+            f'height="{height}">\n')
+
+    tick = 0.0
+    while tick <= end + 1e-9:
+        x = label_width + tick * scale
+        f.write(f'<line class="grid" x1="{x:.1f}" y1="{row_height}" x2="{x:.1f}" '
+                f'y2="{height}"/><text x="{x:.1f}" y="{row_height - 4}">{tick:g}s</text>\n')
+        tick += step
+
+    for i, (label, start, finish, kind) in enumerate(rows, 1):
+        y = (i + 0.5) * row_height
+        x = label_width + start * scale
+        bar_width = max((finish - start) * scale, 1)
+        name = html.escape(label)
+        f.write(f'<text x="4" y="{y + row_height - 6:.0f}">{html.escape(label[:48])}</text>'
+                f'<rect class="bar" x="{x:.1f}" y="{y + 3:.0f}" width="{bar_width:.1f}" '
+                f'height="{row_height - 6}" fill="{GANTT_COLORS[kind]}">'
+                f'<title>{name}: {start:.3f}s → {finish:.3f}s (+{finish - start:.3f}s)</title>'
+                f'</rect>\n')
+    f.write('</svg>\n<p><span style="color:#3cb371">■</span> kernel phase '
+            '<span style="color:#e0453a">■</span> unit on the critical path '
+            '<span style="color:#6495ed">■</span> other unit</p></body></html>\n')
+
+
+class LinuxBootAnalyzer:
+    def __init__(self, collector_timeout=10, max_workers=8):
+        self.collector_timeout = collector_timeout  # default seconds per collector
+        self.max_workers = max_workers
+        self.data = {}  # collector name -> collected value, or the exception it raised
+        self.timings = {}  # collector name -> seconds it took
+        self.file_cache = {}  # path -> contents, each file is read once per analysis
+        self.fallbacks = {}  # collector name -> command it fell back to
+        self.futures = {}  # collector name -> future, while collect() runs
+        self.child_processes = 0
+        # name -> (function, timeout in seconds)
+        self.collectors = {
+            'boot_time': (self.collect_boot_time, 5),
+            'uptime': (lambda: self.read_file('/proc/uptime'), 2),
+            'kernel_version': (lambda: self.read_file('/proc/version'), 2),
+            'cmdline': (lambda: self.read_file('/proc/cmdline'), 2),
+            'bootloader': (self.collect_bootloader, 5),
+            'critical_files': (self.collect_critical_files, 5),
+            'boot_phases': (self.collect_boot_phases, collector_timeout),
+            'unit_graph': (self.collect_unit_graph, collector_timeout),
+            'kernel_log': (self.collect_kernel_log, collector_timeout),
+            'boot_id': (lambda: self.read_file('/proc/sys/kernel/random/boot_id').strip(), 2)
+        }
         self.boot_stages = {
             1: {"name": "BIOS/UEFI", "color": "95", "icon": "⚡"},
             2: {"name": "Bootloader (GRUB)", "color": "94", "icon": "🔧"},
@@ -33,13 +840,198 @@ class LinuxBootAnalyzer:
         print("=" * 80)
         print()
 
+    def run_command(self, args, timeout=None):
+        """Run a command and return its output, killing it after the timeout"""
+        self.child_processes += 1
+        result = subprocess.run(args, capture_output=True, text=True,
+                                timeout=timeout or self.collector_timeout)
+        return result.stdout
+
+    def read_file(self, path):
+        """Read a small text file, once per analysis"""
+        if path not in self.file_cache:
+            with open(path, 'r') as f:
+                self.file_cache[path] = f.read()
+        return self.file_cache[path]
+
+    def collect_boot_time(self):
+        """Boot time from the btime line of /proc/stat"""
+        for line in self.read_file('/proc/stat').splitlines():
+            if line.startswith('btime '):
+                return datetime.fromtimestamp(int(line.split()[1]))
+        raise ValueError("no btime in /proc/stat")
+
+    def collect_boot_phases(self):
+        """Firmware/loader/kernel/initrd/userspace times from systemd over D-Bus"""
+        try:
+            bus = systemd_bus()
+            try:
+                props = bus.call_sync(SYSTEMD_BUS, SYSTEMD_PATH, PROPERTIES_INTERFACE, 'GetAll',
+                                      's', ['org.freedesktop.systemd1.Manager'])[0]
+            finally:
+                bus.close()
+        except (OSError, DBusError):
+            self.fallbacks['boot_phases'] = 'systemd-analyze'
+            return parse_startup_finished(self.run_command(['systemd-analyze']))
+        return boot_phases_from_manager(props)
+
+    def collect_bootloader(self):
+        """GRUB config location (or None) and whether the system booted with UEFI"""
+        grub_cfg = next((path for path in GRUB_CFG_PATHS if os.path.exists(path)), None)
+        return {'grub_cfg': grub_cfg, 'efi': os.path.exists('/sys/firmware/efi')}
+
+    def collect_critical_files(self):
+        """(path, description, exists) for each critical boot file"""
+        return [(path, description, os.path.exists(path)) for path, description in CRITICAL_FILES]
+
+    def collect_unit_graph(self):
+        """Activation times and After= ordering of every unit, from systemd over D-Bus"""
+        try:
+            return self.collect_unit_graph_bus()
+        except (OSError, DBusError):
+            self.fallbacks['unit_graph'] = 'systemctl'
+            return self.collect_unit_graph_systemctl()
+
+    def collect_unit_graph_bus(self):
+        """Unit graph from ListUnits and pipelined per-unit GetAll calls"""
+        bus = systemd_bus()
+        graph = UnitGraph()
+        try:
+            target = bus.call_sync(SYSTEMD_BUS, SYSTEMD_PATH, 'org.freedesktop.systemd1.Manager',
+                                   'GetDefaultTarget')[0]
+            units = bus.call_sync(SYSTEMD_BUS, SYSTEMD_PATH, 'org.freedesktop.systemd1.Manager',
+                                  'ListUnits')[0]
+            paths = [unit[6] for unit in units]
+            # Pipeline the property calls instead of one round trip per unit
+            for i in range(0, len(paths), UNIT_PIPELINE):
+                serials = [bus.call(SYSTEMD_BUS, path, PROPERTIES_INTERFACE, 'GetAll', 's',
+                                    ['org.freedesktop.systemd1.Unit'])
+                           for path in paths[i:i + UNIT_PIPELINE]]
+                for serial in serials:
+                    props = bus.reply(serial)[0]
+                    graph.add_unit(props.get('Id'), props.get('InactiveExitTimestampMonotonic', 0),
+                                   props.get('ActiveEnterTimestampMonotonic', 0),
+                                   props.get('After', []))
+        finally:
+            bus.close()
+        graph.target = target if target in graph.units else None
+        return graph
+
+    def collect_unit_graph_systemctl(self):
+        """Activation times and After= ordering of every unit in one `systemctl show`"""
+        listing = self.run_command(['systemctl', 'list-units', '--all', '--plain',
+                                    '--no-legend', '--no-pager'])
+        units = [line.split()[0] for line in listing.splitlines() if line.strip()]
+        # default.target goes first so its block (resolved to the real target) is the root
+        return UnitGraph.from_show_output(self.run_command(
+            ['systemctl', 'show', '--no-pager', '-p', UNIT_PROPERTIES, '--',
+             'default.target'] + units))
+
+    def read_kmsg(self, timeline):
+        """Stream the whole kernel ring buffer from /dev/kmsg into the timeline"""
+        fd = os.open('/dev/kmsg', os.O_RDONLY | os.O_NONBLOCK)
+        try:
+            while True:
+                try:
+                    record = os.read(fd, 8192)  # one record per read
+                except BlockingIOError:
+                    return  # reached the end of the buffer
+                except BrokenPipeError:
+                    continue  # record overwritten while reading, skip it
+                timestamp, level, message = parse_kmsg_record(record.decode('utf-8', 'replace'))
+                timeline.add(timestamp, message, level)
+        finally:
+            os.close(fd)
+
+    def journal_boot_entries(self, after_cursor=None):
+        """journal_boot_entries(), counting the journalctl process it starts"""
+        self.child_processes += 1
+        return journal_boot_entries(after_cursor)
+
+    def read_dmesg_raw(self, timeline):
+        """Stream `dmesg -r` output (when /dev/kmsg cannot be opened)"""
+        self.child_processes += 1
+        with subprocess.Popen(['dmesg', '-r'], stdout=subprocess.PIPE, text=True,
+                              errors='replace') as process:
+            for line in process.stdout:
+                match = DMESG_RAW_LINE.match(line)
+                if match:
+                    timeline.add(float(match.group(2)), match.group(3).rstrip('\n'),
+                                 int(match.group(1)) & 7)
+            if process.wait() and not timeline.messages:
+                raise PermissionError("dmesg failed, try running with sudo")
+
+    def startup_finished(self):
+        """Seconds since kernel start at which systemd finished startup, None if unknown"""
+        future = self.futures.get('boot_phases')
+        try:
+            # boot_phases is submitted before kernel_log, so it is already running
+            phases = (future.result(self.collectors['boot_phases'][1]) if future
+                      else self.result('boot_phases'))
+        except Exception:
+            return None
+        if isinstance(phases, Exception) or not phases:
+            return None
+        return sum(phases.get(phase, 0) for phase in ('kernel', 'initrd', 'userspace'))
+
+    def collect_kernel_log(self):
+        """Parse the full kernel log in one pass"""
+        boot_complete = self.startup_finished()
+        timeline = KernelLogTimeline(boot_complete=boot_complete)
+        start = time.monotonic()
+        try:
+            self.read_kmsg(timeline)
+            timeline.source = '/dev/kmsg'
+        except OSError:
+            timeline = KernelLogTimeline(boot_complete=boot_complete)
+            self.read_dmesg_raw(timeline)
+            timeline.source = 'dmesg -r'
+            self.fallbacks['kernel_log'] = 'dmesg'
+        timeline.parse_seconds = time.monotonic() - start
+        return timeline
+
+    def run_collector(self, name):
+        """Run one collector, returning its value or the exception it raised"""
+        function, _ = self.collectors[name]
+        start = time.monotonic()
+        try:
+            return function()
+        except Exception as e:
+            return e
+        finally:
+            self.timings[name] = time.monotonic() - start
+
+    def collect(self):
+        """Run every collector concurrently, each bounded by its own timeout"""
+        start = time.monotonic()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        futures = self.futures = {name: executor.submit(self.run_collector, name)
+                                  for name in self.collectors}
+
+        for name, future in futures.items():
+            timeout = self.collectors[name][1]
+            try:
+                self.data[name] = future.result(timeout=max(0, start + timeout - time.monotonic()))
+            except FutureTimeout:
+                self.data[name] = TimeoutError(f"timed out after {timeout}s")
+
+        # Do not wait for collectors that overran their timeout
+        executor.shutdown(wait=False, cancel_futures=True)
+        return time.monotonic() - start
+
+    def result(self, name):
+        """Collected value, collecting it now if collect() has not run; raises its error"""
+        if name not in self.data:
+            self.data[name] = self.run_collector(name)
+        value = self.data[name]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
     def get_boot_time(self):
         """Get system boot time"""
         try:
-            result = subprocess.run(['uptime', '-s'], capture_output=True, text=True)
-            boot_time_str = result.stdout.strip()
-            boot_time = datetime.strptime(boot_time_str, '%Y-%m-%d %H:%M:%S')
-            return boot_time
+            return self.result('boot_time')
         except Exception as e:
             print(f"Error getting boot time: {e}")
             return None
@@ -47,9 +1039,7 @@ class LinuxBootAnalyzer:
     def get_kernel_boot_time(self):
         """Get kernel boot time from /proc/uptime"""
         try:
-            with open('/proc/uptime', 'r') as f:
-                uptime_seconds = float(f.read().split()[0])
-            return uptime_seconds
+            return float(self.result('uptime').split()[0])
         except Exception as e:
             print(f"Error reading uptime: {e}")
             return None
@@ -60,14 +1050,34 @@ class LinuxBootAnalyzer:
         print("-" * 80)
 
         try:
-            result = subprocess.run(['dmesg', '-T'], capture_output=True, text=True)
-            lines = result.stdout.split('\n')[:20]  # First 20 lines
+            timeline = self.result('kernel_log')
+            if not timeline.messages:
+                print("  Kernel log is empty")
+                return
+
+            print(f"  Source: {timeline.source} ({timeline.messages} messages, "
+                  f"{timeline.first:.3f}s → {timeline.last:.3f}s, "
+                  f"parsed in {timeline.parse_seconds * 1000:.0f}ms)")
+            errors = sum(count for level, count in timeline.levels.items() if level <= 3)
+            print(f"  Errors: {errors}  Warnings: {timeline.levels.get(4, 0)}")
+            if timeline.initramfs is not None:
+                print(f"  Initramfs: unpacked at {timeline.initramfs:.3f}s")
 
-            for line in lines:
-                if line.strip():
-                    print(f"  {line}")
+            print(self.colorize("\n  Boot phases:", "1"))
+            for label, next_label, start, end in timeline.phases():
+                print(f"    {label:>16} → {next_label:<16} {start:9.3f}s → {end:9.3f}s  "
+                      f"{end - start:8.3f}s")
 
-            print(f"\n  ... (showing first 20 lines, use 'dmesg' for full log)")
+            print(self.colorize("\n  Slowest gaps between messages:", "1"))
+            for i, (gap, before, after) in enumerate(timeline.slowest_gaps(), 1):
+                print(f"    {i:2}. +{gap:.3f}s at {before[0]:.3f}s → {after[0]:.3f}s")
+                print(f"        after:  {before[1][:90]}")
+                print(f"        before: {after[1][:90]}")
+
+            if timeline.errors:
+                print(self.colorize(f"\n  First {len(timeline.errors)} error messages:", "1;91"))
+                for timestamp, message in timeline.errors:
+                    print(f"    [{timestamp:10.6f}] {message[:100]}")
         except Exception as e:
             print(f"  Error: Unable to read dmesg. Try running with sudo.")
             print(f"  {e}")
@@ -78,50 +1088,86 @@ class LinuxBootAnalyzer:
         print("-" * 80)
 
         try:
-            # Get systemd-analyze time
-            result = subprocess.run(['systemd-analyze'], capture_output=True, text=True)
-            print(f"\n{result.stdout}")
+            phases = self.result('boot_phases')
+            if phases:
+                print(f"\n{format_startup_finished(phases)}")
+            else:
+                print("\n  systemd reported no startup timings (boot in progress or no systemd)")
 
-            # Get systemd-analyze blame (top 10 slowest services)
-            print(self.colorize("\n🐌 TOP 10 SLOWEST SERVICES:", "1;91"))
-            print("-" * 80)
-            result = subprocess.run(['systemd-analyze', 'blame'], capture_output=True, text=True)
-            lines = result.stdout.split('\n')[:10]
+            graph = self.result('unit_graph')
+            if graph.target is not None:
+                self.show_critical_path(graph)
+                return
 
-            for i, line in enumerate(lines, 1):
-                if line.strip():
-                    print(f"  {i}. {line}")
+            # No target to trace a critical chain from: list the slowest units
+            slowest = sorted(graph.units, key=graph.duration, reverse=True)[:10]
+            if slowest:
+                print(self.colorize("\n🐌 TOP 10 SLOWEST UNITS:", "1;91"))
+                print("-" * 80)
+                for i, name in enumerate(slowest, 1):
+                    print(f"  {i}. {graph.duration(name):8.3f}s {name}")
 
         except FileNotFoundError:
-            print("  systemd-analyze not found. This system may not use systemd.")
+            print("  systemd is not reachable and systemd-analyze was not found. "
+                  "This system may not use systemd.")
+        except (subprocess.TimeoutExpired, TimeoutError) as e:
+            print(f"  systemd-analyze did not answer in time: {e}")
         except Exception as e:
             print(f"  Error analyzing systemd: {e}")
 
+    def show_critical_path(self, graph):
+        """Print the critical chain and the slowest units with their slack"""
+        chain = graph.critical_chain()
+        print(self.colorize(f"\n🔗 CRITICAL CHAIN ({graph.target} waited for these, "
+                            f"times since boot):", "1;91"))
+        print("-" * 80)
+        for depth, name in enumerate(chain):
+            unit = graph.units[name]
+            took = graph.duration(name)
+            timing = f"@{unit['active']:.3f}s" + (f" +{took:.3f}s" if took >= 0.001 else "")
+            prefix = "  " + "   " * (depth - 1) + "└─ " if depth else "  "
+            print(f"{prefix}{name} {self.colorize(timing, '91' if took >= 1 else '0')}")
+
+        slack = graph.slack()
+        # Only units that took time and were waited for can delay the boot
+        slowest = sorted((name for name in slack if graph.duration(name) > 0),
+                         key=graph.duration, reverse=True)[:10]
+        if not slowest:
+            return
+        print(self.colorize("\n🐌 SLOWEST UNITS AND THEIR SLACK:", "1;91"))
+        print("-" * 80)
+        print(f"  {'Unit':<45} {'Time':>9} {'Slack':>9}")
+        for name in slowest:
+            if slack[name] < CRITICAL_SLACK:
+                verdict = self.colorize("delays boot", "91")
+            else:
+                verdict = self.colorize("parallel, not on critical path", "92")
+            print(f"  {name[:45]:<45} {graph.duration(name):8.3f}s {slack[name]:8.3f}s  {verdict}")
+        delaying = [name for name in slack
+                    if slack[name] < CRITICAL_SLACK and graph.duration(name) > 0]
+        print(f"\n  {len(delaying)} of {len(graph.units)} active units delay {graph.target}; "
+              f"speeding up any other unit will not shorten the boot")
+
     def get_boot_loader_info(self):
         """Get bootloader information"""
         print(self.colorize("\n🔧 BOOTLOADER INFORMATION", "1;93"))
         print("-" * 80)
 
-        # Check for GRUB
-        grub_cfg_paths = [
-            '/boot/grub/grub.cfg',
-            '/boot/grub2/grub.cfg',
-            '/boot/efi/EFI/ubuntu/grub.cfg'
-        ]
-
-        grub_found = False
-        for path in grub_cfg_paths:
-            if os.path.exists(path):
-                print(f"  Bootloader: GRUB2")
-                print(f"  Config File: {path}")
-                grub_found = True
-                break
+        try:
+            bootloader = self.result('bootloader')
+        except Exception as e:
+            print(f"  Error checking bootloader: {e}")
+            return
 
-        if not grub_found:
+        # Check for GRUB
+        if bootloader['grub_cfg']:
+            print(f"  Bootloader: GRUB2")
+            print(f"  Config File: {bootloader['grub_cfg']}")
+        else:
             print("  Bootloader: Unknown or not GRUB")
 
         # Check for EFI
-        if os.path.exists('/sys/firmware/efi'):
+        if bootloader['efi']:
             print(f"  Boot Mode: UEFI")
         else:
             print(f"  Boot Mode: Legacy BIOS")
@@ -133,18 +1179,15 @@ class LinuxBootAnalyzer:
 
         try:
             # Kernel version
-            with open('/proc/version', 'r') as f:
-                print(f"  {f.read().strip()}")
+            print(f"  {self.result('kernel_version').strip()}")
 
             # Kernel command line
             print(f"\n  Kernel Parameters:")
-            with open('/proc/cmdline', 'r') as f:
-                cmdline = f.read().strip()
-                params = cmdline.split()
-                for param in params[:5]:  # Show first 5 params
-                    print(f"    • {param}")
-                if len(params) > 5:
-                    print(f"    ... and {len(params) - 5} more parameters")
+            params = self.result('cmdline').split()
+            for param in params[:5]:  # Show first 5 params
+                print(f"    • {param}")
+            if len(params) > 5:
+                print(f"    ... and {len(params) - 5} more parameters")
 
         except Exception as e:
             print(f"  Error reading kernel info: {e}")
@@ -155,6 +1198,28 @@ class LinuxBootAnalyzer:
         print("-" * 80)
         print()
 
+        try:
+            phases = self.result('boot_phases')
+        except Exception:
+            phases = {}
+        stages = [(1, 'firmware'), (2, 'loader'), (3, 'kernel'), (3, 'initrd'), (4, 'userspace')]
+        measured = [(i, phase, phases[phase]) for i, phase in stages if phases.get(phase)]
+        if measured:
+            # This boot's measured stages as a text Gantt chart
+            total = sum(seconds for _, _, seconds in measured)
+            offset = 0.0
+            for i, phase, seconds in measured:
+                icon = self.boot_stages[i]["icon"]
+                color = self.boot_stages[i]["color"]
+                lead = round(offset / total * 40)
+                length = max(round(seconds / total * 40), 1)
+                print(f"  {icon}  {phase.capitalize():<10} {offset:8.3f}s +{seconds:7.3f}s  "
+                      f"{' ' * lead}{self.colorize('█' * length, color)}")
+                offset += seconds
+            print(f"\n  Total: {phases.get('total', total):.3f}s. For a per-unit timeline run "
+                  f"with --gantt boot.html")
+            return
+
         stages_info = [
             ("BIOS/UEFI", "Hardware POST & Initialization", "0-2s"),
             ("Bootloader", "GRUB loads kernel", "2-4s"),
@@ -195,16 +1260,14 @@ class LinuxBootAnalyzer:
         print(self.colorize("\n📄 CRITICAL BOOT FILES", "1;93"))
         print("-" * 80)
 
-        critical_files = [
-            ("/boot/vmlinuz", "Kernel image"),
-            ("/boot/initrd.img", "Initial RAM disk"),
-            ("/etc/fstab", "Filesystem table"),
-            ("/etc/systemd/system", "systemd configuration"),
-            ("/proc/cmdline", "Kernel parameters")
-        ]
+        try:
+            critical_files = self.result('critical_files')
+        except Exception as e:
+            print(f"  Error checking files: {e}")
+            return
 
-        for filepath, description in critical_files:
-            if os.path.exists(filepath):
+        for filepath, description, exists in critical_files:
+            if exists:
                 status = self.colorize("✓ EXISTS", "92")
             else:
                 status = self.colorize("✗ MISSING", "91")
@@ -245,9 +1308,156 @@ class LinuxBootAnalyzer:
         for cmd, desc in commands:
             print(f"  • {cmd:35} - {desc}")
 
-    def run_analysis(self):
-        """Run complete boot analysis"""
+    def boot_record(self):
+        """(boot ID, boot timestamp, phases, unit times) of the current boot"""
+        phases = self.result('boot_phases')
+        try:
+            graph = self.result('unit_graph')
+            units = {name: graph.duration(name) for name in graph.units}
+        except Exception:
+            units = {}
+        boot_id = self.result('boot_id').replace('-', '')
+        return boot_id, self.result('boot_time').timestamp(), phases, units
+
+    def report(self):
+        """Everything collected as a JSON-serializable dict"""
+        if not self.data:
+            self.collect()
+
+        def value(name, convert=lambda v: v):
+            try:
+                return convert(self.result(name))
+            except Exception:
+                return None
+
+        def kernel_log(timeline):
+            return {
+                'source': timeline.source, 'messages': timeline.messages,
+                'first': timeline.first, 'last': timeline.last,
+                'initramfs': timeline.initramfs,
+                'milestones': {name: timestamp
+                               for name, (timestamp, _) in timeline.milestones.items()},
+                'phases': [{'from': label, 'to': next_label, 'start': start, 'end': end}
+                           for label, next_label, start, end in timeline.phases()],
+                'slowest_gaps': [{'seconds': gap, 'at': before[0], 'after': before[1],
+                                  'before': after[1]}
+                                 for gap, before, after in timeline.slowest_gaps()],
+                'errors': sum(count for level, count in timeline.levels.items() if level <= 3),
+                'warnings': timeline.levels.get(4, 0),
+            }
+
+        graph = value('unit_graph') or UnitGraph()
+        slack = graph.slack()
+        return {
+            'version': REPORT_VERSION,
+            'host': socket.gethostname(),
+            'generated': time.time(),
+            'boot_id': value('boot_id', lambda boot_id: boot_id.replace('-', '')),
+            'boot_time': value('boot_time', datetime.isoformat),
+            'uptime': value('uptime', lambda uptime: float(uptime.split()[0])),
+            'kernel_version': value('kernel_version', str.strip),
+            'cmdline': value('cmdline', str.strip),
+            'phases': value('boot_phases') or {},
+            'target': graph.target,
+            'critical_chain': graph.critical_chain(),
+            'units': {name: {'start': unit['start'], 'active': unit['active'],
+                             'seconds': graph.duration(name), 'slack': slack.get(name)}
+                      for name, unit in graph.units.items()},
+            'kernel_log': value('kernel_log', kernel_log),
+            'bootloader': value('bootloader'),
+            'critical_files': {path: exists
+                               for path, _, exists in value('critical_files') or []},
+            'collection': {'timings': self.timings, 'fallbacks': self.fallbacks,
+                           'child_processes': self.child_processes,
+                           'errors': {name: str(result) for name, result in self.data.items()
+                                      if isinstance(result, Exception)}},
+        }
+
+    def gantt_timeline(self):
+        """(kernel phases, unit graph, unit names by start time) to chart
+
+        Like `systemd-analyze plot`, the chart stops when the target became
+        active: units started later (timers, logins, restarts) and kernel
+        messages logged hours into uptime would squash the boot itself into
+        the first pixels.
+        """
+        try:
+            phases = self.result('kernel_log').phases()
+        except Exception:
+            phases = []
+        try:
+            graph = self.result('unit_graph')
+        except Exception:
+            return phases, None, []
+
+        names = list(graph.units)
+        if graph.target is not None:
+            finished = graph.units[graph.target]['active']
+            phases = [(label, next_label, start, min(end, finished))
+                      for label, next_label, start, end in phases if start <= finished]
+            names = [name for name in names if graph.units[name]['start'] <= finished]
+        names.sort(key=lambda name: graph.units[name]['start'])
+        return phases, graph, names
+
+    def gantt_rows(self, phases, graph, names):
+        """(label, start, end, kind) for kernel phases, then units, generated one at a time"""
+        for label, next_label, start, end in phases:
+            yield f"kernel: {label} → {next_label}", start, end, 'kernel'
+        if not names:
+            return
+        slack = graph.slack()
+        for name in names:
+            unit = graph.units[name]
+            critical = slack.get(name, 1) < CRITICAL_SLACK
+            yield name, unit['start'], unit['active'], 'critical' if critical else 'unit'
+
+    def write_gantt(self, path):
+        """Write this boot's timeline as a self-contained HTML/SVG Gantt chart"""
+        if not self.data:
+            self.collect()
+        phases, graph, names = self.gantt_timeline()
+        count = len(phases) + len(names)
+        end = max(max((phase[3] for phase in phases), default=0),
+                  max((graph.units[name]['active'] for name in names), default=0))
+        title = f"Boot timeline of {socket.gethostname()}"
+        with open(path, 'w') as f:
+            write_gantt(f, self.gantt_rows(phases, graph, names), count, end, title)
+        return count
+
+    def show_collection_summary(self, elapsed):
+        """How long data collection took, and which collectors failed"""
+        slowest = max(self.timings, key=self.timings.get) if self.timings else None
+        line = f"  Collected {len(self.collectors)} sources in {elapsed:.2f}s"
+        if slowest:
+            line += f" (slowest: {slowest} {self.timings[slowest]:.2f}s)"
+        line += f", {self.child_processes} child process(es)"
+        print(self.colorize(line, "90"))
+        if self.fallbacks:
+            print(self.colorize("  Fell back to commands for: " + ", ".join(
+                f"{name} ({command})" for name, command in self.fallbacks.items()), "90"))
+
+        for name, value in self.data.items():
+            if isinstance(value, TimeoutError):
+                print(self.colorize(f"  ⚠️  {name} {value}", "93"))
+
+    def run_analysis(self, json_output=None):
+        """Run complete boot analysis; with json_output, write a JSON report there instead
+
+        json_output is a file path, or '-' for standard output.
+        """
+        elapsed = self.collect()
+        if json_output:
+            report = self.report()
+            if json_output == '-':
+                json.dump(report, sys.stdout, indent=2)
+                print()
+            else:
+                with open(json_output, 'w') as f:
+                    json.dump(report, f, indent=2)
+            return
+
         self.print_header()
+        self.show_collection_summary(elapsed)
         self.get_system_info()
         self.visualize_boot_stages()
         self.get_boot_loader_info()
@@ -264,8 +1474,201 @@ class LinuxBootAnalyzer:
         print()
 
 
+def history_command(args):
+    """Record, ingest, compare and chart boots in the history database"""
+    parser = argparse.ArgumentParser(prog='linux-boot-analyzer.py history',
+                                     description='Boot timing history')
+    parser.add_argument('--db', default=HISTORY_DB, help='SQLite database path')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('record', help='store the current boot')
+    commands.add_parser('ingest', help='store every past boot found in the journal')
+    compare = commands.add_parser('compare', help='compare a boot with the boots before it')
+    compare.add_argument('boot', nargs='?', help='boot ID or prefix (default: latest)')
+    compare.add_argument('--baseline', type=int, default=10, help='number of earlier boots')
+    compare.add_argument('--threshold', type=float, default=3.0,
+                         help='standard deviations that make a regression significant')
+    compare.add_argument('--top', type=int, default=15, help='rows to show')
+    trends = commands.add_parser('trends', help='chart boot (or unit) times over time')
+    trends.add_argument('--unit', help='chart this unit instead of the whole boot')
+    trends.add_argument('--last', type=int, default=30, help='number of boots')
+    options = parser.parse_args(args)
+
+    history = BootHistory(options.db)
+    try:
+        if options.command == 'record':
+            analyzer = LinuxBootAnalyzer()
+            analyzer.collect()
+            try:
+                boot_id, started, phases, units = analyzer.boot_record()
+            except Exception as e:
+                print(f"✗ Could not read this boot's timings: {e}")
+                return
+            if not phases:
+                print("✗ systemd-analyze reported no startup timings (boot still in progress "
+                      "or no systemd)")
+                return
+            history.add_boot(boot_id, started, phases, units)
+            print(f"✓ Recorded boot {boot_id[:12]} ({phases.get('total', 0):.1f}s, "
+                  f"{len(units)} units) in {options.db}")
+
+        elif options.command == 'ingest':
+            start = time.monotonic()
+            analyzer = LinuxBootAnalyzer()
+            try:
+                added, skipped = history.ingest_journal(read_journal=analyzer.journal_boot_entries)
+            except FileNotFoundError:
+                print("✗ journalctl not found")
+                return
+            print(f"✓ Added {added} boots from the journal ({skipped} already known) "
+                  f"in {time.monotonic() - start:.2f}s, "
+                  f"{analyzer.child_processes} child process(es)")
+
+        elif options.command == 'compare':
+            boots = history.boots()
+            if not boots:
+                print("No boots recorded yet, run 'history record' or 'history ingest'")
+                return
+            try:
+                boot_id = history.find_boot(options.boot) if options.boot else boots[-1]['boot_id']
+            except KeyError as e:
+                print(f"✗ {e.args[0]}")
+                return
+            rows = history.compare(boot_id, options.baseline, options.threshold)
+            if not rows:
+                print(f"No boots recorded before {boot_id[:12]} to compare with")
+                return
+            print(f"\nBoot {boot_id[:12]} against up to {options.baseline} earlier boots:\n")
+            print(f"  {'Phase / unit':<42} {'This boot':>10} {'Baseline':>10} {'±':>7} {'z':>6}")
+            for name, value, mean, stdev, z, significant in rows[:options.top]:
+                flag = "  ⚠️  regression" if significant else ""
+                print(f"  {name[:42]:<42} {value:9.3f}s {mean:9.3f}s {stdev:6.3f}s "
+                      f"{z:6.1f}{flag}")
+            regressions = [row[0] for row in rows if row[5]]
+            print(f"\n  {len(regressions)} significant regression(s)"
+                  + (f": {', '.join(regressions[:5])}" if regressions else ""))
+
+        elif options.command == 'trends':
+            if options.unit:
+                points = history.unit_trend(options.unit, options.last)
+                title = options.unit
+            else:
+                points = [(boot['started'], boot['total'] or 0)
+                          for boot in history.boots(options.last)]
+                title = "total boot time"
+            if not points:
+                print("No matching boots recorded")
+                return
+            peak = max(seconds for _, seconds in points)
+            print(f"\n{title}, last {len(points)} boots:\n")
+            for started, seconds in points:
+                day = datetime.fromtimestamp(started).strftime('%Y-%m-%d %H:%M')
+                print(f"  {day}  {seconds:8.3f}s  {bar(seconds, peak)}")
+            values = [seconds for _, seconds in points]
+            print(f"\n  median {statistics.median(values):.3f}s  "
+                  f"min {min(values):.3f}s  max {max(values):.3f}s")
+    finally:
+        history.close()
+
+
+def aggregate_command(args):
+    """Combine JSON reports from many hosts into fleet-wide distributions"""
+    parser = argparse.ArgumentParser(prog='linux-boot-analyzer.py aggregate',
+                                     description='Compare JSON reports from many hosts')
+    parser.add_argument('paths', nargs='+', help='report files or directories of *.json')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='processes used to load reports')
+    parser.add_argument('--k', type=float, default=3.0,
+                        help='median absolute deviations above the median that make an outlier')
+    parser.add_argument('--top', type=int, default=15, help='rows to show per table')
+    parser.add_argument('--json', dest='json_output', help='also write the aggregate here')
+    options = parser.parse_args(args)
+
+    files = list(report_files(options.paths))
+    if not files:
+        print("✗ No report files found")
+        return
+
+    start = time.monotonic()
+    with ProcessPoolExecutor(max_workers=options.workers) as pool:
+        loaded = list(pool.map(load_report_summary, files,
+                               chunksize=max(1, len(files) // (options.workers * 4))))
+    summaries = [summary for summary in loaded if 'error' not in summary]
+    for failed in (summary for summary in loaded if 'error' in summary):
+        print(f"  ⚠️  Skipped {failed['path']}: {failed['error']}")
+    aggregate = aggregate_reports(summaries, options.k)
+    print(f"\n✓ Loaded {len(summaries)} reports in {time.monotonic() - start:.2f}s "
+          f"with {options.workers} worker(s)")
+
+    print(f"\n{'Phase':<42} {'Hosts':>6} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}")
+    for phase in BOOT_PHASES + ['total']:
+        if phase in aggregate['phases']:
+            d = aggregate['phases'][phase]
+            print(f"{phase:<42} {d['hosts']:>6} {d['p50']:8.3f}s {d['p90']:8.3f}s "
+                  f"{d['p99']:8.3f}s {d['max']:8.3f}s")
+
+    slowest = sorted(aggregate['units'].items(), key=lambda item: item[1]['p90'],
+                     reverse=True)[:options.top]
+    print(f"\n{'Unit (slowest p90 first)':<42} {'Hosts':>6} {'p50':>9} {'p90':>9} "
+          f"{'p99':>9} {'max':>9}")
+    for unit, d in slowest:
+        print(f"{unit[:42]:<42} {d['hosts']:>6} {d['p50']:8.3f}s {d['p90']:8.3f}s "
+              f"{d['p99']:8.3f}s {d['max']:8.3f}s")
+
+    print(f"\n🐢 Outlier hosts (total boot time):")
+    for host, seconds, median in aggregate['outlier_hosts'][:options.top]:
+        print(f"  {host:<40} {seconds:8.3f}s (fleet median {median:.3f}s)")
+    if not aggregate['outlier_hosts']:
+        print("  none")
+
+    print(f"\n🐢 Units that are outliers on some hosts (largest excess first):")
+    ranked = sorted(aggregate['outlier_units'].items(),
+                    key=lambda item: item[1][0][1] - item[1][0][2], reverse=True)[:options.top]
+    for unit, found in ranked:
+        hosts = ', '.join(f"{host} {seconds:.2f}s" for host, seconds, _ in found[:3])
+        print(f"  {unit[:40]:<40} {len(found):>4} host(s), median {found[0][2]:.3f}s: {hosts}"
+              + (" ..." if len(found) > 3 else ""))
+    if not ranked:
+        print("  none")
+
+    if options.json_output:
+        with open(options.json_output, 'w') as f:
+            json.dump(aggregate, f, indent=2)
+        print(f"\n✓ Saved aggregate to {options.json_output}")
+
+
 def main():
     """Main entry point"""
+    if len(sys.argv) > 1 and sys.argv[1] == 'history':
+        history_command(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == 'aggregate':
+        aggregate_command(sys.argv[2:])
+        return
+
+    # Machine-readable report: --json [FILE] (standard output by default)
+    # and/or a Gantt chart of kernel phases and units: --gantt FILE
+    args = sys.argv[1:]
+
+    def option_value(flag):
+        """Argument after flag, unless it is missing or another option"""
+        following = args[args.index(flag) + 1:]
+        return following[0] if following and not following[0].startswith('-') else None
+
+    json_output = (option_value('--json') or '-') if '--json' in args else None
+    gantt_path = option_value('--gantt') if '--gantt' in args else None
+    if json_output or gantt_path:
+        analyzer = LinuxBootAnalyzer()
+        if json_output:
+            analyzer.run_analysis(json_output)
+        if gantt_path:
+            start = time.monotonic()
+            rows = analyzer.write_gantt(gantt_path)
+            # Keep standard output clean when the JSON report goes there
+            print(f"✓ Wrote {rows} timeline rows to {gantt_path} "
+                  f"in {time.monotonic() - start:.2f}s",
+                  file=sys.stderr if json_output == '-' else sys.stdout)
+        return
+
     analyzer = LinuxBootAnalyzer()
 
     print("\n" + "=" * 80)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for linux-boot-analyzer.py (run with: python3 -m unittest test_linux_boot_analyzer)
+"""
+
+import importlib.util
+import os
+import unittest
+
+spec = importlib.util.spec_from_file_location(
+    'linux_boot_analyzer', os.path.join(os.path.dirname(__file__), 'linux-boot-analyzer.py'))
+analyzer = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(analyzer)
+
+BOOT_LOG = [
+    (0.000, "Linux version 6.8.0"),
+    (0.120, "Trying to unpack rootfs image as initramfs..."),
+    (0.400, "Freeing unused kernel image (initmem) memory: 4096K"),
+    (2.400, "EXT4-fs (vda1): mounted filesystem with ordered data mode"),
+    (2.500, "Run /sbin/init as init process"),
+    (3.000, "e1000: eth0 NIC Link is Up"),
+]
+# Logged hours into uptime, long after the boot finished
+RUNTIME_LOG = [
+    (7200.0, "usb 1-1: new high-speed USB device number 2"),
+    (30000.0, "EXT4-fs (vdb1): mounted filesystem"),
+]
+
+
+def timeline(boot_complete=None):
+    timeline = analyzer.KernelLogTimeline(boot_complete=boot_complete)
+    for timestamp, message in BOOT_LOG + RUNTIME_LOG:
+        timeline.add(timestamp, message)
+    return timeline
+
+
+class KernelLogTimelineTest(unittest.TestCase):
+    def test_gaps_and_phases_stop_at_startup_finished(self):
+        result = timeline(boot_complete=4.0)
+        self.assertEqual(max(gap for gap, _, _ in result.slowest_gaps()), 2.0)
+        self.assertEqual(result.phases()[-1][1:], ("Startup finished", 2.5, 4.0))
+        self.assertEqual(result.messages, len(BOOT_LOG) + len(RUNTIME_LOG))
+
+    def test_gaps_and_phases_stop_at_last_milestone(self):
+        result = timeline()
+        self.assertEqual([phase[1] for phase in result.phases()],
+                         ["Kernel init done", "Root mounted", "Init started"])
+        self.assertLessEqual(max(after[0] for _, _, after in result.slowest_gaps()), 2.5)
+
+    def test_milestones(self):
+        result = timeline(boot_complete=4.0)
+        self.assertEqual(set(result.milestones), {'kernel_done', 'root_mounted', 'init_started'})
+        self.assertEqual(result.initramfs, 0.120)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,31 +6,276 @@ Analyzes .bash_history to show usage patterns, statistics, and efficiency tips
 
 import os
 import re
-from collections import Counter, defaultdict
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-import subprocess
 
+CHUNK_SIZE = 1 << 20  # bytes read from the history file at a time
+SPLIT_SIZE = 64 << 20  # bash/fish files larger than this are split across workers
+
+# History file name -> shell format
+HISTORY_FILES = {
+    '.bash_history': 'bash',
+    '.sh_history': 'bash',
+    '.history': 'bash',
+    '.zsh_history': 'zsh',
+    '.histfile': 'zsh',
+    'fish_history': 'fish',
+}
+ZSH_EXTENDED = re.compile(r'^: \d+:\d+;')
+ZSH_META = re.compile(rb'\x83(.)', re.S)
+
+# Command categories for classification
+CATEGORIES = {
+    'navigation': ['cd', 'ls', 'pwd', 'pushd', 'popd', 'dirs'],
+    'file_operations': ['cp', 'mv', 'rm', 'touch', 'mkdir', 'rmdir', 'ln'],
+    'viewing': ['cat', 'less', 'more', 'head', 'tail', 'nano', 'vi', 'vim'],
+    'searching': ['grep', 'find', 'locate', 'which', 'whereis', 'awk', 'sed'],
+    'system': ['ps', 'top', 'htop', 'kill', 'systemctl', 'service', 'sudo'],
+    'network': ['ping', 'curl', 'wget', 'ssh', 'scp', 'netstat', 'ifconfig'],
+    'package': ['apt', 'apt-get', 'yum', 'dnf', 'pip', 'npm', 'brew'],
+    'git': ['git', 'github', 'gitlab'],
+    'compression': ['tar', 'zip', 'unzip', 'gzip', 'gunzip', 'bzip2'],
+    'permissions': ['chmod', 'chown', 'chgrp', 'umask']
+}
+
+# command -> category (the first category listing it wins)
+COMMAND_CATEGORY = {}
+for _category, _commands in CATEGORIES.items():
+    for _command in _commands:
+        COMMAND_CATEGORY.setdefault(_command, _category)
+
+
+def base_command(command):
+    """The command name of a command line, without a leading sudo"""
+    words = command.split(None, 2)
+    if not words:
+        return ''
+    if words[0] == 'sudo' and len(words) > 1:
+        words = words[1:]
+    # Handle pipes - get first command before pipe
+    return words[0].split('|')[0].strip()
+
+
+def decode_lines(data, unmetafy=False):
+    """Stripped, non-empty lines of complete-line bytes"""
+    if unmetafy and b'\x83' in data:
+        # zsh writes special bytes as Meta (0x83) followed by the byte xor 32
+        data = ZSH_META.sub(lambda match: bytes([match.group(1)[0] ^ 32]), data)
+    for line in data.decode('utf-8', 'ignore').split('\n'):
+        line = line.strip()
+        if line:
+            yield line
+
+
+def iter_history_lines(path, chunk_size=CHUNK_SIZE, start=0, end=None, unmetafy=False):
+    """Stripped, non-empty lines of a history file, read in fixed-size chunks
+
+    With a byte range, yields the lines that start inside [start, end), so
+    consecutive ranges cover every line exactly once.
+    """
+    with open(path, 'rb') as f:
+        if start:
+            f.seek(start - 1)
+            f.readline()  # the line in progress at `start` belongs to the previous range
+        position = f.tell()
+        remainder = b''
+        while end is None or position < end:
+            chunk = f.read(chunk_size if end is None else min(chunk_size, end - position))
+            if not chunk:
+                break
+            position += len(chunk)
+            data = remainder + chunk
+            cut = data.rfind(b'\n')
+            if cut < 0:
+                remainder = data
+                continue
+            # Cutting at a newline never splits a multi-byte UTF-8 character
+            remainder = data[cut + 1:]
+            yield from decode_lines(data[:cut], unmetafy)
+        if remainder and end is not None:
+            remainder += f.readline()  # finish the line that started before `end`
+        yield from decode_lines(remainder, unmetafy)
+
+
+def iter_commands(lines, shell='bash'):
+    """Commands from the lines of a bash, zsh (plain or extended) or fish history"""
+    if shell == 'fish':
+        # - cmd: git status
+        #   when: 1700000000
+        for line in lines:
+            if line.startswith('- cmd: '):
+                command = line[7:].replace('\\\\', '\0').replace('\\n', '\n')
+                yield command.replace('\0', '\\').strip()
+    elif shell == 'zsh':
+        # : 1700000000:0;git status (multi-line commands end lines with a backslash)
+        pending = ''
+        for line in lines:
+            if not pending and line.startswith(': ') and ZSH_EXTENDED.match(line):
+                line = line[line.index(';') + 1:]
+            if line.endswith('\\'):
+                pending += line[:-1] + '\n'
+                continue
+            command = (pending + line).strip()
+            pending = ''
+            if command:
+                yield command
+        if pending.strip():
+            yield pending.strip()
+    else:
+        for line in lines:
+            if line[0] == '#' and line[1:].isdigit():
+                continue  # HISTTIMEFORMAT timestamp
+            yield line
+
+
+def history_shell(path):
+    """Shell format of a history file, from its name"""
+    return HISTORY_FILES.get(os.path.basename(path), 'bash')
+
+
+def history_owner(path, root):
+    """Home directory a history file belongs to, relative to the dump root"""
+    home = os.path.dirname(path)
+    if os.path.basename(path) == 'fish_history':
+        home = os.path.dirname(os.path.dirname(os.path.dirname(home)))  # .local/share/fish
+    return os.path.relpath(home, root)
+
+
+def find_history_files(root):
+    """(path, shell, owner) of every known history file under a directory"""
+    for directory, _, names in os.walk(root):
+        for name in sorted(names):
+            if name in HISTORY_FILES:
+                path = os.path.join(directory, name)
+                yield path, HISTORY_FILES[name], history_owner(path, root)
+
+
+def analyze_part(task):
+    """HistoryStats for one file, or one byte range of it (runs in a worker process)"""
+    path, shell, start, end = task
+    lines = iter_history_lines(path, start=start, end=end, unmetafy=shell == 'zsh')
+    return HistoryStats().add_lines(iter_commands(lines, shell))
+
+
+class HistoryStats:
+    """Every statistic of the report, fed one command at a time in a single pass
+
+    Memory does not grow with the number of commands, only with the number of
+    distinct command names (and pairs of them).
+    """
 
-class BashHistoryAnalyzer:
     def __init__(self):
+        self.total = 0
+        self.command_stats = Counter()  # base command -> count
+        self.category_counts = Counter()  # category -> count
+        self.sequences = Counter()  # (cmd1, cmd2) run one after the other -> count
+        self.pipes = 0
+        self.redirect_output = 0
+        self.redirect_input = 0
+        self.most_pipes = ''  # command with the most pipes
+        self.sudo = 0
+        self.long = 0
+        self.flags = 0
+        self.cd_ls = 0
+        self.standalone_grep = 0
+        self.history_grep = 0
+        self.longest = ''
+        self.first = ''  # first and last commands, to join consecutive parts
+        self.first_base = ''
+        self.previous = ''
+        self.previous_base = ''
+
+    def add(self, cmd):
+        """Account for one (stripped, non-empty) command line"""
+        self.total += 1
+        base_cmd = base_command(cmd)
+        if self.total == 1:
+            self.first, self.first_base = cmd, base_cmd
+        if base_cmd:
+            self.command_stats[base_cmd] += 1
+            category = COMMAND_CATEGORY.get(base_cmd)
+            if category:
+                self.category_counts[category] += 1
+            if self.previous_base:
+                self.sequences[self.previous_base, base_cmd] += 1
+
+        if '|' in cmd:
+            self.pipes += 1
+            if cmd.count('|') > self.most_pipes.count('|'):
+                self.most_pipes = cmd
+        elif cmd.startswith('grep '):
+            self.standalone_grep += 1
+        if '>' in cmd:
+            self.redirect_output += 1
+        if '<' in cmd:
+            self.redirect_input += 1
+        if cmd.startswith('sudo'):
+            self.sudo += 1
+        if len(cmd) > 50:
+            self.long += 1
+        if len(cmd) > len(self.longest):
+            self.longest = cmd
+        if ' -' in cmd:
+            self.flags += 1
+        if 'history' in cmd and 'grep' in cmd:
+            self.history_grep += 1
+        if cmd.startswith('ls') and self.previous.startswith('cd '):
+            self.cd_ls += 1
+
+        self.previous = cmd
+        self.previous_base = base_cmd
+
+    def add_lines(self, lines):
+        for line in lines:
+            self.add(line)
+        return self
+
+    def merge(self, other, continuous=False):
+        """Add another part's statistics; continuous when it directly follows this one
+
+        Parts of the same file are continuous, so the command pair across the
+        boundary still counts as a sequence; separate files are not.
+        """
+        if continuous and other.total:
+            if self.previous_base and other.first_base:
+                self.sequences[self.previous_base, other.first_base] += 1
+            if other.first.startswith('ls') and self.previous.startswith('cd '):
+                self.cd_ls += 1
+        if not self.total:
+            self.first, self.first_base = other.first, other.first_base
+        if other.total:
+            self.previous, self.previous_base = other.previous, other.previous_base
+
+        self.total += other.total
+        self.command_stats.update(other.command_stats)
+        self.category_counts.update(other.category_counts)
+        self.sequences.update(other.sequences)
+        for name in ('pipes', 'redirect_output', 'redirect_input', 'sudo', 'long', 'flags',
+                     'cd_ls', 'standalone_grep', 'history_grep'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        if other.most_pipes.count('|') > self.most_pipes.count('|'):
+            self.most_pipes = other.most_pipes
+        if len(other.longest) > len(self.longest):
+            self.longest = other.longest
+        return self
+
+
+class BashHistoryAnalyzer:
+    def __init__(self, bulk_root=None, workers=None):
         self.history_file = os.path.expanduser('~/.bash_history')
-        self.commands = []
-        self.command_stats = Counter()
-        self.command_categories = defaultdict(list)
-
-        # Command categories for classification
-        self.categories = {
-            'navigation': ['cd', 'ls', 'pwd', 'pushd', 'popd', 'dirs'],
-            'file_operations': ['cp', 'mv', 'rm', 'touch', 'mkdir', 'rmdir', 'ln'],
-            'viewing': ['cat', 'less', 'more', 'head', 'tail', 'nano', 'vi', 'vim'],
-            'searching': ['grep', 'find', 'locate', 'which', 'whereis', 'awk', 'sed'],
-            'system': ['ps', 'top', 'htop', 'kill', 'systemctl', 'service', 'sudo'],
-            'network': ['ping', 'curl', 'wget', 'ssh', 'scp', 'netstat', 'ifconfig'],
-            'package': ['apt', 'apt-get', 'yum', 'dnf', 'pip', 'npm', 'brew'],
-            'git': ['git', 'github', 'gitlab'],
-            'compression': ['tar', 'zip', 'unzip', 'gzip', 'gunzip', 'bzip2'],
-            'permissions': ['chmod', 'chown', 'chgrp', 'umask']
-        }
+        self.bulk_root = bulk_root  # analyze every history file under this directory
+        self.workers = workers or os.cpu_count()
+        self.history_files = []  # (path, shell, owner) analyzed
+        self.skipped_files = []  # (path, error) of history files that could not be read
+        self.owner_stats = {}  # owner -> HistoryStats, in bulk mode
+        self.stats = HistoryStats()
+        self.categories = CATEGORIES
+
+    @property
+    def command_stats(self):
+        return self.stats.command_stats
 
     def colorize(self, text, color_code):
         """Add color to terminal output"""
@@ -44,16 +289,20 @@ class BashHistoryAnalyzer:
         print()
 
     def load_history(self):
-        """Load commands from bash history file"""
+        """Stream the history file through the statistics in a single pass"""
+        if self.bulk_root:
+            return self.load_bulk_history()
         if not os.path.exists(self.history_file):
             print(f"Error: History file not found at {self.history_file}")
             return False
 
         try:
-            with open(self.history_file, 'r', encoding='utf-8', errors='ignore') as f:
-                self.commands = [line.strip() for line in f if line.strip()]
+            shell = history_shell(self.history_file)
+            self.history_files = [(self.history_file, shell, None)]
+            lines = iter_history_lines(self.history_file, unmetafy=shell == 'zsh')
+            self.stats = HistoryStats().add_lines(iter_commands(lines, shell))
 
-            if not self.commands:
+            if not self.stats.total:
                 print("Warning: History file is empty")
                 return False
 
@@ -62,45 +311,98 @@ class BashHistoryAnalyzer:
             print(f"Error reading history file: {e}")
             return False
 
-    def extract_base_command(self, command):
-        """Extract the base command from a full command line"""
-        # Remove leading sudo
-        command = re.sub(r'^sudo\s+', '', command)
-
-        # Extract first word (the command)
-        parts = command.split()
-        if parts:
-            # Handle pipes - get first command before pipe
-            base = parts[0].split('|')[0].strip()
-            return base
-        return ''
+    def load_bulk_history(self):
+        """Analyze every history file under bulk_root in a process pool and merge the results"""
+        self.history_files = list(find_history_files(self.bulk_root))
+        if not self.history_files:
+            print(f"Error: No history files found under {self.bulk_root}")
+            return False
 
-    def analyze_commands(self):
-        """Analyze command usage patterns"""
-        for cmd in self.commands:
-            base_cmd = self.extract_base_command(cmd)
-            if base_cmd:
-                self.command_stats[base_cmd] += 1
+        # One task per file; big bash/fish files are split at line boundaries
+        # (zsh multi-line commands could straddle a split, so they stay whole)
+        files = []
+        for path, shell, owner in self.history_files:
+            try:
+                size = os.path.getsize(path)
+            except OSError as e:
+                self.skipped_files.append((path, e))
+                continue
+            parts = 1 if shell == 'zsh' else max(1, -(-size // SPLIT_SIZE))
+            ends = [(part + 1) * SPLIT_SIZE for part in range(parts - 1)] + [None]
+            tasks = [(path, shell, part * SPLIT_SIZE, end) for part, end in enumerate(ends)]
+            files.append(((path, shell, owner), tasks))
+
+        # An unreadable file is skipped as a whole; the rest are still merged
+        analyzed = []
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [(entry, [pool.submit(analyze_part, task) for task in tasks])
+                       for entry, tasks in files]
+            for (path, shell, owner), parts in futures:
+                try:
+                    results = [future.result() for future in parts]
+                except OSError as e:
+                    self.skipped_files.append((path, e))
+                    continue
+                # Merge in order so the parts of a file join up
+                owner_stats = self.owner_stats.setdefault(owner, HistoryStats())
+                for index, part in enumerate(results):
+                    owner_stats.merge(part, continuous=index > 0)
+                analyzed.append((path, shell, owner))
+        self.history_files = analyzed
+
+        if self.skipped_files:
+            print(f"Warning: Skipped {len(self.skipped_files)} unreadable history files")
+            for path, error in self.skipped_files[:5]:
+                print(f"  {path}: {error.strerror or error}")
+            if len(self.skipped_files) > 5:
+                print(f"  ... and {len(self.skipped_files) - 5} more")
+        if not analyzed:
+            print(f"Error: None of the history files under {self.bulk_root} could be read")
+            return False
 
-                # Categorize command
-                for category, cmds in self.categories.items():
-                    if base_cmd in cmds:
-                        self.command_categories[category].append(cmd)
-                        break
+        self.stats = HistoryStats()
+        for owner_stats in self.owner_stats.values():
+            self.stats.merge(owner_stats)
+        if not self.stats.total:
+            print("Warning: History files are empty")
+            return False
+        return True
+
+    def extract_base_command(self, command):
+        """Extract the base command from a full command line"""
+        return base_command(command)
 
     def show_basic_statistics(self):
         """Show basic statistics about command history"""
         print(self.colorize("📊 BASIC STATISTICS", "1;93"))
         print("-" * 80)
-        print(f"  Total Commands in History: {len(self.commands)}")
+        print(f"  Total Commands in History: {self.stats.total}")
         print(f"  Unique Commands Used: {len(self.command_stats)}")
-        print(f"  History File Location: {self.history_file}")
+        if self.bulk_root:
+            shells = Counter(shell for _, shell, _ in self.history_files)
+            print(f"  History Files: {len(self.history_files)} under {self.bulk_root} ("
+                  + ", ".join(f"{shell} {count}" for shell, count in shells.most_common()) + ")")
+            print(f"  Users: {len(self.owner_stats)}")
+            if self.skipped_files:
+                print(f"  Skipped Files: {len(self.skipped_files)} (unreadable)")
+        else:
+            print(f"  History File Location: {self.history_file}")
 
         # Calculate file size
-        file_size = os.path.getsize(self.history_file)
+        file_size = sum(os.path.getsize(path) for path, _, _ in self.history_files)
         print(f"  History File Size: {file_size / 1024:.2f} KB")
         print()
 
+    def show_user_summary(self, n=10):
+        """Most active users in bulk mode"""
+        print(self.colorize(f"👥 TOP {n} USERS", "1;93"))
+        print("-" * 80)
+        ranked = sorted(self.owner_stats.items(), key=lambda item: item[1].total, reverse=True)
+        for owner, stats in ranked[:n]:
+            top = ', '.join(cmd for cmd, _ in stats.command_stats.most_common(3))
+            print(f"  {owner[:40]:<40} {stats.total:>10}  {top}")
+        print()
+
     def show_top_commands(self, n=15):
         """Show most frequently used commands"""
         print(self.colorize(f"🏆 TOP {n} MOST USED COMMANDS", "1;93"))
@@ -108,7 +410,7 @@ class BashHistoryAnalyzer:
         print(f"  {'Rank':<6} {'Command':<20} {'Count':<10} {'Percentage':<12} {'Bar'}")
         print("-" * 80)
 
-        total = len(self.commands)
+        total = self.stats.total
         for i, (cmd, count) in enumerate(self.command_stats.most_common(n), 1):
             percentage = (count / total) * 100
             bar_length = int(percentage / 2)  # Scale down for display
@@ -122,23 +424,24 @@ class BashHistoryAnalyzer:
         print(self.colorize("📂 COMMAND USAGE BY CATEGORY", "1;93"))
         print("-" * 80)
 
-        category_counts = {cat: len(cmds) for cat, cmds in self.command_categories.items()}
+        category_counts = self.stats.category_counts
+        total = self.stats.total
         sorted_categories = sorted(category_counts.items(), key=lambda x: x[1], reverse=True)
 
         total_categorized = sum(category_counts.values())
 
         for category, count in sorted_categories:
             if count > 0:
-                percentage = (count / len(self.commands)) * 100
+                percentage = (count / total) * 100
                 bar_length = int(percentage / 2)
                 bar = '▓' * bar_length
 
                 category_display = category.replace('_', ' ').title()
                 print(f"  {category_display:<20} {count:>5} ({percentage:>5.1f}%)  {bar}")
 
-        uncategorized = len(self.commands) - total_categorized
+        uncategorized = total - total_categorized
         if uncategorized > 0:
-            percentage = (uncategorized / len(self.commands)) * 100
+            percentage = (uncategorized / total) * 100
             print(f"  {'Other/Uncategorized':<20} {uncategorized:>5} ({percentage:>5.1f}%)")
         print()
 
@@ -147,17 +450,14 @@ class BashHistoryAnalyzer:
         print(self.colorize("🔀 PIPES & REDIRECTION USAGE", "1;93"))
         print("-" * 80)
 
-        pipe_commands = [cmd for cmd in self.commands if '|' in cmd]
-        redirect_output = [cmd for cmd in self.commands if '>' in cmd or '>>' in cmd]
-        redirect_input = [cmd for cmd in self.commands if '<' in cmd]
+        stats = self.stats
+        print(f"  Commands with Pipes (|):           {stats.pipes}")
+        print(f"  Commands with Output Redirect (>): {stats.redirect_output}")
+        print(f"  Commands with Input Redirect (<):  {stats.redirect_input}")
 
-        print(f"  Commands with Pipes (|):           {len(pipe_commands)}")
-        print(f"  Commands with Output Redirect (>): {len(redirect_output)}")
-        print(f"  Commands with Input Redirect (<):  {len(redirect_input)}")
-
-        if pipe_commands:
+        if stats.pipes:
             print(f"\n  Most Complex Pipe Chain:")
-            max_pipes = max(pipe_commands, key=lambda x: x.count('|'))
+            max_pipes = stats.most_pipes
             pipe_count = max_pipes.count('|')
             print(f"    {pipe_count + 1} commands chained:")
             print(f"    {max_pipes[:70]}..." if len(max_pipes) > 70 else f"    {max_pipes}")
@@ -168,17 +468,15 @@ class BashHistoryAnalyzer:
         print(self.colorize("🔍 COMMON COMMAND PATTERNS", "1;93"))
         print("-" * 80)
 
-        # Find commands with sudo
-        sudo_commands = [cmd for cmd in self.commands if cmd.startswith('sudo')]
-        print(f"  Commands run with sudo: {len(sudo_commands)} ({len(sudo_commands) / len(self.commands) * 100:.1f}%)")
+        stats = self.stats
+        # Commands with sudo
+        print(f"  Commands run with sudo: {stats.sudo} ({stats.sudo / stats.total * 100:.1f}%)")
 
-        # Find long commands
-        long_commands = [cmd for cmd in self.commands if len(cmd) > 50]
-        print(f"  Long commands (>50 chars): {len(long_commands)}")
+        # Long commands
+        print(f"  Long commands (>50 chars): {stats.long}")
 
-        # Find commands with options/flags
-        flag_commands = [cmd for cmd in self.commands if ' -' in cmd]
-        print(f"  Commands with flags: {len(flag_commands)} ({len(flag_commands) / len(self.commands) * 100:.1f}%)")
+        # Commands with options/flags
+        print(f"  Commands with flags: {stats.flags} ({stats.flags / stats.total * 100:.1f}%)")
 
         print()
 
@@ -188,10 +486,11 @@ class BashHistoryAnalyzer:
         print("-" * 80)
 
         suggestions = []
+        stats = self.stats
 
         # Check for repetitive cd commands
         cd_count = self.command_stats.get('cd', 0)
-        if cd_count > len(self.commands) * 0.15:
+        if cd_count > stats.total * 0.15:
             suggestions.append({
                 'title': 'Too many cd commands',
                 'tip': 'Consider using aliases or CDPATH variable for frequently visited directories',
@@ -199,12 +498,7 @@ class BashHistoryAnalyzer:
             })
 
         # Check for repeated ls after cd
-        repeated_cd_ls = 0
-        for i in range(len(self.commands) - 1):
-            if self.commands[i].startswith('cd ') and self.commands[i + 1].startswith('ls'):
-                repeated_cd_ls += 1
-
-        if repeated_cd_ls > 10:
+        if stats.cd_ls > 10:
             suggestions.append({
                 'title': 'Frequent cd + ls pattern detected',
                 'tip': 'Create a function that combines cd and ls',
@@ -222,8 +516,7 @@ class BashHistoryAnalyzer:
             })
 
         # Check for grep without pipes
-        standalone_grep = len([cmd for cmd in self.commands if cmd.startswith('grep ') and '|' not in cmd])
-        if standalone_grep > 5:
+        if stats.standalone_grep > 5:
             suggestions.append({
                 'title': 'Standalone grep usage detected',
                 'tip': 'Combine grep with other commands using pipes for powerful filtering',
@@ -231,8 +524,7 @@ class BashHistoryAnalyzer:
             })
 
         # Check for lack of history search
-        history_grep = len([cmd for cmd in self.commands if 'history' in cmd and 'grep' in cmd])
-        if history_grep < 2:
+        if stats.history_grep < 2:
             suggestions.append({
                 'title': 'Not using history search',
                 'tip': 'Use Ctrl+R for reverse history search or history | grep',
@@ -255,25 +547,17 @@ class BashHistoryAnalyzer:
         print("-" * 80)
 
         # Longest command
-        if self.commands:
-            longest = max(self.commands, key=len)
+        if self.stats.total:
+            longest = self.stats.longest
             print(f"  Longest Command ({len(longest)} chars):")
             print(f"    {longest[:70]}..." if len(longest) > 70 else f"    {longest}")
             print()
 
         # Most common command sequence
-        sequences = []
-        for i in range(len(self.commands) - 1):
-            cmd1 = self.extract_base_command(self.commands[i])
-            cmd2 = self.extract_base_command(self.commands[i + 1])
-            if cmd1 and cmd2:
-                sequences.append(f"{cmd1} → {cmd2}")
-
-        if sequences:
-            seq_counter = Counter(sequences)
-            most_common_seq = seq_counter.most_common(1)[0]
+        if self.stats.sequences:
+            (cmd1, cmd2), count = self.stats.sequences.most_common(1)[0]
             print(f"  Most Common Command Sequence:")
-            print(f"    {most_common_seq[0]} (appeared {most_common_seq[1]} times)")
+            print(f"    {cmd1} → {cmd2} (appeared {count} times)")
             print()
 
     def export_report(self, filename='bash_history_report.txt'):
@@ -287,13 +571,13 @@ class BashHistoryAnalyzer:
                 f.write("=" * 60 + "\n")
                 f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
 
-                f.write(f"Total Commands: {len(self.commands)}\n")
+                f.write(f"Total Commands: {self.stats.total}\n")
                 f.write(f"Unique Commands: {len(self.command_stats)}\n\n")
 
                 f.write("TOP 20 COMMANDS:\n")
                 f.write("-" * 60 + "\n")
                 for i, (cmd, count) in enumerate(self.command_stats.most_common(20), 1):
-                    percentage = (count / len(self.commands)) * 100
+                    percentage = (count / self.stats.total) * 100
                     f.write(f"{i:3}. {cmd:<20} {count:>6} ({percentage:>5.1f}%)\n")
 
                 f.write("\n" + "=" * 60 + "\n")
@@ -314,10 +598,10 @@ class BashHistoryAnalyzer:
         print(self.colorize("Analyzing your bash command history...", "93"))
         print()
 
-        self.analyze_commands()
-
         self.show_basic_statistics()
         self.show_top_commands(15)
+        if self.bulk_root:
+            self.show_user_summary()
         self.show_command_categories()
         self.analyze_pipes_and_redirection()
         self.show_common_patterns()
@@ -333,7 +617,19 @@ class BashHistoryAnalyzer:
 
 def main():
     """Main entry point"""
-    analyzer = BashHistoryAnalyzer()
+    parser = argparse.ArgumentParser(prog='bash-history-analyzer.py',
+                                     description='Analyze shell command history')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--file', help='history file to analyze (bash, zsh or fish, from its name)')
+    source.add_argument('--bulk', metavar='DIR',
+                        help='analyze every history file under a directory, such as a fleet dump')
+    parser.add_argument('--workers', type=int,
+                        help='processes used in bulk mode (default: all cores)')
+    options = parser.parse_args()
+
+    analyzer = BashHistoryAnalyzer(options.bulk, options.workers)
+    if options.file:
+        analyzer.history_file = options.file
     analyzer.run_analysis()
 
 
@@ -8,11 +8,47 @@ import subprocess
 import re
 import time
 import json
+import socket
+import struct
+import hmac
+import hashlib
+import ipaddress
+import socketserver
+import sys
+import os
+import math
+import random
+import resource
+import argparse
+import tempfile
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from datetime import datetime, timedelta
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, deque
 import threading
 
+# Replication wire format (network byte order):
+#   frame   = header | batch | HMAC-SHA256(header | batch)
+#   header  = magic, version, reserved, batch length
+#   batch   = origin length, origin, incarnation, event count, events...
+#   event   = type, sequence, address length, packed address, duration, service length, service
+EVENT_BAN = 1
+EVENT_UNBAN = 2
+FRAME_MAGIC = b'IB'
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct('!2sBBI')
+BATCH_HEADER = struct.Struct('!QH')
+EVENT_HEADER = struct.Struct('!BQB')
+EVENT_TRAILER = struct.Struct('!IB')
+DIGEST_SIZE = hashlib.sha256().digest_size
+MAX_FRAME_SIZE = 1 << 20
+ACK = b'\x06'
+
+# Histogram bucket upper bounds (seconds)
+BAN_LATENCY_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+FIREWALL_DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
 
 class DynamicIPBlocker:
     def __init__(self):
@@ -24,10 +60,13 @@ class DynamicIPBlocker:
         self.banned_ips = self.load_banned_ips()
         self.failed_attempts = defaultdict(list)
         self.monitoring = False
+        self.lock = threading.RLock()
+        self.replicator = None
+        self.metrics = None
 
-    def load_config(self):
-        """Load configuration"""
-        default_config = {
+    def get_default_config(self):
+        """Default configuration"""
+        return {
             'ssh': {
                 'enabled': True,
                 'log_file': '/var/log/auth.log',
@@ -54,13 +93,38 @@ class DynamicIPBlocker:
             },
             'whitelist': ['127.0.0.1', '::1'],
             'auto_unblock': True,
-            'notification_email': ''
+            'notification_email': '',
+            'replication': {
+                'enabled': False,
+                'node_id': socket.gethostname(),
+                'listen_host': '0.0.0.0',
+                'listen_port': 9595,
+                'peers': [],  # ["10.0.0.2:9595", ...]
+                'shared_secret': '',
+                'batch_size': 100,
+                'batch_interval': 0.5  # seconds
+            },
+            'metrics': {
+                'enabled': False,
+                'listen_host': '127.0.0.1',
+                'listen_port': 9596
+            }
         }
 
+    def load_config(self):
+        """Load configuration"""
+        default_config = self.get_default_config()
+
         if self.config_file.exists():
             with open(self.config_file, 'r') as f:
                 loaded = json.load(f)
-                return {**default_config, **loaded}
+
+            config = {**default_config, **loaded}
+            for key, value in default_config.items():
+                # Fill in new options missing from older per-section configs
+                if isinstance(value, dict) and isinstance(loaded.get(key), dict):
+                    config[key] = {**value, **loaded[key]}
+            return config
 
         self.save_config(default_config)
         return default_config
@@ -101,62 +165,86 @@ class DynamicIPBlocker:
         """Check if IP is whitelisted"""
         return ip in self.config['whitelist']
 
-    def block_ip(self, ip, service='manual', duration=3600):
+    def run_firewall(self, action, ip):
+        """Insert or delete the iptables DROP rule for an IP"""
+        flag = '-I' if action == 'block' else '-D'
+        started = time.perf_counter()
+
+        try:
+            subprocess.run(['sudo', 'iptables', flag, 'INPUT', '-s', ip, '-j', 'DROP'],
+                           check=True, capture_output=True)
+        finally:
+            if self.metrics:
+                self.metrics.observe('firewall_command_seconds', (action,),
+                                     time.perf_counter() - started)
+
+    def block_ip(self, ip, service='manual', duration=3600, replicate=True, origin=None):
         """Block IP using iptables"""
         if self.is_whitelisted(ip):
             self.log(f"⚠️  IP {ip} is whitelisted, skipping block")
             return False
 
-        if ip in self.banned_ips:
-            self.log(f"IP {ip} is already blocked")
-            return False
+        with self.lock:
+            if ip in self.banned_ips:
+                self.log(f"IP {ip} is already blocked")
+                return False
 
-        try:
-            # Add iptables DROP rule
-            subprocess.run(['sudo', 'iptables', '-I', 'INPUT', '-s', ip, '-j', 'DROP'],
-                           check=True, capture_output=True)
+            try:
+                # Add iptables DROP rule
+                self.run_firewall('block', ip)
 
-            # Record ban
-            ban_time = datetime.now()
-            unblock_time = ban_time + timedelta(seconds=duration)
+                # Record ban
+                ban_time = datetime.now()
+                unblock_time = ban_time + timedelta(seconds=duration)
 
-            self.banned_ips[ip] = {
-                'service': service,
-                'banned_at': ban_time.strftime('%Y-%m-%d %H:%M:%S'),
-                'unblock_at': unblock_time.strftime('%Y-%m-%d %H:%M:%S'),
-                'duration': duration
-            }
+                self.banned_ips[ip] = {
+                    'service': service,
+                    'banned_at': ban_time.strftime('%Y-%m-%d %H:%M:%S'),
+                    'unblock_at': unblock_time.strftime('%Y-%m-%d %H:%M:%S'),
+                    'duration': duration
+                }
+                if origin:
+                    self.banned_ips[ip]['origin'] = origin
 
-            self.save_banned_ips()
+                self.save_banned_ips()
 
-            self.log(f"🚫 BLOCKED: {ip} ({service}) - Duration: {duration}s")
-            return True
+            except subprocess.CalledProcessError as e:
+                self.log(f"✗ Failed to block {ip}: {e}")
+                return False
 
-        except subprocess.CalledProcessError as e:
-            self.log(f"✗ Failed to block {ip}: {e}")
-            return False
+        source = f" from peer {origin}" if origin else ""
+        self.log(f"🚫 BLOCKED: {ip} ({service}) - Duration: {duration}s{source}")
 
-    def unblock_ip(self, ip):
+        if replicate and self.replicator:
+            self.replicator.publish(EVENT_BAN, ip, service, duration)
+        return True
+
+    def unblock_ip(self, ip, replicate=True, origin=None):
         """Unblock IP by removing iptables rule"""
-        if ip not in self.banned_ips:
-            self.log(f"IP {ip} is not blocked")
-            return False
+        with self.lock:
+            if ip not in self.banned_ips:
+                if not origin:
+                    self.log(f"IP {ip} is not blocked")
+                return False
 
-        try:
-            # Remove iptables DROP rule
-            subprocess.run(['sudo', 'iptables', '-D', 'INPUT', '-s', ip, '-j', 'DROP'],
-                           check=True, capture_output=True)
+            try:
+                # Remove iptables DROP rule
+                self.run_firewall('unblock', ip)
 
-            service = self.banned_ips[ip]['service']
-            del self.banned_ips[ip]
-            self.save_banned_ips()
+                service = self.banned_ips[ip]['service']
+                del self.banned_ips[ip]
+                self.save_banned_ips()
 
-            self.log(f"✓ UNBLOCKED: {ip} ({service})")
-            return True
+            except subprocess.CalledProcessError as e:
+                self.log(f"✗ Failed to unblock {ip}: {e}")
+                return False
 
-        except subprocess.CalledProcessError as e:
-            self.log(f"✗ Failed to unblock {ip}: {e}")
-            return False
+        source = f" from peer {origin}" if origin else ""
+        self.log(f"✓ UNBLOCKED: {ip} ({service}){source}")
+
+        if replicate and self.replicator:
+            self.replicator.publish(EVENT_UNBAN, ip, service)
+        return True
 
     def check_failed_attempts(self, ip, service):
         """Check if IP has exceeded failed attempt threshold"""
@@ -202,9 +290,15 @@ class DynamicIPBlocker:
                         time.sleep(0.1)
                         continue
 
+                    if self.metrics:
+                        self.metrics.inc('lines_processed_total', (service,))
+
                     # Search for IP in line
                     match = pattern.search(line)
                     if match:
+                        if self.metrics:
+                            self.metrics.inc('regex_matches_total', (service,))
+
                         ip = match.group(1)
 
                         if self.is_whitelisted(ip):
@@ -221,7 +315,11 @@ class DynamicIPBlocker:
                         # Check if should block
                         if self.check_failed_attempts(ip, service):
                             ban_duration = service_config['ban_duration']
-                            self.block_ip(ip, service, ban_duration)
+                            first_attempt = self.failed_attempts[ip][0]
+
+                            if self.block_ip(ip, service, ban_duration) and self.metrics:
+                                latency = (datetime.now() - first_attempt).total_seconds()
+                                self.metrics.observe('ban_latency_seconds', (service,), latency)
 
                             # Clear attempts for this IP
                             del self.failed_attempts[ip]
@@ -239,7 +337,10 @@ class DynamicIPBlocker:
             now = datetime.now()
 
             ips_to_unblock = []
-            for ip, info in self.banned_ips.items():
+            with self.lock:
+                banned = list(self.banned_ips.items())
+
+            for ip, info in banned:
                 unblock_time = datetime.strptime(info['unblock_at'], '%Y-%m-%d %H:%M:%S')
 
                 if now >= unblock_time:
@@ -267,6 +368,17 @@ class DynamicIPBlocker:
                 thread.start()
                 threads.append(thread)
 
+        # Start Prometheus metrics endpoint
+        if self.config['metrics']['enabled']:
+            self.metrics = BlockerMetrics(self)
+            self.metrics.start()
+
+        # Start ban-list replication with peer nodes
+        if self.config['replication']['enabled']:
+            self.replicator = BanReplicator(self)
+            if not self.replicator.start():
+                self.replicator = None
+
         # Start auto-unblock daemon
         if self.config['auto_unblock']:
             unblock_thread = threading.Thread(
@@ -284,8 +396,28 @@ class DynamicIPBlocker:
         except KeyboardInterrupt:
             self.log("⏹️  Stopping Dynamic IP Blocker...")
             self.monitoring = False
+            if self.replicator:
+                self.replicator.stop()
+            if self.metrics:
+                self.metrics.stop()
             time.sleep(2)
 
+    def start_replication_client(self):
+        """Publish manual bans to peers without running the full daemon"""
+        if self.config['replication']['enabled'] and self.config['replication']['peers']:
+            # A separate origin keeps peers from mistaking the daemon's own
+            # (older) incarnation for replays of this short-lived publisher
+            node_id = self.config['replication']['node_id']
+            self.replicator = BanReplicator(self, f"{node_id}/cli-{os.getpid()}")
+            if not self.replicator.start(listen=False):
+                self.replicator = None
+
+    def stop_replication_client(self):
+        """Flush manual ban events to peers"""
+        if self.replicator:
+            self.replicator.stop()
+            self.replicator = None
+
     def list_blocked_ips(self):
         """List all currently blocked IPs"""
         if not self.banned_ips:
@@ -349,9 +481,756 @@ class DynamicIPBlocker:
 
         print(f"\nAuto-unblock: {'✓ Enabled' if self.config['auto_unblock'] else '✗ Disabled'}")
 
+        replication = self.config['replication']
+        if replication['enabled']:
+            print(f"Replication: ✓ Enabled (node {replication['node_id']}, "
+                  f"{len(replication['peers'])} peers)")
+            for peer in replication['peers']:
+                print(f"  → {peer}")
+        else:
+            print("Replication: ✗ Disabled")
+
+        metrics = self.config['metrics']
+        if metrics['enabled']:
+            print(f"Metrics: ✓ http://{metrics['listen_host']}:{metrics['listen_port']}/metrics")
+        else:
+            print("Metrics: ✗ Disabled")
+
+        remote_bans = sum(1 for info in self.banned_ips.values() if 'origin' in info)
+        if remote_bans:
+            print(f"Bans received from peers: {remote_bans}")
+
+
+class BlockerMetrics:
+    """Prometheus-style counters and histograms for the running daemon
+
+    Every thread updates its own shard of counters, so the hot path never
+    takes a lock; shards are only summed when the endpoint is scraped.
+    """
+
+    HISTOGRAMS = {
+        'ban_latency_seconds': ('jail', BAN_LATENCY_BUCKETS,
+                                'Time from first failed attempt to firewall rule installed'),
+        'firewall_command_seconds': ('action', FIREWALL_DURATION_BUCKETS,
+                                     'Duration of iptables commands'),
+    }
+    COUNTERS = {
+        'lines_processed_total': ('jail', 'Log lines read per jail'),
+        'regex_matches_total': ('jail', 'Log lines matching the jail regex'),
+    }
+
+    def __init__(self, blocker):
+        self.blocker = blocker
+        self.config = blocker.config['metrics']
+        self.local = threading.local()
+        self.shards = []
+        self.shards_lock = threading.Lock()
+        self.server = None
+
+    def shard(self):
+        """Return the calling thread's private counter shard"""
+        try:
+            return self.local.shard
+        except AttributeError:
+            shard = {}
+            self.local.shard = shard
+            with self.shards_lock:
+                self.shards.append(shard)
+            return shard
+
+    def inc(self, name, labels=(), value=1):
+        """Increment a counter"""
+        shard = self.shard()
+        key = (name, labels)
+        shard[key] = shard.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        """Record a histogram observation"""
+        shard = self.shard()
+        key = (name, labels)
+        buckets = self.HISTOGRAMS[name][1]
+
+        histogram = shard.get(key)
+        if histogram is None:
+            # Per-bucket counts, then +Inf, sum
+            histogram = shard[key] = [0] * (len(buckets) + 1) + [0.0]
+
+        histogram[bisect_left(buckets, value)] += 1
+        histogram[-1] += value
+
+    def collect(self):
+        """Merge all thread shards into one snapshot"""
+        with self.shards_lock:
+            shards = [shard.copy() for shard in self.shards]
+
+        merged = {}
+        for shard in shards:
+            for key, value in shard.items():
+                if isinstance(value, list):
+                    total = merged.setdefault(key, [0] * len(value))
+                    for i, item in enumerate(value):
+                        total[i] += item
+                else:
+                    merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def tracked_memory(self):
+        """Approximate bytes held by the failed-attempt tracker"""
+        attempts = list(self.blocker.failed_attempts.items())
+        size = sys.getsizeof(self.blocker.failed_attempts)
+
+        for ip, times in attempts:
+            size += sys.getsizeof(ip) + sys.getsizeof(times)
+            size += sum(sys.getsizeof(t) for t in times)
+        return len(attempts), sum(len(times) for _, times in attempts), size
+
+    def render(self):
+        """Render metrics in the Prometheus text exposition format"""
+        snapshot = self.collect()
+        lines = []
+
+        for name, (label, help_text) in self.COUNTERS.items():
+            lines.append(f"# HELP ip_blocker_{name} {help_text}")
+            lines.append(f"# TYPE ip_blocker_{name} counter")
+            for (key, labels), value in sorted(snapshot.items()):
+                if key == name:
+                    lines.append(f'ip_blocker_{name}{{{label}="{labels[0]}"}} {value}')
+
+        for name, (label, buckets, help_text) in self.HISTOGRAMS.items():
+            lines.append(f"# HELP ip_blocker_{name} {help_text}")
+            lines.append(f"# TYPE ip_blocker_{name} histogram")
+            for (key, labels), values in sorted(snapshot.items()):
+                if key != name:
+                    continue
+
+                tag = f'{label}="{labels[0]}"'
+                cumulative = 0
+                for bound, count in zip(buckets + ('+Inf',), values[:-1]):
+                    cumulative += count
+                    lines.append(f'ip_blocker_{name}_bucket{{{tag},le="{bound}"}} {cumulative}')
+                lines.append(f"ip_blocker_{name}_sum{{{tag}}} {values[-1]:.6f}")
+                lines.append(f"ip_blocker_{name}_count{{{tag}}} {cumulative}")
+
+        tracked_ips, tracked_attempts, tracked_bytes = self.tracked_memory()
+        gauges = [
+            ('banned_ips', 'Currently blocked IPs', len(self.blocker.banned_ips)),
+            ('tracked_ips', 'IPs with recent failed attempts', tracked_ips),
+            ('tracked_attempts', 'Failed attempts held in memory', tracked_attempts),
+            ('tracked_memory_bytes', 'Approximate memory used by attempt tracking', tracked_bytes),
+        ]
+        for name, help_text, value in gauges:
+            lines.append(f"# HELP ip_blocker_{name} {help_text}")
+            lines.append(f"# TYPE ip_blocker_{name} gauge")
+            lines.append(f"ip_blocker_{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def start(self):
+        """Serve /metrics over HTTP in a background thread"""
+        address = (self.config['listen_host'], self.config['listen_port'])
+        self.server = ThreadingHTTPServer(address, MetricsHandler)
+        self.server.daemon_threads = True
+        self.server.metrics = self
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.blocker.log(f"📈 Metrics available at http://{address[0]}:{address[1]}/metrics")
+
+    def stop(self):
+        """Stop the metrics endpoint"""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        """Serve the metrics page"""
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+
+        body = self.server.metrics.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Keep scrapes out of the blocker output"""
+
+
+# Synthetic (attack, benign) log lines per service for benchmarking
+SYNTHETIC_LINES = {
+    'ssh': (
+        "{ts} bench sshd[{pid}]: Failed password for invalid user admin from {ip} port {port} ssh2\n",
+        "{ts} bench sshd[{pid}]: Accepted publickey for deploy from 10.0.0.5 port {port} ssh2\n"
+    ),
+    'http': (
+        "[{ts}] [auth_basic:error] [pid {pid}] [client {ip}:{port}] AH01617: "
+        "user admin: authentication failure for \"/admin\": Password Mismatch\n",
+        "[{ts}] [mpm_event:notice] [pid {pid}] AH00489: Apache/2.4 configured -- resuming normal operations\n"
+    ),
+    'ftp': (
+        "{ts} [pid {pid}] [admin] FAIL LOGIN from {ip}\n",
+        "{ts} [pid {pid}] [deploy] OK LOGIN: Client \"10.0.0.5\"\n"
+    ),
+}
+
+
+class BenchmarkBlocker(DynamicIPBlocker):
+    """DynamicIPBlocker wired to temporary logs and a fake firewall backend"""
+
+    def __init__(self, workdir, services, firewall_delay=0.0):
+        self.workdir = Path(workdir)
+        self.services = services
+        self.firewall_delay = firewall_delay
+        self.ban_times = {}
+        super().__init__()
+        self.metrics = BlockerMetrics(self)
+
+    def load_config(self):
+        """Default thresholds, with every benchmarked service reading a temp log"""
+        config = self.get_default_config()
+        for service in ['ssh', 'http', 'ftp']:
+            config[service]['enabled'] = service in self.services
+            config[service]['log_file'] = str(self.workdir / f'{service}.log')
+        return config
+
+    def load_banned_ips(self):
+        return {}
+
+    def save_banned_ips(self):
+        pass
+
+    def log(self, message):
+        pass
+
+    def run_firewall(self, action, ip):
+        """Record when the rule would have been installed"""
+        if self.firewall_delay:
+            time.sleep(self.firewall_delay)
+        if action == 'block':
+            self.ban_times[ip] = time.perf_counter()
+
+
+def attacker_picker(options, rng):
+    """Return a function choosing the attacker for the next attack line"""
+    attackers = options.attackers
+
+    if options.distribution == 'zipf':
+        weights = [1 / (rank + 1) ** options.zipf_exponent for rank in range(attackers)]
+        cum_weights = list(weights)
+        for i in range(1, attackers):
+            cum_weights[i] += cum_weights[i - 1]
+        total = cum_weights[-1]
+        return lambda: bisect_left(cum_weights, rng.random() * total)
+
+    if options.distribution == 'burst':
+        # Each attacker sends a run of attempts before the next one shows up
+        state = {'attacker': 0, 'left': options.burst_length}
+
+        def next_burst():
+            if state['left'] == 0:
+                state['attacker'] = (state['attacker'] + 1) % attackers
+                state['left'] = options.burst_length
+            state['left'] -= 1
+            return state['attacker']
+        return next_burst
+
+    return lambda: rng.randrange(attackers)
+
+
+def write_synthetic_logs(blocker, options, crossings):
+    """Append synthetic auth/apache/vsftpd lines, timestamping threshold crossings"""
+    rng = random.Random(options.seed)
+    pick_attacker = attacker_picker(options, rng)
+    services = blocker.services
+
+    # Attacker i always targets the same service, from 198.18.0.0/15 (RFC 2544)
+    attacker_ips = [f"198.18.{(i >> 8) & 255}.{i & 255}" if i < 65536
+                    else f"198.19.{(i >> 8) & 255}.{i & 255}" for i in range(options.attackers)]
+    attempts = defaultdict(int)
+
+    files = {service: open(blocker.config[service]['log_file'], 'a') for service in services}
+    written = 0
+    started = time.perf_counter()
+
+    try:
+        while written < options.lines:
+            ts = datetime.now().strftime('%b %d %H:%M:%S')
+            chunk = min(options.chunk_size, options.lines - written)
+            buffers = {service: [] for service in services}
+            crossed = []
+
+            for _ in range(chunk):
+                pid = rng.randrange(1000, 65535)
+                port = rng.randrange(1024, 65535)
+
+                if rng.random() < options.attack_ratio:
+                    attacker = pick_attacker()
+                    service = services[attacker % len(services)]
+                    ip = attacker_ips[attacker]
+                    line = SYNTHETIC_LINES[service][0].format(ts=ts, pid=pid, ip=ip, port=port)
+
+                    attempts[ip] += 1
+                    if attempts[ip] == blocker.config[service]['max_attempts']:
+                        crossed.append(ip)
+                else:
+                    service = rng.choice(services)
+                    line = SYNTHETIC_LINES[service][1].format(ts=ts, pid=pid, port=port)
+
+                buffers[service].append(line)
+
+            for service, lines in buffers.items():
+                if lines:
+                    files[service].writelines(lines)
+                    files[service].flush()
+
+            flushed = time.perf_counter()
+            for ip in crossed:
+                crossings[ip] = flushed
+
+            written += chunk
+
+            if options.rate:
+                delay = started + written / options.rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+    finally:
+        for f in files.values():
+            f.close()
+
+    return written
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+def run_benchmark(options):
+    """Drive monitor_log_file + check_failed_attempts with synthetic logs"""
+    services = [service.strip() for service in options.services.split(',') if service.strip()]
+
+    with tempfile.TemporaryDirectory(prefix='ip_blocker_bench_') as workdir:
+        blocker = BenchmarkBlocker(workdir, services, options.firewall_delay)
+        for service in services:
+            Path(blocker.config[service]['log_file']).touch()
+
+        blocker.monitoring = True
+        threads = []
+        for service in services:
+            thread = threading.Thread(target=blocker.monitor_log_file, args=(service,), daemon=True)
+            thread.start()
+            threads.append(thread)
+        time.sleep(0.2)  # let the monitors seek to the end of the empty logs
+
+        crossings = {}
+        started = time.perf_counter()
+        written = write_synthetic_logs(blocker, options, crossings)
+
+        # Wait for the monitors to drain the logs
+        processed = 0
+        last_progress = time.perf_counter()
+        while processed < written and time.perf_counter() - last_progress < options.idle_timeout:
+            time.sleep(0.05)
+            snapshot = blocker.metrics.collect()
+            current = sum(value for (name, _), value in snapshot.items()
+                          if name == 'lines_processed_total')
+            if current != processed:
+                processed = current
+                last_progress = time.perf_counter()
+
+        elapsed = last_progress - started
+        blocker.monitoring = False
+        for thread in threads:
+            thread.join(1)
+
+        snapshot = blocker.metrics.collect()
+        matches = sum(value for (name, _), value in snapshot.items() if name == 'regex_matches_total')
+
+    latencies = sorted(blocker.ban_times[ip] - crossed for ip, crossed in crossings.items()
+                       if ip in blocker.ban_times)
+
+    return {
+        'services': services,
+        'distribution': options.distribution,
+        'lines_written': written,
+        'lines_processed': processed,
+        'regex_matches': matches,
+        'expected_bans': len(crossings),
+        'bans': len(blocker.ban_times),
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_lines_per_second': round(processed / elapsed, 1) if elapsed > 0 else 0.0,
+        'detection_latency_p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'detection_latency_p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'detection_latency_max_ms': round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        # ru_maxrss is reported in kilobytes on Linux
+        'peak_memory_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Return a list of metrics that regressed beyond the tolerance"""
+    regressions = []
+    checks = [
+        ('throughput_lines_per_second', -1),
+        ('detection_latency_p99_ms', 1),
+        ('peak_memory_mb', 1),
+    ]
+
+    for metric, direction in checks:
+        old, new = baseline.get(metric), results[metric]
+        if not old:
+            continue
+
+        change = (new - old) / old * direction
+        if change > tolerance:
+            regressions.append(f"{metric}: {old} → {new} ({change * 100:+.1f}% worse)")
+
+    return regressions
+
+
+def benchmark_command(args):
+    """Parse benchmark options, run it and report"""
+    parser = argparse.ArgumentParser(prog='dynamic_ip_blocker.py benchmark',
+                                     description='Benchmark the log detection pipeline')
+    parser.add_argument('--lines', type=int, default=200000, help='total log lines to generate')
+    parser.add_argument('--services', default='ssh,http,ftp', help='comma-separated services')
+    parser.add_argument('--attackers', type=int, default=1000, help='number of attacking IPs')
+    parser.add_argument('--attack-ratio', type=float, default=0.3, help='fraction of lines that are attacks')
+    parser.add_argument('--distribution', choices=['uniform', 'zipf', 'burst'], default='uniform',
+                        help='how attack lines are spread over attackers')
+    parser.add_argument('--zipf-exponent', type=float, default=1.1)
+    parser.add_argument('--burst-length', type=int, default=12, help='attempts per attacker burst')
+    parser.add_argument('--rate', type=float, default=0, help='lines per second (0 = unthrottled)')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='lines written per flush')
+    parser.add_argument('--firewall-delay', type=float, default=0.0,
+                        help='simulated seconds per firewall command')
+    parser.add_argument('--idle-timeout', type=float, default=5.0,
+                        help='stop waiting after this many seconds without progress')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--save', help='write results as JSON to this file')
+    parser.add_argument('--baseline', help='compare against a previously saved JSON result')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='allowed regression against the baseline (0.10 = 10%%)')
+    options = parser.parse_args(args)
+
+    if options.attackers > 131072:
+        parser.error('--attackers is limited to 131072 (198.18.0.0/15)')
+
+    results = run_benchmark(options)
+
+    print("\n" + "=" * 60)
+    print("DYNAMIC IP BLOCKER BENCHMARK")
+    print("=" * 60 + "\n")
+    print(f"Services: {', '.join(results['services'])} ({results['distribution']} attackers)")
+    print(f"Lines written / processed: {results['lines_written']} / {results['lines_processed']}")
+    print(f"Regex matches: {results['regex_matches']}")
+    print(f"Bans installed / expected: {results['bans']} / {results['expected_bans']}")
+    print(f"Elapsed: {results['elapsed_seconds']}s")
+    print(f"Throughput: {results['throughput_lines_per_second']:,.0f} lines/s")
+    print(f"Detection latency: p50 {results['detection_latency_p50_ms']}ms, "
+          f"p99 {results['detection_latency_p99_ms']}ms, max {results['detection_latency_max_ms']}ms")
+    print(f"Peak memory: {results['peak_memory_mb']} MB")
+
+    if options.save:
+        with open(options.save, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"\n✓ Results saved to {options.save}")
+
+    if options.baseline:
+        with open(options.baseline, 'r') as f:
+            baseline = json.load(f)
+
+        regressions = compare_to_baseline(results, baseline, options.tolerance)
+        if regressions:
+            print("\n✗ Regressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\n✓ No regressions against baseline")
+
+
+def encode_batch(origin, incarnation, events, secret):
+    """Encode a batch of ban/unban events into a signed frame"""
+    origin = origin.encode()[:255]
+    parts = [bytes([len(origin)]), origin, BATCH_HEADER.pack(incarnation, len(events))]
+
+    for event_type, sequence, ip, duration, service in events:
+        address = ipaddress.ip_address(ip).packed
+        service = service.encode()[:255]
+        parts.append(EVENT_HEADER.pack(event_type, sequence, len(address)))
+        parts.append(address)
+        parts.append(EVENT_TRAILER.pack(duration, len(service)))
+        parts.append(service)
+
+    batch = b''.join(parts)
+    header = FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, 0, len(batch))
+    digest = hmac.new(secret, header + batch, hashlib.sha256).digest()
+    return header + batch + digest
+
+
+def decode_batch(batch):
+    """Decode a frame batch into (origin, incarnation, events); ValueError if malformed"""
+    if not batch or len(batch) < 1 + batch[0] + BATCH_HEADER.size:
+        raise ValueError("truncated replication batch")
+    origin_length = batch[0]
+    origin = batch[1:1 + origin_length].decode()
+    offset = 1 + origin_length
+
+    incarnation, count = BATCH_HEADER.unpack_from(batch, offset)
+    offset += BATCH_HEADER.size
+
+    events = []
+    for _ in range(count):
+        event_type, sequence, address_length = EVENT_HEADER.unpack_from(batch, offset)
+        offset += EVENT_HEADER.size
+        ip = str(ipaddress.ip_address(batch[offset:offset + address_length]))
+        offset += address_length
+        duration, service_length = EVENT_TRAILER.unpack_from(batch, offset)
+        offset += EVENT_TRAILER.size
+        service = batch[offset:offset + service_length].decode()
+        offset += service_length
+        events.append((event_type, sequence, ip, duration, service))
+
+    if offset != len(batch):
+        raise ValueError("truncated replication batch" if offset > len(batch)
+                         else "trailing data after replication batch")
+    return origin, incarnation, events
+
+
+def recv_exact(sock, size):
+    """Read exactly size bytes from a socket, None on EOF"""
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data.extend(chunk)
+    return bytes(data)
+
+
+def read_frame(sock, secret):
+    """Read and verify one frame, returns the decoded batch or None"""
+    header = recv_exact(sock, FRAME_HEADER.size)
+    if header is None:
+        return None
+
+    magic, version, _, length = FRAME_HEADER.unpack(header)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION or length > MAX_FRAME_SIZE:
+        raise ValueError("malformed replication frame")
+
+    body = recv_exact(sock, length + DIGEST_SIZE)
+    if body is None:
+        return None
+
+    batch, digest = body[:length], body[length:]
+    expected = hmac.new(secret, header + batch, hashlib.sha256).digest()
+    if not hmac.compare_digest(digest, expected):
+        raise ValueError("replication frame failed authentication")
+
+    return decode_batch(batch)
+
+
+def parse_peer(peer):
+    """Split a "host:port" or "[v6]:port" peer address"""
+    host, _, port = peer.rpartition(':')
+    return host.strip('[]'), int(port)
+
+
+class ReplicationHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        """Apply every batch received from a peer and acknowledge it"""
+        replicator = self.server.replicator
+        self.request.settimeout(300)
+
+        try:
+            while True:
+                frame = read_frame(self.request, replicator.secret)
+                if frame is None:
+                    return
+
+                replicator.apply(*frame)
+                self.request.sendall(ACK)
+        except (OSError, ValueError, struct.error) as e:
+            replicator.blocker.log(f"✗ Replication error from {self.client_address[0]}: {e}")
+
+
+class ReplicationServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class BanReplicator:
+    """Share ban/unban events with peer DynamicIPBlocker nodes"""
+
+    def __init__(self, blocker, node_id=None):
+        self.blocker = blocker
+        self.config = blocker.config['replication']
+        self.node_id = node_id or self.config['node_id']
+        self.secret = self.config['shared_secret'].encode()
+
+        # (incarnation, sequence) orders this node's events across restarts
+        self.incarnation = time.time_ns()
+        self.sequence = 0
+        self.seen = {}  # origin -> last applied (incarnation, sequence)
+
+        self.queues = {peer: deque(maxlen=10000) for peer in self.config['peers']}
+        self.condition = threading.Condition()
+        self.seen_lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.running = False
+        self.server = None
+        self.threads = []
+
+        self.applied = 0
+        self.duplicates = 0
+
+    def start(self, listen=True):
+        """Start the peer listener and one sender thread per peer; False without a secret"""
+        if not self.secret:
+            # Unsigned frames would let anyone who reaches the port edit the firewall
+            self.blocker.log("✗ Replication needs a shared_secret, not starting it")
+            return False
+
+        self.running = True
+
+        if listen:
+            address = (self.config['listen_host'], self.config['listen_port'])
+            self.server = ReplicationServer(address, ReplicationHandler)
+            self.server.replicator = self
+            thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+            thread.start()
+            self.blocker.log(f"🔗 Replication listening on {address[0]}:{address[1]}")
+
+        for peer in self.queues:
+            thread = threading.Thread(target=self.sender_loop, args=(peer,), daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return True
+
+    def stop(self, timeout=5):
+        """Flush pending events and stop replication"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        self.stopped.set()
+
+        for thread in self.threads:
+            thread.join(timeout)
+
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def publish(self, event_type, ip, service, duration=0):
+        """Queue a local ban/unban event for every peer"""
+        # Bans are queued with their expiry so a late delivery doesn't extend them
+        expires = time.monotonic() + duration if duration else 0
+        with self.condition:
+            self.sequence += 1
+            event = (event_type, self.sequence, ip, expires, service)
+            for queue in self.queues.values():
+                queue.append(event)
+            self.condition.notify_all()
+
+    def apply(self, origin, incarnation, events):
+        """Apply remote events once each, in per-origin sequence order"""
+        if origin == self.node_id:
+            return
+
+        for event_type, sequence, ip, duration, service in events:
+            with self.seen_lock:
+                last = self.seen.get(origin)
+                if last and (incarnation, sequence) <= last:
+                    self.duplicates += 1
+                    continue
+                self.seen[origin] = (incarnation, sequence)
+
+            if event_type == EVENT_BAN:
+                if duration and ip not in self.blocker.banned_ips:
+                    self.blocker.block_ip(ip, service, duration, replicate=False, origin=origin)
+            elif event_type == EVENT_UNBAN:
+                self.blocker.unblock_ip(ip, replicate=False, origin=origin)
+
+            self.applied += 1
+
+    def next_batch(self, queue):
+        """Wait for a full batch or the batch interval, whichever comes first"""
+        batch_size = self.config['batch_size']
+
+        with self.condition:
+            while self.running and not queue:
+                self.condition.wait()
+
+            deadline = time.monotonic() + self.config['batch_interval']
+            while self.running and len(queue) < batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+
+            return [queue[i] for i in range(min(len(queue), batch_size))]
+
+    def sender_loop(self, peer):
+        """Deliver queued events to one peer, reconnecting with backoff"""
+        host, port = parse_peer(peer)
+        queue = self.queues[peer]
+        sock = None
+        failures = 0
+
+        while True:
+            batch = self.next_batch(queue)
+            if not batch:
+                break
+
+            try:
+                if sock is None:
+                    sock = socket.create_connection((host, port), timeout=5)
+
+                now = time.monotonic()
+                events = [(event_type, sequence, ip, max(0, math.ceil(expires - now)) if expires else 0,
+                           service) for event_type, sequence, ip, expires, service in batch]
+                sock.sendall(encode_batch(self.node_id, self.incarnation, events, self.secret))
+                if recv_exact(sock, 1) != ACK:
+                    raise ConnectionError("peer closed the connection")
+
+            except OSError as e:
+                if sock:
+                    sock.close()
+                    sock = None
+
+                if failures == 0:
+                    self.blocker.log(f"✗ Replication to {peer} failed: {e}")
+                failures += 1
+
+                if not self.running:
+                    break
+                self.stopped.wait(min(30, 2 ** failures))
+                continue
+
+            if failures:
+                self.blocker.log(f"🔗 Replication to {peer} restored")
+                failures = 0
+
+            # Drop delivered events (the deque may have discarded old ones meanwhile)
+            with self.condition:
+                last_sequence = batch[-1][1]
+                while queue and queue[0][1] <= last_sequence:
+                    queue.popleft()
+
+        if sock:
+            sock.close()
+
 
 def main():
-    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == 'benchmark':
+        # Runs against temporary logs, so leave the real config untouched
+        benchmark_command(sys.argv[2:])
+        return
 
     blocker = DynamicIPBlocker()
 
@@ -366,6 +1245,7 @@ def main():
         print("  whitelist-remove <ip>  - Remove IP from whitelist")
         print("  whitelist-show         - Show whitelisted IPs")
         print("  stats                  - Show statistics")
+        print("  benchmark [options]    - Benchmark detection pipeline (see benchmark --help)")
         print("\nExamples:")
         print("  sudo python3 dynamic_ip_blocker.py start")
         print("  sudo python3 dynamic_ip_blocker.py block 192.168.1.100 7200")
@@ -384,14 +1264,18 @@ def main():
 
         ip = sys.argv[2]
         duration = int(sys.argv[3]) if len(sys.argv) > 3 else 3600
+        blocker.start_replication_client()
         blocker.block_ip(ip, 'manual', duration)
+        blocker.stop_replication_client()
 
     elif command == 'unblock':
         if len(sys.argv) < 3:
             print("Usage: unblock <ip>")
             return
 
+        blocker.start_replication_client()
         blocker.unblock_ip(sys.argv[2])
+        blocker.stop_replication_client()
 
     elif command == 'list':
         blocker.list_blocked_ips()
@@ -5,109 +5,1772 @@ Monitor network connectivity and performance in real-time
 """
 
 import subprocess
+import asyncio
+import argparse
+import bisect
+import ctypes
+import hashlib
+import multiprocessing
+import queue
+import socket
+import struct
+import ipaddress
+import os
+import math
 import time
 import json
+import locale
 import csv
+import gzip
+import io
 import re
+import ssl
+import sys
+import tempfile
+import urllib.parse
+import zlib
 from datetime import datetime
-from collections import deque
+from array import array
+from collections import deque, defaultdict
 
+try:
+    import yaml  # optional, only needed for YAML target inventories
+except ImportError:
+    yaml = None
+
+try:
+    import curses  # optional, only needed for the live dashboard (not on Windows)
+except ImportError:
+    curses = None
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+ICMP_DEST_UNREACHABLE = 3
+ICMP_TIME_EXCEEDED = 11
+ICMP_HEADER = struct.Struct('!BBHHH')  # type, code, checksum, identifier, sequence
+ICMP_PAYLOAD = b'network-health-monitor'.ljust(48, b'.')  # 56 bytes with the timestamp, like ping
+SO_ATTACH_FILTER = 26  # Linux
+BPF_INSTRUCTION = struct.Struct('=HBBI')  # code, jump if true, jump if false, constant
+
+# Time-series segment record: host id, epoch, min/avg/max latency (ms), packet loss (%)
+SAMPLE_RECORD = struct.Struct('<Idffff')
+ROLLUP_PERIODS = {'1m': 60, '1h': 3600}
+
+# Columns of the streaming CSV log; results without a field leave it empty
+RESULT_FIELDS = ['host', 'ip', 'status', 'latency_avg', 'latency_min', 'latency_max',
+                 'packet_loss', 'error', 'timestamp']
+# Alert thresholds: result field -> (raise above, clear at or below)
+ALERT_THRESHOLDS = {'packet_loss': (10, 5), 'latency_avg': (100, 80)}
+LOG_FORMATS = {'jsonl': '.jsonl', 'csv': '.csv', 'jsonl.gz': '.jsonl.gz'}
+SPARK_CHARS = '▁▂▃▄▅▆▇█'
+SPARK_CHARS_ASCII = '_.-~=+*#'  # for terminals without UTF-8
+
+
+def icmp_checksum(data):
+    """RFC 1071 internet checksum"""
+    if len(data) % 2:
+        data += b'\x00'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+class IcmpProber:
+    """In-process ICMP echo engine multiplexing every probe over one socket
+
+    Uses an unprivileged datagram ICMP socket when the kernel allows it
+    (net.ipv4.ping_group_range) and falls back to a raw socket (root or
+    CAP_NET_RAW). Replies are matched to requests by sequence number and
+    timed with the monotonic clock.
+    """
+
+    def __init__(self):
+        try:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+            self.raw = False
+        except PermissionError:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+            self.raw = True
+
+        # Thousands of replies can arrive at once, make room for them
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        except OSError:
+            pass
+        self.sock.setblocking(False)
+        self.identifier = os.getpid() & 0xFFFF
+        self.sequence = 0
+        self.pending = {}  # sequence -> (ip, future)
+        self.loop = None
+        if self.raw:
+            self.attach_identifier_filter()
+
+    def attach_identifier_filter(self):
+        """Let the kernel drop ICMP packets carrying another identifier
+
+        A raw socket receives every ICMP packet on the host; without this,
+        several monitors (or shard workers) would each parse all replies.
+        """
+        program = b''.join([
+            BPF_INSTRUCTION.pack(0xB1, 0, 0, 0),  # X = IP header length
+            BPF_INSTRUCTION.pack(0x48, 0, 0, 4),  # A = 16-bit word at X + 4 (identifier)
+            BPF_INSTRUCTION.pack(0x15, 0, 1, self.identifier),  # A == identifier?
+            BPF_INSTRUCTION.pack(0x06, 0, 0, 0xFFFF),  # keep the packet
+            BPF_INSTRUCTION.pack(0x06, 0, 0, 0),  # drop it
+        ])
+        self.bpf_program = ctypes.create_string_buffer(program)  # must outlive the socket option call
+        fprog = struct.pack('HL', len(program) // BPF_INSTRUCTION.size,
+                            ctypes.addressof(self.bpf_program))
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER, fprog)
+        except OSError:
+            pass  # not Linux: filter in on_readable only
+
+    def attach(self):
+        """Register the socket with the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            loop.add_reader(self.sock.fileno(), self.on_readable)
+            self.loop = loop
+
+    def close(self):
+        """Release the socket"""
+        if self.loop and not self.loop.is_closed():
+            self.loop.remove_reader(self.sock.fileno())
+        self.sock.close()
+
+    def next_sequence(self):
+        """Allocate a 16-bit sequence number not used by an outstanding probe"""
+        for _ in range(0x10000):
+            self.sequence = (self.sequence + 1) & 0xFFFF
+            if self.sequence not in self.pending:
+                return self.sequence
+        raise RuntimeError("too many outstanding ICMP probes")
+
+    def build_packet(self, sequence):
+        """Echo request carrying the send time"""
+        payload = struct.pack('!Q', time.monotonic_ns()) + ICMP_PAYLOAD
+        header = ICMP_HEADER.pack(ICMP_ECHO_REQUEST, 0, 0, self.identifier, sequence)
+        checksum = icmp_checksum(header + payload)
+        return ICMP_HEADER.pack(ICMP_ECHO_REQUEST, 0, checksum, self.identifier, sequence) + payload
+
+    def on_readable(self):
+        """Drain the socket and resolve the matching probes"""
+        while True:
+            try:
+                packet, address = self.sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                continue
+
+            received = time.monotonic_ns()
+
+            if self.raw:
+                # Raw sockets also deliver the IP header and every ICMP packet on the host
+                packet = packet[(packet[0] & 0x0F) * 4:]
+
+            if len(packet) < ICMP_HEADER.size:
+                continue
+
+            icmp_type, _, _, identifier, sequence = ICMP_HEADER.unpack_from(packet)
+            if icmp_type != ICMP_ECHO_REPLY:
+                continue
+            if self.raw and identifier != self.identifier:
+                continue
+
+            entry = self.pending.get(sequence)
+            if entry and entry[0] == address[0] and not entry[1].done():
+                entry[1].set_result(received)
+
+    async def echo(self, ip, timeout):
+        """Send one echo request, return the RTT in ms or None if lost"""
+        sequence = self.next_sequence()
+        future = self.loop.create_future()
+        self.pending[sequence] = (ip, future)
+
+        try:
+            packet = self.build_packet(sequence)
+            sent = time.monotonic_ns()
+            while True:
+                try:
+                    self.sock.sendto(packet, (ip, 0))
+                    break
+                except (BlockingIOError, InterruptedError):
+                    await asyncio.sleep(0.001)
+                except OSError:
+                    return None  # unreachable network etc. counts as lost
+
+            try:
+                received = await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                return None
+            return (received - sent) / 1e6
+
+        finally:
+            self.pending.pop(sequence, None)
+
+    async def ping(self, ip, count=5, interval=0.2, timeout=2):
+        """Send count echo requests spaced by interval, return per-packet RTTs"""
+        self.attach()
+        tasks = []
+        for i in range(count):
+            if i:
+                await asyncio.sleep(interval)
+            tasks.append(asyncio.ensure_future(self.echo(ip, timeout)))
+        return await asyncio.gather(*tasks)
+
+
+class PathTracer(IcmpProber):
+    """TTL-stepped traceroute engine probing every hop of every trace in parallel
+
+    Needs a raw ICMP socket (root or CAP_NET_RAW) to see the Time Exceeded
+    messages routers return. They quote the original echo request, so hops
+    are matched by identifier and sequence just like echo replies.
+    """
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        self.raw = True
+        self.sock.setblocking(False)
+        # Flip the top bit rather than add 1: sharded workers often have consecutive
+        # PIDs, and pid + 1 is then the next worker's IcmpProber identifier
+        self.identifier = (os.getpid() ^ 0x8000) & 0xFFFF
+        self.sequence = 0
+        self.pending = {}  # sequence -> (destination ip, future)
+        self.loop = None
+
+    def on_readable(self):
+        """Drain the socket and resolve hops with (responder, receive time, reached)"""
+        while True:
+            try:
+                packet, address = self.sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                continue
+
+            received = time.monotonic_ns()
+            packet = packet[(packet[0] & 0x0F) * 4:]
+            if len(packet) < ICMP_HEADER.size:
+                continue
+
+            icmp_type, _, _, identifier, sequence = ICMP_HEADER.unpack_from(packet)
+            if icmp_type == ICMP_ECHO_REPLY:
+                destination = address[0]
+            elif icmp_type in (ICMP_TIME_EXCEEDED, ICMP_DEST_UNREACHABLE):
+                # Quoted IP header of our request, followed by its ICMP header
+                quoted = packet[ICMP_HEADER.size:]
+                if len(quoted) < 20 or len(quoted) < (quoted[0] & 0x0F) * 4 + ICMP_HEADER.size:
+                    continue
+                destination = socket.inet_ntoa(quoted[16:20])
+                _, _, _, identifier, sequence = ICMP_HEADER.unpack_from(quoted, (quoted[0] & 0x0F) * 4)
+            else:
+                continue
+
+            if identifier != self.identifier:
+                continue
+
+            entry = self.pending.get(sequence)
+            if entry and entry[0] == destination and not entry[1].done():
+                entry[1].set_result((address[0], received, icmp_type != ICMP_TIME_EXCEEDED))
+
+    async def hop(self, ip, ttl, timeout):
+        """Send one echo request with a TTL, return (responder, rtt ms, reached) or None"""
+        sequence = self.next_sequence()
+        future = self.loop.create_future()
+        self.pending[sequence] = (ip, future)
+
+        try:
+            packet = self.build_packet(sequence)
+            while True:
+                try:
+                    # Set right before sending: other traces share the socket
+                    self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, ttl)
+                    sent = time.monotonic_ns()
+                    self.sock.sendto(packet, (ip, 0))
+                    break
+                except (BlockingIOError, InterruptedError):
+                    await asyncio.sleep(0.001)
+                except OSError:
+                    return None
+
+            try:
+                responder, received, reached = await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                return None
+            return responder, (received - sent) / 1e6, reached
+
+        finally:
+            self.pending.pop(sequence, None)
+
+    async def trace(self, ip, max_hops=30, timeout=1.0):
+        """Probe TTLs 1..max_hops at once, return [(ttl, address, rtt ms)] up to the destination
+
+        Silent hops have address and rtt None.
+        """
+        self.attach()
+        replies = await asyncio.gather(*(self.hop(ip, ttl, timeout) for ttl in range(1, max_hops + 1)))
+
+        hops = []
+        for ttl, reply in enumerate(replies, 1):
+            if reply is None:
+                hops.append((ttl, None, None))
+                continue
+            responder, rtt, reached = reply
+            hops.append((ttl, responder, round(rtt, 2)))
+            if reached:
+                break
+
+        # Silent TTLs past the last answer carry no information
+        while hops and hops[-1][1] is None:
+            hops.pop()
+        return hops
+
+
+def path_changes(old, new):
+    """Hops whose router changed between two traces: [(ttl, old address, new address)]
+
+    Silent hops are ignored; a path that got longer or shorter is reported at
+    the TTL of its new last hop.
+    """
+    old_hops = {ttl: address for ttl, address, _ in old if address}
+    new_hops = {ttl: address for ttl, address, _ in new if address}
+    changes = [(ttl, old_hops[ttl], address) for ttl, address in sorted(new_hops.items())
+               if old_hops.get(ttl, address) != address]
+
+    if old and new and len(old) != len(new) and not any(ttl == len(new) for ttl, _, _ in changes):
+        changes.append((len(new), old_hops.get(len(new)), new_hops.get(len(new))))
+    return changes
+
+
+def latency_step(old, new, min_increase):
+    """First hop of an unchanged route whose RTT rose by min_increase ms or more"""
+    old_hops = {ttl: (address, rtt) for ttl, address, rtt in old if address}
+    for ttl, address, rtt in new:
+        previous = old_hops.get(ttl)
+        if address and previous and previous[0] == address and rtt - previous[1] >= min_increase:
+            return ttl, address, round(rtt - previous[1], 2)
+    return None
+
+
+class HostSeries:
+    """Array-backed columns of samples for one host"""
 
-class NetworkMonitor:
     def __init__(self):
+        self.epoch = array('d')
+        self.latency_min = array('f')
+        self.latency_avg = array('f')
+        self.latency_max = array('f')
+        self.packet_loss = array('f')
+
+    def __len__(self):
+        return len(self.epoch)
+
+    def append(self, epoch, latency_min, latency_avg, latency_max, packet_loss):
+        self.epoch.append(epoch)
+        self.latency_min.append(latency_min)
+        self.latency_avg.append(latency_avg)
+        self.latency_max.append(latency_max)
+        self.packet_loss.append(packet_loss)
+
+    def trim(self, limit):
+        """Drop the oldest samples beyond limit, in chunks to keep appends cheap"""
+        excess = len(self.epoch) - limit
+        if excess >= max(1, limit // 10):
+            for column in (self.epoch, self.latency_min, self.latency_avg,
+                           self.latency_max, self.packet_loss):
+                del column[:excess]
+
+
+class TimeSeriesStore:
+    """Bounded columnar time-series of probe results with 1 min / 1 h rollups
+
+    Recent raw samples and closed rollup buckets are kept in per-host arrays;
+    everything recorded since the last flush is appended to segment files
+    (<prefix>.raw.dat, <prefix>.1m.dat, <prefix>.1h.dat, with host names in
+    <prefix>.hosts) so a crash loses at most one flush interval.
+    """
+
+    def __init__(self, path_prefix='network_timeseries', max_raw_samples=8640,
+                 max_rollup_buckets=10080, flush_interval=60):
+        self.path_prefix = path_prefix
+        self.max_raw_samples = max_raw_samples  # per host, 1 day at 10 s
+        self.max_rollup_buckets = max_rollup_buckets  # per host and period, 7 days of 1 min
+        self.flush_interval = flush_interval  # seconds
+
+        self.raw = defaultdict(HostSeries)
+        self.rollups = {period: defaultdict(HostSeries) for period in ROLLUP_PERIODS}
+        # period -> host -> [bucket start, samples, up samples, sum avg, min, max, sum loss]
+        self.open_buckets = {period: {} for period in ROLLUP_PERIODS}
+
+        # Host ids must stay stable across runs appending to the same files
+        self.host_ids = {}
+        self.new_hosts = []
+        if os.path.exists(f"{path_prefix}.hosts"):
+            with open(f"{path_prefix}.hosts") as f:
+                for line in f:
+                    self.host_ids.setdefault(line.rstrip('\n'), len(self.host_ids))
+        self.pending = {kind: bytearray() for kind in ['raw', *ROLLUP_PERIODS]}
+        self.last_flush = time.time()
+
+    def host_id(self, host):
+        """Stable small integer id used in segment records"""
+        if host not in self.host_ids:
+            self.host_ids[host] = len(self.host_ids)
+            self.new_hosts.append(host)
+        return self.host_ids[host]
+
+    def add(self, host, epoch, latency_min, latency_avg, latency_max, packet_loss):
+        """Record one sample (latencies are NaN when the host did not answer)"""
+        series = self.raw[host]
+        series.append(epoch, latency_min, latency_avg, latency_max, packet_loss)
+        series.trim(self.max_raw_samples)
+        self.pending['raw'] += SAMPLE_RECORD.pack(self.host_id(host), epoch, latency_min,
+                                                  latency_avg, latency_max, packet_loss)
+
+        for period, seconds in ROLLUP_PERIODS.items():
+            start = epoch - epoch % seconds
+            bucket = self.open_buckets[period].get(host)
+
+            if bucket and bucket[0] != start:
+                self.close_bucket(period, host, bucket)
+                bucket = None
+
+            if bucket is None:
+                bucket = self.open_buckets[period][host] = [start, 0, 0, 0.0, math.inf, -math.inf, 0.0]
+
+            bucket[1] += 1
+            bucket[6] += packet_loss
+            if not math.isnan(latency_avg):
+                bucket[2] += 1
+                bucket[3] += latency_avg
+                bucket[4] = min(bucket[4], latency_min)
+                bucket[5] = max(bucket[5], latency_max)
+
+    def close_bucket(self, period, host, bucket):
+        """Move a finished rollup bucket into its series"""
+        start, samples, up, sum_avg, low, high, sum_loss = bucket
+        if up:
+            values = (low, sum_avg / up, high)
+        else:
+            values = (math.nan, math.nan, math.nan)
+
+        series = self.rollups[period][host]
+        series.append(start, *values, sum_loss / samples)
+        series.trim(self.max_rollup_buckets)
+        self.pending[period] += SAMPLE_RECORD.pack(self.host_id(host), start, *values,
+                                                   sum_loss / samples)
+
+    def add_result(self, result, epoch=None):
+        """Record a NetworkMonitor result dict"""
+        epoch = time.time() if epoch is None else epoch
+
+        if result['status'] == 'UP':
+            self.add(result['host'], epoch, result['latency_min'], result['latency_avg'],
+                     result['latency_max'], result['packet_loss'])
+        else:
+            self.add(result['host'], epoch, math.nan, math.nan, math.nan,
+                     result.get('packet_loss', 100))
+
+    def maybe_flush(self):
+        """Flush if the flush interval has passed"""
+        if time.time() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self, close=False):
+        """Append everything recorded since the last flush to the segment files"""
+        if close:
+            for period, buckets in self.open_buckets.items():
+                for host, bucket in buckets.items():
+                    self.close_bucket(period, host, bucket)
+                buckets.clear()
+
+        if self.new_hosts:
+            with open(f"{self.path_prefix}.hosts", 'a') as f:
+                f.writelines(f"{host}\n" for host in self.new_hosts)
+            self.new_hosts = []
+
+        for kind, data in self.pending.items():
+            if data:
+                with open(f"{self.path_prefix}.{kind}.dat", 'ab') as f:
+                    f.write(data)
+                data.clear()
+
+        self.last_flush = time.time()
+
+    def series(self, host, period='raw'):
+        """In-memory series for a host ('raw', '1m' or '1h')"""
+        if period == 'raw':
+            return self.raw.get(host, HostSeries())
+        return self.rollups[period].get(host, HostSeries())
+
+
+class P2Quantile:
+    """Streaming quantile estimate in constant memory (Jain & Chlamtac P² algorithm)"""
+
+    def __init__(self, quantile):
+        self.quantile = quantile
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * quantile, 1 + 4 * quantile, 3 + 2 * quantile, 5]
+        self.increments = [0, quantile / 2, quantile, (1 + quantile) / 2, 1]
+
+    def add(self, value):
+        """Feed one observation"""
+        heights = self.heights
+
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while value >= heights[cell + 1]:
+                cell += 1
+
+        positions = self.positions
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Move the three middle markers towards their desired positions
+        for i in range(1, 4):
+            offset = self.desired[i] - positions[i]
+            if (offset >= 1 and positions[i + 1] - positions[i] > 1) or \
+                    (offset <= -1 and positions[i - 1] - positions[i] < -1):
+                step = 1 if offset > 0 else -1
+                height = self.parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / \
+                        (positions[i + step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+
+    def parabolic(self, i, step):
+        """Piecewise-parabolic prediction of marker i moved by step"""
+        q, n = self.heights, self.positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self):
+        """Current estimate"""
+        if not self.heights:
+            return 0.0
+        if len(self.heights) < 5:
+            rank = max(0, math.ceil(self.quantile * len(self.heights)) - 1)
+            return self.heights[rank]
+        return self.heights[2]
+
+
+class SchedulerStats:
+    """The monitor's own overhead: scheduling lag, scheduler tick cost, CPU per probe
+
+    Scheduling lag is the delay between the time a probe was due on the timer
+    wheel and the moment it actually starts sending (tick rounding, a busy
+    event loop and waiting for a concurrency slot all add to it). It is part
+    of no RTT, but a large lag means probes drift and results go stale.
+    """
+
+    def __init__(self):
+        self.lag_p50 = P2Quantile(0.5)
+        self.lag_p99 = P2Quantile(0.99)
+        self.lag_max = 0.0
+        self.lag_sum = 0.0
+        self.lag_count = 0
+        self.ticks = 0
+        self.tick_busy_sum = 0.0
+        self.tick_busy_max = 0.0
+        self.probes = 0
+        self.wall_start = time.monotonic()
+        self.cpu_start = time.process_time()
+
+    def add_lag(self, seconds):
+        """Record how late a probe started"""
+        ms = max(0.0, seconds * 1000)
+        self.lag_p50.add(ms)
+        self.lag_p99.add(ms)
+        self.lag_max = max(self.lag_max, ms)
+        self.lag_sum += ms
+        self.lag_count += 1
+
+    def add_tick(self, seconds):
+        """Record the wall time one scheduler tick spent dispatching"""
+        ms = seconds * 1000
+        self.ticks += 1
+        self.tick_busy_sum += ms
+        self.tick_busy_max = max(self.tick_busy_max, ms)
+
+    def summary(self):
+        """Current figures"""
+        wall = time.monotonic() - self.wall_start
+        cpu = time.process_time() - self.cpu_start
+        return {
+            'probes': self.probes,
+            'lag_avg_ms': round(self.lag_sum / self.lag_count, 2) if self.lag_count else 0,
+            'lag_p50_ms': round(self.lag_p50.value(), 2),
+            'lag_p99_ms': round(self.lag_p99.value(), 2),
+            'lag_max_ms': round(self.lag_max, 2),
+            'tick_busy_avg_ms': round(self.tick_busy_sum / self.ticks, 3) if self.ticks else 0,
+            'tick_busy_max_ms': round(self.tick_busy_max, 2),
+            'cpu_percent': round(cpu / wall * 100, 1) if wall else 0,
+            'cpu_per_probe_ms': round(cpu / self.probes * 1000, 3) if self.probes else 0
+        }
+
+
+class HostStats:
+    """Running per-host aggregates, updated in O(1) as each probe lands"""
+
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self):
+        self.checks = 0
+        self.up_checks = 0
+        self.latency_samples = 0
+        self.latency_mean = 0.0
+        self.latency_m2 = 0.0  # Welford sum of squared deviations
+        self.latency_min = math.inf
+        self.latency_max = -math.inf
+        self.percentiles = {p: P2Quantile(p / 100) for p in self.PERCENTILES}
+
+    def add(self, result):
+        """Fold one result dict into the aggregates"""
+        self.checks += 1
+        if result['status'] != 'UP':
+            return
+
+        self.up_checks += 1
+        latency = result['latency_avg']
+
+        self.latency_samples += 1
+        delta = latency - self.latency_mean
+        self.latency_mean += delta / self.latency_samples
+        self.latency_m2 += delta * (latency - self.latency_mean)
+
+        self.latency_min = min(self.latency_min, latency)
+        self.latency_max = max(self.latency_max, latency)
+        for estimator in self.percentiles.values():
+            estimator.add(latency)
+
+    def uptime_percent(self):
+        return (self.up_checks / self.checks) * 100 if self.checks else 0.0
+
+    def latency_stddev(self):
+        if self.latency_samples < 2:
+            return 0.0
+        return math.sqrt(self.latency_m2 / (self.latency_samples - 1))
+
+    def summary(self):
+        """Aggregates as a plain dict"""
+        summary = {
+            'total_checks': self.checks,
+            'up_checks': self.up_checks,
+            'uptime_percent': round(self.uptime_percent(), 2),
+            'latency_avg': round(self.latency_mean, 2),
+            'latency_stddev': round(self.latency_stddev(), 2),
+            'latency_min': round(self.latency_min, 2) if self.latency_samples else 0,
+            'latency_max': round(self.latency_max, 2) if self.latency_samples else 0,
+        }
+        for p, estimator in self.percentiles.items():
+            summary[f'latency_p{p}'] = round(estimator.value(), 2)
+        return summary
+
+
+class JitterTracker:
+    """Per-target jitter from individual echo replies, O(1) per sample
+
+    Keeps the RFC 3550 interarrival jitter estimate (J += (|D| - J) / 16,
+    with D the difference between consecutive RTTs) plus the mean |D| over
+    sliding windows of the last N replies.
+    """
+
+    def __init__(self, windows=(16, 100)):
+        self.jitter = 0.0
+        self.last_rtt = None
+        self.windows = {size: deque() for size in windows}
+        self.window_sums = {size: 0.0 for size in windows}
+
+    def add(self, rtt):
+        """Feed one reply RTT in ms"""
+        if self.last_rtt is not None:
+            difference = abs(rtt - self.last_rtt)
+            self.jitter += (difference - self.jitter) / 16
+
+            for size, window in self.windows.items():
+                window.append(difference)
+                self.window_sums[size] += difference
+                if len(window) > size:
+                    self.window_sums[size] -= window.popleft()
+
+        self.last_rtt = rtt
+
+    def window_jitter(self, size):
+        """Mean RTT difference over the last size replies"""
+        window = self.windows[size]
+        return max(0.0, self.window_sums[size] / len(window)) if window else 0.0
+
+
+class AlertState:
+    """Debounced alert conditions of one host, with hysteresis
+
+    A condition ('down', 'packet_loss' or 'latency_avg') is raised after
+    raise_after consecutive bad results and cleared after clear_after good
+    ones. Once raised, latency and packet loss must also fall to the lower
+    clear threshold, so a value hovering around the limit does not flap.
+    """
+
+    def __init__(self, raise_after=2, clear_after=3, thresholds=ALERT_THRESHOLDS):
+        self.raise_after = raise_after
+        self.clear_after = clear_after
+        self.thresholds = thresholds
+        self.firing = {}  # condition -> value that raised it
+        self.streaks = defaultdict(int)  # condition -> results disagreeing with its state
+        self.degraded = False  # latest result was bad or an alert is firing
+        self.healthy_streak = 0
+
+    def evaluate(self, result):
+        """Condition -> bad? for one result"""
+        if result['status'] != 'UP':
+            return {'down': True}  # latency and loss unknown, leave them as they are
+
+        conditions = {'down': False}
+        for field, (raise_above, clear_at) in self.thresholds.items():
+            limit = clear_at if field in self.firing else raise_above
+            conditions[field] = result[field] > limit
+        return conditions
+
+    def update(self, result):
+        """Feed a result, return the (condition, 'raised' or 'cleared') transitions"""
+        transitions = []
+        conditions = self.evaluate(result)
+
+        for condition, bad in conditions.items():
+            firing = condition in self.firing
+            if bad == firing:
+                self.streaks[condition] = 0
+                continue
+
+            self.streaks[condition] += 1
+            if self.streaks[condition] < (self.clear_after if firing else self.raise_after):
+                continue
+
+            self.streaks[condition] = 0
+            if bad:
+                self.firing[condition] = result.get(condition, result['status'])
+                transitions.append((condition, 'raised'))
+            else:
+                del self.firing[condition]
+                transitions.append((condition, 'cleared'))
+
+        self.degraded = any(conditions.values()) or bool(self.firing)
+        self.healthy_streak = 0 if self.degraded else self.healthy_streak + 1
+        return transitions
+
+
+def read_timeseries(path_prefix='network_timeseries', kind='raw'):
+    """Yield samples back from segment files written by TimeSeriesStore"""
+    with open(f"{path_prefix}.hosts") as f:
+        hosts = [line.rstrip('\n') for line in f]
+
+    with open(f"{path_prefix}.{kind}.dat", 'rb') as f:
+        data = f.read()
+
+    for host_id, epoch, low, avg, high, loss in SAMPLE_RECORD.iter_unpack(data):
+        yield {
+            'host': hosts[host_id],
+            'epoch': epoch,
+            'latency_min': low,
+            'latency_avg': avg,
+            'latency_max': high,
+            'packet_loss': loss
+        }
+
+
+class ResultLog:
+    """Append-only result log written in batches, with size-based rotation
+
+    Formats: 'jsonl' (one JSON object per line), 'csv' (RESULT_FIELDS columns)
+    and 'jsonl.gz', where every flush appends a complete gzip member so the
+    file stays readable up to the last flush even after a kill. When a file
+    reaches max_bytes it is renamed to <name>.1 (older ones shift to .2, ...)
+    and only the newest `keep` rotated files are kept.
+    """
+
+    def __init__(self, prefix='network_log', fmt='jsonl', max_bytes=50 * 1024 * 1024,
+                 keep=5, batch_size=1000):
+        if fmt not in LOG_FORMATS:
+            raise ValueError(f"Unknown log format '{fmt}' (use {', '.join(LOG_FORMATS)})")
+        self.fmt = fmt
+        self.path = prefix + LOG_FORMATS[fmt]
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self.batch_size = batch_size  # flush early if a cycle produces more results
+        self.pending = []
+        self.written = 0
+
+    def write(self, result):
+        """Queue a result for the next flush; True once the batch is full"""
+        self.pending.append(result)
+        return len(self.pending) >= self.batch_size
+
+    def encode(self, results, header):
+        """Serialise a batch in the log's format"""
+        if self.fmt == 'csv':
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=RESULT_FIELDS, restval='',
+                                    extrasaction='ignore', lineterminator='\n')
+            if header:
+                writer.writeheader()
+            writer.writerows(results)
+            return buffer.getvalue().encode()
+
+        data = ''.join(json.dumps(result) + '\n' for result in results).encode()
+        if self.fmt == 'jsonl.gz':
+            return gzip.compress(data)
+        return data
+
+    def flush(self):
+        """Append the queued batch, rotating the file first if it is full"""
+        if not self.pending:
+            return
+
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if size >= self.max_bytes:
+            self.rotate()
+            size = 0
+
+        with open(self.path, 'ab') as f:
+            f.write(self.encode(self.pending, header=size == 0))
+        self.written += len(self.pending)
+        self.pending = []
+
+    def rotate(self):
+        """Shift <path>.N to <path>.N+1 and start a new file"""
+        for n in range(self.keep, 0, -1):
+            older = f"{self.path}.{n}"
+            if not os.path.exists(older):
+                continue
+            if n == self.keep:
+                os.remove(older)
+            else:
+                os.replace(older, f"{self.path}.{n + 1}")
+        if self.keep:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+def read_results(path):
+    """Yield results back from a JSONL or compressed JSONL log, oldest rotated file first"""
+    rotated = []
+    n = 1
+    while os.path.exists(f"{path}.{n}"):
+        rotated.append(f"{path}.{n}")
+        n += 1
+
+    opener = gzip.open if path.endswith('.gz') else open
+    for filename in [*reversed(rotated), path]:
+        if not os.path.exists(filename):
+            continue
+        with opener(filename, 'rt') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+PROBE_TYPES = ('icmp', 'tcp', 'tls', 'http')
+PROBE_OPTIONS = ('probe', 'port', 'url', 'reuse', 'verify')
+HOSTNAME = re.compile(r'^[A-Za-z0-9]([A-Za-z0-9-]{0,61}[A-Za-z0-9])?'
+                      r'(\.[A-Za-z0-9]([A-Za-z0-9-]{0,61}[A-Za-z0-9])?)*\.?$')
+
+
+def make_target(name, ip, group='default', tags=(), interval=None, probe='icmp',
+                port=None, url=None, reuse=False, verify=True, server_name=None):
+    """A monitored endpoint; interval None means the group/default interval
+
+    probe is 'icmp' (echo), 'tcp' (handshake time), 'tls' (TLS handshake time
+    on top of TCP) or 'http' (time to first byte of a GET to url); reuse
+    keeps HTTP connections alive between requests, verify checks certificates
+    against server_name (the IP address when None).
+    """
+    if probe not in PROBE_TYPES:
+        raise ValueError(f"unknown probe type {probe!r} for {name}")
+
+    return {
+        'name': name,
+        'ip': ip,
+        'group': group,
+        'tags': list(tags),
+        'interval': interval,
+        'probe': probe,
+        'port': int(port) if port else None,
+        'url': url or None,
+        'reuse': reuse,
+        'verify': verify,
+        'server_name': server_name
+    }
+
+
+def split_tags(value):
+    """Tags may be a list or a ';'/','-separated string"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [tag.strip() for tag in re.split(r'[;,]', value) if tag.strip()]
+    return [str(tag) for tag in value]
+
+
+def server_name(*candidates):
+    """First candidate that is a DNS host name (not an IP address), for TLS SNI"""
+    for candidate in candidates:
+        if not candidate or not HOSTNAME.match(candidate):
+            continue
+        try:
+            ipaddress.ip_address(candidate)
+        except ValueError:
+            return candidate
+    return None
+
+
+def parse_flag(value, default):
+    """Booleans from YAML/JSON or CSV text"""
+    if value is None or value == '':
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
+def expand_address(name, address, max_hosts):
+    """Yield (name, ip) pairs, expanding CIDR ranges into their host addresses"""
+    if '/' not in address:
+        yield name or address, address
+        return
+
+    network = ipaddress.ip_network(address, strict=False)
+    if network.num_addresses > max_hosts:
+        raise ValueError(f"{address} expands to {network.num_addresses} addresses "
+                         f"(limit {max_hosts})")
+
+    hosts = list(network.hosts()) or [network.network_address]
+    for ip in hosts:
+        yield (f"{name}-{ip}" if name else str(ip)), str(ip)
+
+
+def load_inventory(path, max_cidr_hosts=65536):
+    """Load target groups and targets from a CSV, YAML or JSON file
+
+    CSV columns: name,address,group,tags,interval[,probe,port,url,reuse,verify]
+    YAML/JSON:   {groups: {<group>: {interval, tags, probe..., targets: [{name, address, ...}]}}}
+    """
+    groups = {}
+    entries = []  # target specs: name, address, group, tags, interval + probe options
+
+    if path.endswith('.csv'):
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                entry = {key: value.strip() for key, value in row.items() if key and value}
+                entry['group'] = entry.get('group') or 'default'
+                if 'interval' in entry:
+                    entry['interval'] = float(entry['interval'])
+                entries.append(entry)
+    else:
+        with open(path) as f:
+            if path.endswith(('.yaml', '.yml')):
+                if yaml is None:
+                    raise RuntimeError("PyYAML is required for YAML inventories (pip install pyyaml)")
+                data = yaml.safe_load(f) or {}
+            else:
+                data = json.load(f)
+
+        for group, spec in (data.get('groups') or {}).items():
+            spec = spec or {}
+            groups[group] = {'interval': spec.get('interval'), 'tags': split_tags(spec.get('tags'))}
+            defaults = {key: spec[key] for key in PROBE_OPTIONS if key in spec}
+
+            for target in spec.get('targets') or []:
+                if isinstance(target, str):
+                    target = {'address': target}
+                entries.append({**defaults, **target, 'group': group})
+
+        for target in data.get('targets') or []:
+            entries.append({'group': 'default', **target})
+
+    targets = {}
+    for entry in entries:
+        group = entry['group']
+        group_spec = groups.setdefault(group, {'interval': None, 'tags': []})
+        tags = group_spec['tags'] + split_tags(entry.get('tags'))
+
+        # Certificates name hosts: the URL host, else a DNS-name address; the
+        # name is only a display label, and a CIDR range has no single host name
+        url = entry.get('url')
+        name = server_name(url and urllib.parse.urlsplit(url).hostname,
+                           '/' not in entry['address'] and entry['address'])
+
+        for target_name, ip in expand_address(entry.get('name', ''), entry['address'], max_cidr_hosts):
+            targets[target_name] = make_target(
+                target_name, ip, group, tags, entry.get('interval'),
+                probe=entry.get('probe') or 'icmp',
+                port=entry.get('port'),
+                url=url,
+                reuse=parse_flag(entry.get('reuse'), False),
+                verify=parse_flag(entry.get('verify'), True),
+                server_name=name
+            )
+
+    return groups, targets
+
+
+class ConnectionProber:
+    """TCP handshake, TLS handshake and HTTP time-to-first-byte probes
+
+    Every measurement is returned in ms (None when the attempt failed), so
+    the results fit the same schema as ICMP echo replies.
+    """
+
+    def __init__(self):
+        self.http_connections = {}  # target name -> (reader, writer) kept alive
+
+    def ssl_context(self, target):
+        context = ssl.create_default_context()
+        if not target['verify']:
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        return context
+
+    async def tcp_connect(self, target, timeout):
+        """Time to complete the TCP three-way handshake"""
+        started = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(target['ip'], target['port'] or 80), timeout)
+        except (OSError, asyncio.TimeoutError):
+            return None
+
+        elapsed = (time.perf_counter() - started) * 1000
+        writer.close()
+        return elapsed
+
+    async def tls_handshake(self, target, timeout):
+        """Time to complete the TLS handshake on an established TCP connection"""
+        loop = asyncio.get_running_loop()
+        try:
+            transport, protocol = await asyncio.wait_for(
+                loop.create_connection(asyncio.Protocol, target['ip'], target['port'] or 443), timeout)
+        except (OSError, asyncio.TimeoutError):
+            return None
+
+        try:
+            started = time.perf_counter()
+            transport = await asyncio.wait_for(
+                loop.start_tls(transport, protocol, self.ssl_context(target),
+                               server_hostname=target['server_name'] or target['ip']),
+                timeout)
+            return (time.perf_counter() - started) * 1000
+        except (OSError, ssl.SSLError, asyncio.TimeoutError):
+            return None
+        finally:
+            transport.close()
+
+    async def open_http(self, target, url, timeout):
+        """Open the HTTP(S) connection for a URL"""
+        context = self.ssl_context(target) if url.scheme == 'https' else None
+        port = url.port or (443 if url.scheme == 'https' else 80)
+        return await asyncio.wait_for(
+            asyncio.open_connection(url.hostname, port, ssl=context,
+                                    server_hostname=url.hostname if context else None),
+            timeout)
+
+    async def read_http_response(self, reader, status_line):
+        """Consume the rest of a response so the connection can be reused"""
+        status = int(status_line.split()[1])
+
+        length, chunked, close = 0, False, False
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            name, value = name.strip().lower(), value.strip().lower()
+            if name == 'content-length':
+                length = int(value)
+            elif name == 'transfer-encoding' and 'chunked' in value:
+                chunked = True
+            elif name == 'connection' and value == 'close':
+                close = True
+
+        if chunked:
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif length:
+            await reader.readexactly(length)
+
+        return status, close
+
+    async def http_ttfb(self, target, timeout):
+        """Time from sending a GET to the first response byte"""
+        url = urllib.parse.urlsplit(target['url'] or f"http://{target['ip']}:{target['port'] or 80}/")
+        path = (url.path or '/') + (f"?{url.query}" if url.query else '')
+        connection = 'keep-alive' if target['reuse'] else 'close'
+        request = (f"GET {path} HTTP/1.1\r\nHost: {url.netloc}\r\n"
+                   f"User-Agent: network-health-monitor\r\nConnection: {connection}\r\n\r\n").encode()
+
+        pooled = self.http_connections.pop(target['name'], None)
+        for attempt in range(2):
+            try:
+                if pooled:
+                    reader, writer = pooled
+                else:
+                    reader, writer = await self.open_http(target, url, timeout)
+
+                started = time.perf_counter()
+                writer.write(request)
+                await writer.drain()
+
+                # The status line arrives with the first bytes of the response
+                status_line = await asyncio.wait_for(reader.readline(), timeout)
+                if not status_line:
+                    raise ConnectionResetError("connection closed before response")
+                elapsed = (time.perf_counter() - started) * 1000
+
+                status, close = await asyncio.wait_for(
+                    self.read_http_response(reader, status_line), timeout)
+            except (OSError, ValueError, IndexError, ssl.SSLError,
+                    asyncio.IncompleteReadError, asyncio.TimeoutError):
+                if pooled:
+                    # The kept-alive connection went stale, retry once on a fresh one
+                    pooled[1].close()
+                    pooled = None
+                    continue
+                return None
+
+            if target['reuse'] and not close:
+                self.http_connections[target['name']] = (reader, writer)
+            else:
+                writer.close()
+            return elapsed if status < 400 else None
+
+        return None
+
+    async def measure(self, target, timeout):
+        """Run one measurement of the target's probe type"""
+        if target['probe'] == 'tcp':
+            return await self.tcp_connect(target, timeout)
+        if target['probe'] == 'tls':
+            return await self.tls_handshake(target, timeout)
+        return await self.http_ttfb(target, timeout)
+
+    def close_all(self):
+        """Close kept-alive connections (they belong to the current event loop)"""
+        for _, writer in self.http_connections.values():
+            writer.close()
+        self.http_connections.clear()
+
+
+class HashRing:
+    """Consistent hash ring: adding or removing a worker moves only ~1/n of the targets"""
+
+    def __init__(self, nodes, replicas=64):
+        self.ring = sorted((self.hash(f"{node}#{replica}"), node)
+                           for node in nodes for replica in range(replicas))
+        self.keys = [key for key, _ in self.ring]
+
+    @staticmethod
+    def hash(key):
+        # blake2b rather than md5, which FIPS-enabled hosts refuse
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+
+    def lookup(self, key):
+        """Node owning a key"""
+        index = bisect.bisect(self.keys, self.hash(key)) % len(self.keys)
+        return self.ring[index][1]
+
+
+def compact_result(result):
+    """Result dict as a plain tuple, cheap to pickle between processes"""
+    return (result['host'], result['ip'], result['status'], result.get('latency_avg'),
+            result.get('latency_min'), result.get('latency_max'), result.get('packet_loss'),
+            result.get('error'), result['timestamp'], tuple(result.get('rtts', ())))
+
+
+def expand_result(record):
+    """Inverse of compact_result"""
+    host, ip, status, latency_avg, latency_min, latency_max, packet_loss, error, timestamp, rtts = record
+    result = {'host': host, 'ip': ip, 'status': status}
+    if error is not None:
+        result['error'] = error
+    else:
+        result['latency_avg'] = latency_avg
+        if latency_min is not None:
+            result['latency_min'] = latency_min
+            result['latency_max'] = latency_max
+        result['packet_loss'] = packet_loss
+    result['timestamp'] = timestamp
+    if rtts:
+        result['rtts'] = list(rtts)
+    return result
+
+
+class TimerWheel:
+    """Hashed timing wheel: O(1) scheduling of thousands of periodic probes"""
+
+    def __init__(self, tick=0.1, slots=1024):
+        self.tick = tick  # seconds per slot
+        self.slots = [[] for _ in range(slots)]
+        self.current = 0  # ticks elapsed
+
+    def schedule(self, item, delay):
+        """Make item due after delay seconds"""
+        due = self.current + max(1, round(delay / self.tick))
+        self.slots[due % len(self.slots)].append((due, item))
+
+    def advance(self):
+        """Move one tick forward and return the items now due"""
+        self.current += 1
+        slot = self.slots[self.current % len(self.slots)]
+        if not slot:
+            return []
+
+        due = [item for tick, item in slot if tick <= self.current]
+        slot[:] = [(tick, item) for tick, item in slot if tick > self.current]
+        return due
+
+
+def sparkline(values, width, chars=SPARK_CHARS):
+    """Sparkline of the last width values, scaled to their own range"""
+    values = list(values)[-width:] if width > 0 else []
+    if not values:
+        return ''
+    low, high = min(values), max(values)
+    span = (high - low) or 1
+    return ''.join(chars[int((value - low) / span * (len(chars) - 1))] for value in values)
+
+
+class Dashboard:
+    """Full-screen curses status view with sorting, paging and latency sparklines
+
+    Only the visible page is formatted, and only screen rows whose text
+    changed since the last refresh are rewritten, so redrawing stays cheap
+    with thousands of targets.
+    """
+
+    SORT_KEYS = ('status', 'name', 'latency', 'loss', 'jitter')
+    HELP = 's sort  r reverse  PgDn/n next  PgUp/p previous  q quit'
+
+    def __init__(self, screen, refresh=0.5):
+        self.screen = screen
+        self.refresh = refresh  # seconds between redraws
+        self.sort_key = 'status'
+        self.reverse = False
+        self.page = 0
+        self.rows = {}  # screen row -> (text, attribute) currently shown
+        self.alerts = deque(maxlen=5)
+        self.last_draw = 0
+        utf8 = locale.getpreferredencoding(False).lower().replace('-', '') == 'utf8'
+        self.spark_chars = SPARK_CHARS if utf8 else SPARK_CHARS_ASCII
+
+        screen.nodelay(True)
+        screen.keypad(True)
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+
+        self.colors = {}
+        if curses.has_colors():
+            curses.use_default_colors()
+            for pair, (status, color) in enumerate([('UP', curses.COLOR_GREEN),
+                                                    ('DOWN', curses.COLOR_RED),
+                                                    ('ERROR', curses.COLOR_YELLOW)], 1):
+                curses.init_pair(pair, color, -1)
+                self.colors[status] = curses.color_pair(pair)
+
+    def add_alert(self, message):
+        """Show a message in the alert area instead of printing over the screen"""
+        self.alerts.append(f"{datetime.now().strftime('%H:%M:%S')} {message}")
+
+    def handle_keys(self):
+        """Apply pending key presses, return False when the user quits"""
+        while True:
+            key = self.screen.getch()
+            if key == -1:
+                return True
+            if key in (ord('q'), ord('Q')):
+                return False
+
+            if key == ord('s'):
+                self.sort_key = self.SORT_KEYS[(self.SORT_KEYS.index(self.sort_key) + 1)
+                                               % len(self.SORT_KEYS)]
+                self.page = 0
+            elif key == ord('r'):
+                self.reverse = not self.reverse
+            elif key in (curses.KEY_NPAGE, ord('n'), ord(' ')):
+                self.page += 1
+            elif key in (curses.KEY_PPAGE, ord('p')):
+                self.page = max(0, self.page - 1)
+            elif key == curses.KEY_RESIZE:
+                self.screen.clear()
+                self.rows.clear()
+            self.last_draw = 0  # redraw right away
+
+    def sort_names(self, monitor):
+        """Target names in the current sort order"""
+        latest = monitor.latest
+
+        def status_key(name):
+            result = latest.get(name)
+            rank = 2 if result is None else 1 if result['status'] == 'UP' else 0
+            return rank, name
+
+        def latency_key(name):
+            result = latest.get(name)
+            up = result is not None and result['status'] == 'UP'
+            return -result['latency_avg'] if up else 1
+
+        def loss_key(name):
+            result = latest.get(name)
+            return -result.get('packet_loss', 100) if result else 1
+
+        keys = {
+            'status': status_key,
+            'name': None,
+            'latency': latency_key,
+            'loss': loss_key,
+            'jitter': lambda name: -monitor.calculate_jitter(name)
+        }
+        return sorted(monitor.targets, key=keys[self.sort_key], reverse=self.reverse)
+
+    def format_row(self, monitor, name, width):
+        """One target's row and its colour"""
+        result = monitor.latest.get(name)
+        target = monitor.targets.get(name, {})
+        status = result['status'] if result else '...'
+        latency = loss = jitter = uptime = '-'
+
+        if result and status == 'UP':
+            latency = f"{result['latency_avg']:.1f}ms"
+            loss = f"{result['packet_loss']:.0f}%"
+            jitter = f"{monitor.calculate_jitter(name):.1f}ms"
+        elif result and status == 'DOWN':
+            loss = '100%'
+
+        stats = monitor.host_stats.get(name)
+        if stats and stats.checks:
+            uptime = f"{stats.uptime_percent():.1f}%"
+
+        text = (f"{name[:24]:<24} {target.get('ip', '')[:15]:<15} {target.get('probe', 'icmp'):<5} "
+                f"{status:<6} {latency:>9} {loss:>5} {jitter:>8} {uptime:>7} ")
+        text += sparkline(monitor.latency_history.get(name, ()), width - len(text) - 1,
+                          self.spark_chars)
+        return text, self.colors.get(status, 0)
+
+    def put(self, row, text, attribute, width):
+        """Rewrite a screen row only if it changed"""
+        text = text[:width - 1]
+        if self.rows.get(row) == (text, attribute):
+            return
+        self.rows[row] = (text, attribute)
+        try:
+            self.screen.move(row, 0)
+            self.screen.clrtoeol()
+            self.screen.addstr(row, 0, text, attribute)
+        except curses.error:
+            pass  # terminal shrank under us, the resize key redraws
+
+    def draw(self, monitor):
+        """Redraw the changed parts of the screen"""
+        height, width = self.screen.getmaxyx()
+        alert_rows = min(len(self.alerts), max(0, height // 4))
+        page_size = max(1, height - 3 - alert_rows)
+
+        names = self.sort_names(monitor)
+        pages = max(1, math.ceil(len(names) / page_size))
+        self.page = min(self.page, pages - 1)
+        visible = names[self.page * page_size:(self.page + 1) * page_size]
+
+        up = sum(1 for result in monitor.latest.values() if result['status'] == 'UP')
+        down = len(monitor.latest) - up
+        order = 'reversed' if self.reverse else ''
+        lag = monitor.scheduler_stats.summary()['lag_p99_ms']
+        self.put(0, f"Network Health {datetime.now().strftime('%H:%M:%S')} - "
+                    f"{len(names)} targets, {up} up, {down} down | sort: {self.sort_key} {order}| "
+                    f"page {self.page + 1}/{pages} | lag p99 {lag}ms", curses.A_BOLD, width)
+        self.put(1, f"{'Host':<24} {'IP':<15} {'Probe':<5} {'Status':<6} {'Latency':>9} "
+                    f"{'Loss':>5} {'Jitter':>8} {'Uptime':>7} History", curses.A_UNDERLINE, width)
+
+        for i in range(page_size):
+            if i < len(visible):
+                self.put(2 + i, *self.format_row(monitor, visible[i], width), width)
+            else:
+                self.put(2 + i, '', 0, width)
+
+        alerts = list(self.alerts)[-alert_rows:] if alert_rows else []
+        for i, alert in enumerate(alerts):
+            self.put(2 + page_size + i, alert, curses.A_BOLD, width)
+        self.put(height - 1, self.HELP, curses.A_DIM, width)
+
+        self.screen.noutrefresh()
+        curses.doupdate()
+
+    def update(self, monitor):
+        """Handle keys and redraw once per refresh period; False when the user quits"""
+        if not self.handle_keys():
+            return False
+
+        now = time.monotonic()
+        if now - self.last_draw >= self.refresh:
+            self.last_draw = now
+            self.draw(monitor)
+        return True
+
+
+class NetworkMonitor:
+    def __init__(self, max_concurrency=100, probe_timeout=15, probe_engine='auto',
+                 ping_count=5, ping_interval=0.2, results_limit=1000,
+                 timeseries_prefix='network_timeseries', jitter_windows=(16, 100),
+                 log_prefix='network_log', log_formats=('jsonl', 'csv'),
+                 log_max_bytes=50 * 1024 * 1024, log_keep=5,
+                 alert_raise_after=2, alert_clear_after=3,
+                 adaptive=True, fast_factor=0.25, max_backoff=4,
+                 trace_paths=True, max_traces=10, retrace_shift=0.5, retrace_min_ms=20,
+                 retrace_interval=300):
+        self.max_concurrency = max_concurrency  # probes in flight at once
+        self.probe_timeout = probe_timeout  # seconds per probe
+        self.probe_engine = probe_engine  # 'auto', 'icmp' or 'subprocess'
+        self.ping_count = ping_count
+        self.ping_interval = ping_interval  # seconds between echo requests (native engine)
+        self.icmp = None
         self.hosts = {
             'Google DNS': '8.8.8.8',
             'Cloudflare DNS': '1.1.1.1',
             'Local Gateway': '192.168.1.1'
         }
-        self.results = []
-        self.latency_history = {host: deque(maxlen=100) for host in self.hosts}
+        self.targets = {}  # name -> target, see make_target()
+        self.groups = {}  # group -> {'interval': seconds, 'tags': [...]}
+        self.tick = 0.1  # scheduler resolution in seconds
+        self.latest = {}  # name -> most recent result
+        self.connections = ConnectionProber()
+        self.results = deque(maxlen=results_limit)  # most recent raw results
+        self.store = TimeSeriesStore(timeseries_prefix)
+        self.host_stats = defaultdict(HostStats)
+        self.jitter_windows = jitter_windows
+        self.jitter = defaultdict(lambda: JitterTracker(self.jitter_windows))
+        self.latency_history = defaultdict(lambda: deque(maxlen=100))
+        self.alert_raise_after = alert_raise_after  # consecutive bad results before alerting
+        self.alert_clear_after = alert_clear_after  # consecutive good results before clearing
+        self.alert_states = defaultdict(lambda: AlertState(self.alert_raise_after,
+                                                           self.alert_clear_after))
+        self.adaptive = adaptive  # probe degraded targets faster, healthy ones slower
+        self.fast_factor = fast_factor  # interval multiplier while degraded
+        self.max_backoff = max_backoff  # largest interval multiplier when healthy
+        self.interval_factor = defaultdict(lambda: 1.0)
+        self.probes_sent = 0
+        self.trace_paths = trace_paths  # record hop paths (needs a raw socket)
+        self.max_traces = max_traces  # traces in flight at once
+        self.retrace_shift = retrace_shift  # relative latency change that triggers a re-trace
+        self.retrace_min_ms = retrace_min_ms  # ... but never below this many ms
+        self.retrace_interval = retrace_interval  # minimum seconds between traces of a target
+        self.tracer = None
+        self.paths = {}  # name -> {'hops': [...], 'latency': ms at trace time, 'traced_at': epoch}
+        self.tracing = set()
+        self.dashboard = None  # Dashboard while the live view is running
+        self.scheduler_stats = SchedulerStats()
+        self.worker_stats = {}  # worker id -> SchedulerStats summary, in sharded mode
+        self.logs = [ResultLog(log_prefix, fmt, log_max_bytes, log_keep) for fmt in log_formats]
+
+    def ping_command(self, ip):
+        """Command line used to probe a host"""
+        return ['ping', '-c', str(self.ping_count), '-W', '2', ip]
+
+    def build_result(self, host, ip, rtts):
+        """Turn per-packet RTTs (None = lost) into a result dict"""
+        replies = [rtt for rtt in rtts if rtt is not None]
+        packet_loss = round((1 - len(replies) / len(rtts)) * 100, 1) if rtts else 100
+
+        if not replies:
+            return {
+                'host': host,
+                'ip': ip,
+                'status': 'DOWN',
+                'latency_avg': 0,
+                'packet_loss': 100,
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
+
+        return {
+            'host': host,
+            'ip': ip,
+            'status': 'UP',
+            'latency_avg': round(sum(replies) / len(replies), 2),
+            'latency_min': round(min(replies), 2),
+            'latency_max': round(max(replies), 2),
+            'packet_loss': packet_loss,
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            # Per-reply RTTs, consumed by record_result for jitter
+            'rtts': replies
+        }
+
+    def get_icmp_prober(self):
+        """Open the native ICMP engine, or None if it cannot be used"""
+        if self.icmp is None and self.probe_engine != 'subprocess':
+            try:
+                self.icmp = IcmpProber()
+            except OSError as e:
+                if self.probe_engine == 'icmp':
+                    raise
+                self.notify(f"ℹ️  Native ICMP unavailable ({e}), falling back to the ping command")
+                self.probe_engine = 'subprocess'
+        return self.icmp
+
+    def get_path_tracer(self):
+        """Open the traceroute engine, or None if path tracing is off or not permitted"""
+        if self.tracer is None and self.trace_paths:
+            try:
+                self.tracer = PathTracer()
+            except OSError as e:
+                self.notify(f"ℹ️  Path tracing unavailable ({e}), needs root or CAP_NET_RAW")
+                self.trace_paths = False
+        return self.tracer
+
+    def parse_ping_output(self, host, ip, output):
+        """Turn ping's summary output into a result dict"""
+        # Parse packet loss
+        loss_match = re.search(r'(\d+)% packet loss', output)
+        packet_loss = float(loss_match.group(1)) if loss_match else 100
+
+        # Parse latency
+        latency_match = re.search(r'min/avg/max/[^=]* = ([\d.]+)/([\d.]+)/([\d.]+)', output)
+
+        if latency_match:
+            min_lat = float(latency_match.group(1))
+            avg_lat = float(latency_match.group(2))
+            max_lat = float(latency_match.group(3))
+
+            return {
+                'host': host,
+                'ip': ip,
+                'status': 'UP' if packet_loss < 100 else 'DOWN',
+                'latency_avg': round(avg_lat, 2),
+                'latency_min': round(min_lat, 2),
+                'latency_max': round(max_lat, 2),
+                'packet_loss': packet_loss,
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                # Per-reply RTTs, consumed by record_result for jitter
+                'rtts': [float(rtt) for rtt in re.findall(r'time=([\d.]+) ms', output)]
+            }
+        else:
+            return {
+                'host': host,
+                'ip': ip,
+                'status': 'DOWN',
+                'latency_avg': 0,
+                'packet_loss': 100,
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
+
+    def error_result(self, host, ip, error):
+        """Result dict for a probe that could not run"""
+        return {
+            'host': host,
+            'ip': ip,
+            'status': 'ERROR',
+            'error': str(error),
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
 
     def ping_host(self, host, ip):
         """Ping a host and return metrics"""
         try:
             result = subprocess.run(
-                ['ping', '-c', '5', '-W', '2', ip],
+                self.ping_command(ip),
                 capture_output=True,
                 text=True,
-                timeout=15
+                timeout=self.probe_timeout
             )
+            return self.parse_ping_output(host, ip, result.stdout)
 
-            output = result.stdout
-
-            # Parse packet loss
-            loss_match = re.search(r'(\d+)% packet loss', output)
-            packet_loss = float(loss_match.group(1)) if loss_match else 100
-
-            # Parse latency
-            latency_match = re.search(r'min/avg/max/[^=]* = ([\d.]+)/([\d.]+)/([\d.]+)', output)
-
-            if latency_match:
-                min_lat = float(latency_match.group(1))
-                avg_lat = float(latency_match.group(2))
-                max_lat = float(latency_match.group(3))
-
-                return {
-                    'host': host,
-                    'ip': ip,
-                    'status': 'UP' if packet_loss < 100 else 'DOWN',
-                    'latency_avg': round(avg_lat, 2),
-                    'latency_min': round(min_lat, 2),
-                    'latency_max': round(max_lat, 2),
-                    'packet_loss': packet_loss,
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-            else:
-                return {
-                    'host': host,
-                    'ip': ip,
-                    'status': 'DOWN',
-                    'latency_avg': 0,
-                    'packet_loss': 100,
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
+        except Exception as e:
+            return self.error_result(host, ip, e)
 
+    async def async_ping_host(self, host, ip, semaphore):
+        """Ping a host without blocking the event loop"""
+        async with semaphore:
+            return await self.ping_now(host, ip)
+
+    async def ping_now(self, host, ip):
+        """Ping with the native engine if possible, else the ping command"""
+        icmp = self.get_icmp_prober()
+        if icmp and self.is_ipv4(ip):
+            return await self.icmp_ping_host(icmp, host, ip)
+        return await self.subprocess_ping_host(host, ip)
+
+    def is_ipv4(self, ip):
+        """Native probes only handle IPv4 literals"""
+        try:
+            return ipaddress.ip_address(ip).version == 4
+        except ValueError:
+            return False
+
+    async def icmp_ping_host(self, icmp, host, ip):
+        """Ping a host with the in-process ICMP engine"""
+        try:
+            rtts = await asyncio.wait_for(
+                icmp.ping(ip, self.ping_count, self.ping_interval, timeout=2),
+                self.probe_timeout
+            )
+        except asyncio.TimeoutError:
+            return self.error_result(host, ip, f"probe timed out after {self.probe_timeout}s")
+        except OSError as e:
+            return self.error_result(host, ip, e)
+
+        return self.build_result(host, ip, rtts)
+
+    async def subprocess_ping_host(self, host, ip):
+        """Ping a host by running the ping command"""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *self.ping_command(ip),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
         except Exception as e:
-            return {
-                'host': host,
-                'ip': ip,
-                'status': 'ERROR',
-                'error': str(e),
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
+            return self.error_result(host, ip, e)
 
-    def calculate_jitter(self, host):
-        """Calculate jitter from latency history"""
-        history = list(self.latency_history[host])
-        if len(history) < 2:
-            return 0
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), self.probe_timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return self.error_result(host, ip, f"probe timed out after {self.probe_timeout}s")
+
+        return self.parse_ping_output(host, ip, stdout.decode(errors='replace'))
 
-        differences = [abs(history[i] - history[i - 1]) for i in range(1, len(history))]
-        return round(sum(differences) / len(differences), 2)
+    async def probe_hosts(self, hosts=None):
+        """Probe many hosts concurrently, at most max_concurrency at a time
+
+        hosts is a {name: ip} dict to ping; by default every target is probed
+        with its own probe type.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        if hosts is None:
+            self.ensure_targets()
+            tasks = [self.probe_target(target, semaphore) for target in self.targets.values()]
+        else:
+            tasks = [self.async_ping_host(host, ip, semaphore) for host, ip in hosts.items()]
+
+        try:
+            return await asyncio.gather(*tasks)
+        finally:
+            self.connections.close_all()
+
+    def check_hosts(self, hosts=None):
+        """Run one probe round over all hosts and return the results in order"""
+        return asyncio.run(self.probe_hosts(hosts))
+
+    def record_result(self, result):
+        """Store a probe result"""
+        jitter = self.jitter[result['host']]
+        for rtt in result.pop('rtts', ()):
+            jitter.add(rtt)
+
+        self.results.append(result)
+        self.store.add_result(result)
+        full = False
+        for log in self.logs:
+            full |= log.write(result)
+        if full:
+            # Through flush_logs, so a write error never escapes the probe loop
+            self.flush_logs()
+        self.host_stats[result['host']].add(result)
+
+        # Recent per-check latency
+        if result['status'] == 'UP':
+            self.latency_history[result['host']].append(result['latency_avg'])
+
+    def calculate_jitter(self, host, window=None):
+        """RFC 3550 jitter for a host, or the mean jitter over a window of replies"""
+        tracker = self.jitter.get(host)
+        if tracker is None:
+            return 0
+        if window is None:
+            return round(tracker.jitter, 2)
+        return round(tracker.window_jitter(window), 2)
 
     def check_alerts(self, result):
-        """Check if metrics exceed thresholds"""
+        """Alerts raised or cleared by this result (debounced, see AlertState)"""
         alerts = []
+        host = result['host']
 
-        if result['status'] == 'DOWN':
-            alerts.append(f"🔴 {result['host']} is DOWN!")
-        elif result['packet_loss'] > 10:
-            alerts.append(f"⚠️  {result['host']} has {result['packet_loss']}% packet loss")
-        elif result['latency_avg'] > 100:
-            alerts.append(f"⚠️  {result['host']} has high latency: {result['latency_avg']}ms")
+        for condition, change in self.alert_states[host].update(result):
+            if condition == 'down' and change == 'raised':
+                if result['status'] == 'ERROR':
+                    alerts.append(f"🔴 {host} probe failed: {result['error']}")
+                else:
+                    alerts.append(f"🔴 {host} is DOWN!")
+            elif condition == 'down':
+                alerts.append(f"✅ {host} is back UP")
+            elif condition == 'packet_loss' and change == 'raised':
+                alerts.append(f"⚠️  {host} has {result['packet_loss']}% packet loss")
+            elif condition == 'packet_loss':
+                alerts.append(f"✅ {host} packet loss back to {result['packet_loss']}%")
+            elif change == 'raised':
+                alerts.append(f"⚠️  {host} has high latency: {result['latency_avg']}ms")
+            else:
+                alerts.append(f"✅ {host} latency back to {result['latency_avg']}ms")
 
         return alerts
 
+    def scheduler_report(self):
+        """One-line summary of the monitor's own overhead"""
+        if self.worker_stats:
+            workers = self.worker_stats.values()
+            return (f"⏱️  Scheduler ({len(self.worker_stats)} workers): "
+                    f"{sum(w['probes'] for w in workers)} probes, worst lag p99/max "
+                    f"{max(w['lag_p99_ms'] for w in workers)}/{max(w['lag_max_ms'] for w in workers)}ms, "
+                    f"CPU {sum(w['cpu_percent'] for w in workers):.1f}% in workers")
+
+        stats = self.scheduler_stats.summary()
+        return (f"⏱️  Scheduler: {stats['probes']} probes, lag p50/p99/max "
+                f"{stats['lag_p50_ms']}/{stats['lag_p99_ms']}/{stats['lag_max_ms']}ms, "
+                f"tick {stats['tick_busy_avg_ms']}ms avg / {stats['tick_busy_max_ms']}ms max, "
+                f"CPU {stats['cpu_percent']}% ({stats['cpu_per_probe_ms']}ms per probe)")
+
+    def notify(self, message):
+        """Print a message, or show it in the dashboard while that is running"""
+        if self.dashboard:
+            self.dashboard.add_alert(message)
+        else:
+            print(message)
+
     def display_status(self, results):
         """Display current network status"""
         print(f"\n{'=' * 70}")
         print(f"Network Health Status - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"{'=' * 70}\n")
+        if self.scheduler_stats.probes or self.worker_stats:
+            print(f"{self.scheduler_report()}\n")
 
         for result in results:
             status_icon = '✅' if result['status'] == 'UP' else '❌'
 
-            print(f"{status_icon} {result['host']} ({result['ip']})")
+            probe = self.targets.get(result['host'], {}).get('probe', 'icmp')
+            probe_label = f", {probe.upper()}" if probe != 'icmp' else ''
+            print(f"{status_icon} {result['host']} ({result['ip']}{probe_label})")
             print(f"   Status: {result['status']}")
 
             if result['status'] == 'UP':
@@ -116,26 +1779,39 @@ class NetworkMonitor:
                 print(f"   Packet Loss: {result['packet_loss']}%")
 
                 jitter = self.calculate_jitter(result['host'])
-                print(f"   Jitter: {jitter}ms")
+                windows = ', '.join(f"last {size}: {self.calculate_jitter(result['host'], size)}ms"
+                                    for size in self.jitter_windows)
+                print(f"   Jitter: {jitter}ms ({windows})")
 
-            print()
+            stats = self.host_stats.get(result['host'])
+            if stats and stats.checks > 1:
+                summary = stats.summary()
+                print(f"   Session: {summary['uptime_percent']}% up, "
+                      f"p50/p95/p99 {summary['latency_p50']}/{summary['latency_p95']}/"
+                      f"{summary['latency_p99']}ms")
 
-    def save_to_json(self, filename='network_log.json'):
-        """Save results to JSON file"""
-        with open(filename, 'w') as f:
-            json.dump(self.results, f, indent=2)
-        print(f"✓ Saved to {filename}")
+            path = self.paths.get(result['host'])
+            if path and path['hops']:
+                route = ' → '.join(address or '*' for _, address, _ in path['hops'])
+                print(f"   Path: {len(path['hops'])} hops ({route})")
 
-    def save_to_csv(self, filename='network_log.csv'):
-        """Save results to CSV file"""
-        if not self.results:
-            return
+            state = self.alert_states.get(result['host'])
+            if state and state.firing:
+                print(f"   Alerts: {', '.join(state.firing)}")
+
+            print()
 
-        with open(filename, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=self.results[0].keys())
-            writer.writeheader()
-            writer.writerows(self.results)
-        print(f"✓ Saved to {filename}")
+    def flush_logs(self):
+        """Append the results recorded since the last flush to the streaming logs"""
+        for log in self.logs:
+            try:
+                log.flush()
+            except OSError as e:
+                self.notify(f"⚠️  Could not write {log.path}: {e}")
+
+    def uptime_summary(self):
+        """Live per-host aggregates, available at any point during a run"""
+        return {host: stats.summary() for host, stats in self.host_stats.items()}
 
     def generate_uptime_report(self):
         """Generate uptime report for all hosts"""
@@ -143,91 +1819,630 @@ class NetworkMonitor:
         print("UPTIME REPORT")
         print(f"{'=' * 70}\n")
 
-        for host in self.hosts:
-            host_results = [r for r in self.results if r['host'] == host]
-
-            if not host_results:
-                continue
-
-            total_checks = len(host_results)
-            up_checks = sum(1 for r in host_results if r['status'] == 'UP')
-            uptime_percent = (up_checks / total_checks) * 100
-
-            avg_latencies = [r['latency_avg'] for r in host_results if r['status'] == 'UP']
-            avg_latency = round(sum(avg_latencies) / len(avg_latencies), 2) if avg_latencies else 0
+        for host, summary in self.uptime_summary().items():
+            total_checks = summary['total_checks']
+            up_checks = summary['up_checks']
 
             print(f"{host}:")
             print(f"  Total Checks: {total_checks}")
-            print(f"  Uptime: {uptime_percent:.2f}% ({up_checks}/{total_checks})")
-            print(f"  Average Latency: {avg_latency}ms")
+            print(f"  Uptime: {summary['uptime_percent']:.2f}% ({up_checks}/{total_checks})")
+            print(f"  Average Latency: {summary['latency_avg']}ms "
+                  f"(std dev: {summary['latency_stddev']}ms)")
+            if up_checks:
+                print(f"  Latency p50/p95/p99: {summary['latency_p50']}/{summary['latency_p95']}/"
+                      f"{summary['latency_p99']}ms")
             print()
 
-    def run_continuous(self, interval=10, duration=300):
-        """Run continuous monitoring"""
-        print("Starting Network Health Monitor...")
-        print(f"Monitoring interval: {interval} seconds")
-        print(f"Duration: {duration} seconds")
-        print("Press Ctrl+C to stop\n")
+        # Per-group totals for inventories with several groups
+        groups = defaultdict(lambda: [0, 0, 0])  # targets, checks, up checks
+        for host, stats in self.host_stats.items():
+            group = self.targets.get(host, {}).get('group', 'default')
+            groups[group][0] += 1
+            groups[group][1] += stats.checks
+            groups[group][2] += stats.up_checks
+
+        if len(groups) > 1:
+            print("Groups:")
+            for group, (targets, checks, up_checks) in sorted(groups.items()):
+                uptime = (up_checks / checks) * 100 if checks else 0
+                print(f"  {group:<20} {targets:>6} targets  {uptime:6.2f}% up")
+            print()
+
+    def load_targets(self, path, max_cidr_hosts=65536):
+        """Replace the monitored hosts with an inventory file"""
+        self.groups, self.targets = load_inventory(path, max_cidr_hosts)
+        self.hosts = {name: target['ip'] for name, target in self.targets.items()}
+        print(f"✓ Loaded {len(self.targets)} targets in {len(self.groups)} groups from {path}")
+
+    def ensure_targets(self):
+        """Make sure every entry of self.hosts has a target record"""
+        for name, ip in self.hosts.items():
+            if name not in self.targets:
+                self.targets[name] = make_target(name, ip)
+
+    def select_targets(self, group=None, tag=None):
+        """Keep only targets in a group and/or carrying a tag"""
+        self.ensure_targets()
+        self.targets = {
+            name: target for name, target in self.targets.items()
+            if (group is None or target['group'] == group) and (tag is None or tag in target['tags'])
+        }
+        self.hosts = {name: target['ip'] for name, target in self.targets.items()}
 
-        start_time = time.time()
+    def needs_trace(self, result):
+        """Trace a target the first time it answers, then only when its latency shifts"""
+        name = result['host']
+        if not self.trace_paths or result['status'] != 'UP' or name in self.tracing:
+            return False
+        if not self.is_ipv4(result['ip']):
+            return False
 
+        path = self.paths.get(name)
+        if path is None:
+            return True
+        if time.time() - path['traced_at'] < self.retrace_interval:
+            return False
+
+        # Compare a short recent average, not one sample, against the traced latency
+        recent = list(self.latency_history[name])[-3:]
+        shift = abs(sum(recent) / len(recent) - path['latency'])
+        return shift > max(self.retrace_min_ms, path['latency'] * self.retrace_shift)
+
+    async def trace_target(self, name, ip, latency, semaphore):
+        """Trace a target's path and report changes"""
+        tracer = self.get_path_tracer()
+        if tracer is None:
+            return
+
+        # A known path bounds the TTLs worth probing
+        path = self.paths.get(name)
+        max_hops = min(30, len(path['hops']) + 3) if path and path['hops'] else 30
+
+        self.tracing.add(name)
         try:
-            while time.time() - start_time < duration:
-                current_results = []
+            async with semaphore:
+                hops = await tracer.trace(ip, max_hops)
+        except OSError as e:
+            self.notify(f"⚠️  {name} path trace failed: {e}")
+            return
+        finally:
+            self.tracing.discard(name)
+
+        for alert in self.update_path(name, hops, latency):
+            self.notify(alert)
+
+    def update_path(self, name, hops, latency):
+        """Cache a traced path, return alerts for route and per-hop latency changes"""
+        alerts = []
+        old = self.paths.get(name)
+        self.paths[name] = {'hops': hops, 'latency': latency, 'traced_at': time.time()}
+        if not old:
+            return alerts
+
+        changes = path_changes(old['hops'], hops)
+        if changes:
+            ttl, before, after = changes[0]
+            alerts.append(f"🔀 {name} path changed at hop {ttl}: {before or '*'} → {after or '*'} "
+                          f"({len(changes)} hops differ, latency {old['latency']} → {latency}ms)")
+        else:
+            step = latency_step(old['hops'], hops, self.retrace_min_ms)
+            if step:
+                alerts.append(f"🐢 {name} latency added at hop {step[0]} ({step[1]}): +{step[2]}ms")
+        return alerts
+
+    def target_interval(self, target, default):
+        """Probe interval: target, then group, then the run's default"""
+        group = self.groups.get(target['group'], {})
+        return target['interval'] or group.get('interval') or default
+
+    def next_interval(self, target, default):
+        """Probe interval scaled by the target's adaptive factor"""
+        interval = self.target_interval(target, default)
+        if not self.adaptive:
+            return interval
+        return max(self.tick, interval * self.interval_factor[target['name']])
+
+    def adapt_interval(self, name):
+        """Speed up probing of a degraded target, back off while it stays healthy
+
+        Returns True when the target just became degraded, so its pending
+        (slower) probe should be replaced by one at the fast interval.
+        """
+        if not self.adaptive:
+            return False
 
-                for host, ip in self.hosts.items():
-                    result = self.ping_host(host, ip)
-                    current_results.append(result)
-                    self.results.append(result)
+        state = self.alert_states[name]
+        factor = self.interval_factor[name]
+        if state.degraded:
+            self.interval_factor[name] = self.fast_factor
+            return factor > self.fast_factor
 
-                    # Store latency for jitter calculation
-                    if result['status'] == 'UP':
-                        self.latency_history[host].append(result['latency_avg'])
+        if state.healthy_streak >= self.alert_clear_after:
+            self.interval_factor[name] = min(max(factor, 1.0) * 1.5, self.max_backoff)
+        elif factor < 1.0:
+            self.interval_factor[name] = 1.0
+        return False
 
-                    # Check for alerts
-                    alerts = self.check_alerts(result)
-                    for alert in alerts:
-                        print(alert)
+    def initial_delay(self, name, interval):
+        """Stable offset within the interval so probes are spread evenly"""
+        return (zlib.crc32(name.encode()) % 10000) / 10000 * interval
+
+    async def probe_target(self, target, semaphore, due=None):
+        """Probe one target with its probe type; due = loop time it was scheduled for"""
+        async with semaphore:
+            if due is not None:
+                self.scheduler_stats.add_lag(asyncio.get_running_loop().time() - due)
+
+            if target['probe'] == 'icmp':
+                return await self.ping_now(target['name'], target['ip'])
+            return await self.connection_probe(target)
+
+    async def measure_connection(self, target):
+        """ping_count TCP/TLS/HTTP measurements spaced by ping_interval"""
+        rtts = []
+        for i in range(self.ping_count):
+            if i:
+                await asyncio.sleep(self.ping_interval)
+            rtts.append(await self.connections.measure(target, timeout=2))
+        return rtts
+
+    async def connection_probe(self, target):
+        """TCP/TLS/HTTP probe, bounded by probe_timeout like the ICMP engine"""
+        try:
+            rtts = await asyncio.wait_for(self.measure_connection(target), self.probe_timeout)
+        except asyncio.TimeoutError:
+            return self.error_result(target['name'], target['ip'],
+                                     f"probe timed out after {self.probe_timeout}s")
+        except Exception as e:
+            return self.error_result(target['name'], target['ip'], e)
+
+        return self.build_result(target['name'], target['ip'], rtts)
+
+    def handle_result(self, result):
+        """Record a result from the scheduler and print its alerts"""
+        self.record_result(result)
+        self.latest[result['host']] = result
+
+        for alert in self.check_alerts(result):
+            self.notify(alert)
+
+    async def monitor_loop(self, interval, duration):
+        """Probe every target on its own interval, spread over a timer wheel"""
+        self.ensure_targets()
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        wheel = TimerWheel(self.tick)
+        in_flight = {}
+        self.scheduler_stats = SchedulerStats()
+        generation = defaultdict(int)  # wheel entries of older generations are stale
+        trace_semaphore = asyncio.Semaphore(self.max_traces)
+        traces = set()
+
+        for name, target in self.targets.items():
+            wheel.schedule((name, 0), self.initial_delay(name, self.target_interval(target, interval)))
+
+        start = loop.time()
+        next_display = start + interval
+
+        def on_done(name, task):
+            del in_flight[name]
+            if task.cancelled():
+                return
+
+            result = task.result()
+            self.scheduler_stats.probes += 1
+            self.handle_result(result)
+            if self.needs_trace(result):
+                trace = asyncio.ensure_future(
+                    self.trace_target(name, result['ip'], result['latency_avg'], trace_semaphore))
+                traces.add(trace)
+                trace.add_done_callback(traces.discard)
+
+            target = self.targets.get(name)
+            if target and self.adapt_interval(name):
+                # Just degraded: replace the pending probe by one at the fast interval
+                generation[name] += 1
+                wheel.schedule((name, generation[name]), self.next_interval(target, interval))
+
+        try:
+            while loop.time() - start < duration:
+                await asyncio.sleep(max(0, start + (wheel.current + 1) * wheel.tick - loop.time()))
+
+                # Catch up on every tick that elapsed, if the loop fell behind
+                woke = loop.time()
+                due = []
+                while wheel.current < (woke - start) / wheel.tick:
+                    items = wheel.advance()
+                    due_at = start + wheel.current * wheel.tick
+                    due.extend((item, due_at) for item in items)
+
+                for (name, entry), due_at in due:
+                    target = self.targets.get(name)
+                    if target is None or entry != generation[name]:
+                        continue
+
+                    # Fixed cadence: reschedule at dispatch time, skip if still running
+                    wheel.schedule((name, entry), self.next_interval(target, interval))
+                    if name in in_flight:
+                        continue
+
+                    self.probes_sent += 1
+                    task = asyncio.ensure_future(self.probe_target(target, semaphore, due_at))
+                    in_flight[name] = task
+                    task.add_done_callback(lambda task, name=name: on_done(name, task))
+                self.scheduler_stats.add_tick(loop.time() - woke)
+
+                if self.dashboard and not self.dashboard.update(self):
+                    break
+
+                if loop.time() >= next_display:
+                    if not self.dashboard:
+                        self.display_status(list(self.latest.values()))
+                    self.store.maybe_flush()
+                    self.flush_logs()
+                    next_display += interval
+        finally:
+            for task in [*in_flight.values(), *traces]:
+                task.cancel()
+            await asyncio.gather(*in_flight.values(), *traces, return_exceptions=True)
+            self.connections.close_all()
+
+    def worker_options(self):
+        """Constructor options shard workers inherit"""
+        return {
+            'max_concurrency': self.max_concurrency,
+            'probe_timeout': self.probe_timeout,
+            'probe_engine': self.probe_engine,
+            'ping_count': self.ping_count,
+            'ping_interval': self.ping_interval,
+            'timeseries_prefix': self.store.path_prefix,
+            'alert_raise_after': self.alert_raise_after,
+            'alert_clear_after': self.alert_clear_after,
+            'adaptive': self.adaptive,
+            'fast_factor': self.fast_factor,
+            'max_backoff': self.max_backoff,
+            'trace_paths': self.trace_paths,
+            'max_traces': self.max_traces,
+            'retrace_shift': self.retrace_shift,
+            'retrace_min_ms': self.retrace_min_ms,
+            'retrace_interval': self.retrace_interval
+        }
+
+    def shard_targets(self, workers):
+        """Split the targets into per-worker dicts by consistent hash of their name"""
+        ring = HashRing(range(workers))
+        shards = [{} for _ in range(workers)]
+        for name, target in self.targets.items():
+            shards[ring.lookup(name)][name] = target
+        return shards
+
+    def sharded_loop(self, interval, duration, workers):
+        """Coordinator: run shard workers and handle the results they stream back"""
+        self.ensure_targets()
+        results_queue = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=shard_worker, daemon=True,
+                                    args=(worker, shard, self.groups, self.worker_options(),
+                                          interval, duration, results_queue))
+            for worker, shard in enumerate(self.shard_targets(workers)) if shard
+        ]
+        for process in processes:
+            process.start()
+
+        running = len(processes)
+        next_display = time.monotonic() + interval
+        try:
+            while running:
+                try:
+                    kind, worker, payload = results_queue.get(timeout=self.tick)
+                except queue.Empty:
+                    if not any(process.is_alive() for process in processes):
+                        break  # killed without saying goodbye
+                    kind = None
 
-                self.display_status(current_results)
+                if kind == 'results':
+                    for record in payload:
+                        self.handle_result(expand_result(record))
+                elif kind == 'notify':
+                    self.notify(payload)
+                elif kind == 'stats':
+                    self.worker_stats[worker] = payload
+                elif kind == 'done':
+                    self.worker_stats[worker] = payload
+                    running -= 1
 
-                time.sleep(interval)
+                if self.dashboard and not self.dashboard.update(self):
+                    break
 
+                if time.monotonic() >= next_display:
+                    if not self.dashboard:
+                        self.display_status(list(self.latest.values()))
+                    self.store.maybe_flush()
+                    self.flush_logs()
+                    next_display += interval
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+
+    def run_loop(self, interval, duration, workers=1):
+        """Run the probe loop in this process, or sharded over worker processes"""
+        if workers > 1:
+            self.sharded_loop(interval, duration, workers)
+        else:
+            asyncio.run(self.monitor_loop(interval, duration))
+
+    def run_dashboard(self, screen, interval, duration, workers=1):
+        """Monitoring loop with the live dashboard, for curses.wrapper"""
+        self.dashboard = Dashboard(screen)
+        try:
+            self.run_loop(interval, duration, workers)
+        finally:
+            alerts, self.dashboard = self.dashboard.alerts, None
+            for alert in alerts:
+                print(alert)
+
+    def run_continuous(self, interval=10, duration=300, dashboard=False, workers=1):
+        """Run continuous monitoring"""
+        self.ensure_targets()
+        if dashboard and curses is None:
+            print("ℹ️  curses is not available, using the plain status display")
+            dashboard = False
+
+        print("Starting Network Health Monitor...")
+        print(f"Monitoring {len(self.targets)} targets, default interval: {interval} seconds")
+        print(f"Duration: {duration} seconds")
+        if workers > 1:
+            print(f"Sharded across {workers} worker processes")
+        print("Press Ctrl+C to stop\n")
+
+        try:
+            if dashboard:
+                locale.setlocale(locale.LC_ALL, '')  # lets curses draw UTF-8 sparklines
+                curses.wrapper(self.run_dashboard, interval, duration, workers)
+            else:
+                self.run_loop(interval, duration, workers)
         except KeyboardInterrupt:
             print("\n\nMonitoring stopped by user")
 
         # Generate final reports
         print("\nGenerating reports...")
+        self.store.flush(close=True)
+        print(f"✓ Time series appended to {self.store.path_prefix}.*.dat")
+        self.flush_logs()
+        for log in self.logs:
+            print(f"✓ {log.written} results appended to {log.path}")
+        if self.adaptive and not self.worker_stats:
+            print(f"✓ {self.probes_sent} probes sent with adaptive scheduling")
+        print(self.scheduler_report())
         self.generate_uptime_report()
-        self.save_to_json()
-        self.save_to_csv()
 
     def run_single_check(self):
         """Run a single check on all hosts"""
         print("Running single network check...\n")
 
-        results = []
-        for host, ip in self.hosts.items():
-            result = self.ping_host(host, ip)
-            results.append(result)
-            self.results.append(result)
-
-            if result['status'] == 'UP':
-                self.latency_history[host].append(result['latency_avg'])
+        results = self.check_hosts()
+        for result in results:
+            self.record_result(result)
+        self.flush_logs()
+        self.store.flush(close=True)
 
         self.display_status(results)
+        print(f"✓ Time series appended to {self.store.path_prefix}.*.dat")
+
+
+class ShardWorker(NetworkMonitor):
+    """Probe loop of one shard, streaming compact results to the coordinator
+
+    Keeps just enough state for adaptive scheduling and path tracing; the
+    coordinator owns results, reports, logs and alerts.
+    """
+
+    def __init__(self, worker_id, results_queue, **options):
+        super().__init__(log_formats=(), **options)
+        self.worker_id = worker_id
+        self.results_queue = results_queue
+        self.outbox = []
+
+    def handle_result(self, result):
+        """Queue the result for the coordinator, update local scheduling state"""
+        self.outbox.append(compact_result(result))
+        if len(self.outbox) == 1:
+            asyncio.get_running_loop().call_later(self.tick, self.send_results)
+        elif len(self.outbox) >= 500:
+            self.send_results()
+
+        self.alert_states[result['host']].update(result)
+        if result['status'] == 'UP':
+            self.latency_history[result['host']].append(result['latency_avg'])
+
+    def send_results(self):
+        """Ship the queued results as one message"""
+        if self.outbox:
+            self.results_queue.put(('results', self.worker_id, self.outbox))
+            self.outbox = []
+
+    def display_status(self, results):
+        self.results_queue.put(('stats', self.worker_id, self.scheduler_stats.summary()))
+
+    def notify(self, message):
+        self.results_queue.put(('notify', self.worker_id, message))
+
+
+def shard_worker(worker_id, targets, groups, options, interval, duration, results_queue):
+    """Process entry point: run one shard's probe loop until the duration ends"""
+    monitor = ShardWorker(worker_id, results_queue, **options)
+    monitor.targets = targets
+    monitor.groups = groups
+    monitor.hosts = {name: target['ip'] for name, target in targets.items()}
+
+    try:
+        asyncio.run(monitor.monitor_loop(interval, duration))
+    except KeyboardInterrupt:
+        pass  # the coordinator got it too and reports what arrived
+    finally:
+        monitor.send_results()
+        results_queue.put(('done', worker_id, monitor.scheduler_stats.summary()))
+
+
+class BenchmarkMonitor(NetworkMonitor):
+    """NetworkMonitor that keeps quiet and writes nothing worth keeping"""
+
+    def display_status(self, results):
+        pass
+
+    def notify(self, message):
+        pass
+
+
+def run_benchmark(counts, duration=10, interval=1.0, ping_count=1, max_concurrency=1000):
+    """Probe growing numbers of loopback targets, return one result dict per count"""
+    runs = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for count in counts:
+            monitor = BenchmarkMonitor(
+                max_concurrency=max_concurrency, probe_engine='icmp', ping_count=ping_count,
+                timeseries_prefix=os.path.join(workdir, f'bench{count}'), log_formats=(),
+                adaptive=False, trace_paths=False
+            )
+            # 127.0.0.0/8 answers locally: 127.0.0.1, 127.0.0.2, ...
+            monitor.hosts = {f'loopback-{i}': str(ipaddress.IPv4Address('127.0.0.1') + i)
+                             for i in range(count)}
+            monitor.ensure_targets()
+
+            asyncio.run(monitor.monitor_loop(interval, duration))
+            monitor.icmp.close()
+            monitor.icmp = None
+
+            stats = list(monitor.host_stats.values())
+            checks = sum(host.checks for host in stats)
+            up = sum(host.up_checks for host in stats)
+            samples = sum(host.latency_samples for host in stats)
+            run = {
+                'targets': count,
+                'expected_probes': int(count * duration / interval),
+                'completed_probes': checks,
+                'completion': round(checks / (count * duration / interval), 3),
+                'failed_percent': round((checks - up) / checks * 100, 2) if checks else 100,
+                'rtt_avg_ms': round(sum(host.latency_mean * host.latency_samples for host in stats)
+                                    / samples, 3) if samples else None,
+                **monitor.scheduler_stats.summary()
+            }
+            runs.append(run)
+    return runs
+
+
+def saturation_point(runs, interval):
+    """Largest target count the engine kept up with, and the first one it did not"""
+    healthy = None
+    for run in runs:
+        saturated = (run['completion'] < 0.95 or run['failed_percent'] > 1
+                     or run['lag_p99_ms'] > interval * 1000 * 0.1)
+        if saturated:
+            return healthy, run['targets']
+        healthy = run['targets']
+    return healthy, None
+
+
+def benchmark_command(args):
+    """Parse benchmark options, run it and report"""
+    parser = argparse.ArgumentParser(prog='network_monitor.py benchmark',
+                                     description='Find the probe engine saturation point '
+                                                 'with loopback targets')
+    parser.add_argument('--counts', default='100,500,1000,2000,5000,10000',
+                        help='comma-separated target counts, in increasing order')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per step')
+    parser.add_argument('--interval', type=float, default=1.0, help='probe interval in seconds')
+    parser.add_argument('--ping-count', type=int, default=1, help='echo requests per check')
+    parser.add_argument('--concurrency', type=int, default=1000, help='probes in flight at once')
+    parser.add_argument('--save', help='write results as JSON to this file')
+    options = parser.parse_args(args)
+
+    try:
+        counts = [int(count) for count in options.counts.split(',')]
+    except ValueError:
+        parser.error('--counts must be comma-separated integers')
+    if max(counts) > 2 ** 24 - 2:
+        parser.error('--counts is limited by the size of 127.0.0.0/8')
+
+    try:
+        IcmpProber().close()
+    except OSError as e:
+        print(f"✗ The benchmark needs the native ICMP engine: {e}")
+        return
+
+    print("\n" + "=" * 70)
+    print("NETWORK MONITOR PROBE ENGINE BENCHMARK")
+    print("=" * 70 + "\n")
+    print(f"Interval {options.interval}s, {options.ping_count} echo request(s) per check, "
+          f"{options.duration}s per step\n")
+
+    runs = run_benchmark(counts, options.duration, options.interval, options.ping_count,
+                         options.concurrency)
+
+    print(f"{'Targets':>8} {'Probes':>16} {'Done':>6} {'Failed':>7} {'RTT':>8} {'Lag p50':>8} "
+          f"{'p99':>8} {'max':>8} {'Tick max':>9} {'CPU':>6} {'CPU/probe':>10}")
+    for run in runs:
+        print(f"{run['targets']:>8} {run['completed_probes']:>7}/{run['expected_probes']:<8} "
+              f"{run['completion'] * 100:>5.1f}% {run['failed_percent']:>6.2f}% "
+              f"{run['rtt_avg_ms'] or 0:>6.2f}ms "
+              f"{run['lag_p50_ms']:>6.1f}ms {run['lag_p99_ms']:>6.1f}ms {run['lag_max_ms']:>6.1f}ms "
+              f"{run['tick_busy_max_ms']:>7.1f}ms {run['cpu_percent']:>5.1f}% "
+              f"{run['cpu_per_probe_ms']:>8.3f}ms")
+
+    healthy, saturated = saturation_point(runs, options.interval)
+    print()
+    if saturated is None:
+        print(f"✓ No saturation up to {healthy} targets at a {options.interval}s interval")
+    elif healthy is None:
+        print(f"⚠️  Saturated already at {saturated} targets")
+    else:
+        print(f"⚠️  Saturation between {healthy} and {saturated} targets "
+              f"(~{healthy / options.interval:,.0f} checks/s)")
+
+    if options.save:
+        with open(options.save, 'w') as f:
+            json.dump({'interval': options.interval, 'ping_count': options.ping_count,
+                       'duration': options.duration, 'runs': runs}, f, indent=2)
+        print(f"✓ Saved to {options.save}")
 
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'benchmark':
+        benchmark_command(sys.argv[2:])
+        return
+
     monitor = NetworkMonitor()
 
+    # Optional inventory: network_monitor.py --targets targets.yaml [--group G] [--tag T]
+    # and sharding over processes: --workers N
+    args = sys.argv[1:]
+    if '--targets' in args:
+        try:
+            monitor.load_targets(args[args.index('--targets') + 1])
+        except (IndexError, OSError, ValueError, KeyError, RuntimeError) as e:
+            print(f"✗ Could not load targets: {e}")
+            return
+
+    group = args[args.index('--group') + 1] if '--group' in args[:-1] else None
+    tag = args[args.index('--tag') + 1] if '--tag' in args[:-1] else None
+    try:
+        workers = int(args[args.index('--workers') + 1]) if '--workers' in args[:-1] else 1
+    except ValueError:
+        print("✗ --workers needs a number")
+        return
+    if group or tag:
+        monitor.select_targets(group, tag)
+
     print("\n" + "=" * 70)
     print("NETWORK HEALTH MONITOR")
     print("=" * 70)
     print("\n1. Single Check")
     print("2. Continuous Monitoring (5 minutes)")
     print("3. Custom Monitoring")
-    print("4. Exit\n")
+    print("4. Live Dashboard (1 hour, q to stop)")
+    print("5. Exit\n")
 
     choice = input("Select option: ").strip()
 
@@ -235,17 +2450,20 @@ def main():
         monitor.run_single_check()
 
     elif choice == '2':
-        monitor.run_continuous(interval=10, duration=300)
+        monitor.run_continuous(interval=10, duration=300, workers=workers)
 
     elif choice == '3':
         try:
             interval = int(input("Enter check interval (seconds): "))
             duration = int(input("Enter total duration (seconds): "))
-            monitor.run_continuous(interval=interval, duration=duration)
+            monitor.run_continuous(interval=interval, duration=duration, workers=workers)
         except ValueError:
             print("Invalid input!")
 
     elif choice == '4':
+        monitor.run_continuous(interval=10, duration=3600, dashboard=True, workers=workers)
+
+    elif choice == '5':
         print("Goodbye!")
 
     else: